@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Branch, Service, Professional, ProfessionalUnavailability, ProfessionalSchedule
+from .models import Branch, Service, Professional, ProfessionalUnavailability, ProfessionalSchedule, Appointment
 
 
 @admin.register(Branch)
@@ -358,4 +358,46 @@ class ProfessionalUnavailabilityAdmin(admin.ModelAdmin):
     def is_full_day_display(self, obj):
         """Mostrar si es día completo"""
         return '✓ Día completo' if obj.is_full_day() else '✗ Parcial'
-    is_full_day_display.short_description = 'Tipo'
\ No newline at end of file
+    is_full_day_display.short_description = 'Tipo'
+
+
+@admin.register(Appointment)
+class AppointmentAdmin(admin.ModelAdmin):
+    """Administración de Turnos"""
+    
+    list_display = [
+        'date',
+        'start_time',
+        'end_time',
+        'professional',
+        'branch',
+        'service',
+        'client',
+        'status',
+    ]
+    
+    list_filter = ['status', 'branch', 'date']
+    search_fields = [
+        'client__email',
+        'client__first_name',
+        'client__last_name',
+        'professional__first_name',
+        'professional__last_name',
+    ]
+    ordering = ['-date', 'start_time']
+    list_select_related = ['professional', 'branch', 'service', 'client']
+    raw_id_fields = ['client']
+    
+    fieldsets = (
+        ('Turno', {
+            'fields': ('branch', 'professional', 'service', 'client')
+        }),
+        ('Horario', {
+            'fields': ('date', ('start_time', 'end_time'))
+        }),
+        ('Detalles', {
+            'fields': ('status', 'price', 'notes')
+        }),
+    )
+    
+    readonly_fields = ['created_at', 'updated_at']
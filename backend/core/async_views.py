@@ -0,0 +1,431 @@
+"""
+Lectura async del catálogo público, para correr bajo ASGI
+(peluqueria_backend.asgi).
+
+Versiones `async def` de home, sucursales, servicios, profesionales y
+disponibilidad en /api/async/..., con las mismas respuestas que las vistas de
+core.views. Mientras una consulta espera a la base el worker atiende otras.
+
+DRF no ejecuta vistas async, así que AsyncAPIView hace lo que hace su APIView
+con las mismas piezas: autenticación JWT (el token se valida igual que en
+JWTAuthentication y el usuario se busca con el ORM async), clases de permiso
+de DRF (no consultan la base), negociación de formato (JSON o MessagePack) y
+el exception_handler de DRF para los errores.
+
+Los listados y detalles toman queryset, filtros, serializer y paginación de la
+vista sync equivalente (`view_class`) y evalúan las consultas con el ORM
+async. Lo que no tiene API async corre en un hilo (sync_to_async): la búsqueda
+de texto completo (SQL crudo), los serializers con objetos (pueden leer
+relaciones) y el cálculo de disponibilidad (mapas de bits, que además puede
+guardar los que falten).
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from rest_framework import exceptions, permissions
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from . import catalog, views
+from .conditional import _astamps, make_etag, not_modified, set_validators, validators
+from .fieldsets import requested_fields
+from .models import Branch, Professional, Service
+from .serializers import BranchListSerializer, ProfessionalListSerializer, ServiceSerializer
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+def _param(request, name):
+    return request.query_params.get(name, '').strip()
+
+
+# ========== AUTENTICACIÓN ==========
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication con la búsqueda del usuario en el ORM async"""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """Como JWTAuthentication.get_user"""
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        try:
+            user = await self.user_model.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found') from e
+
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
+
+
+# ========== VISTA BASE ==========
+
+class AsyncAPIView(View):
+    """
+    APIView de solo lectura para handlers `async def`: autentica, verifica
+    permisos, negocia el formato y renderiza como DRF, sin salir del event loop.
+    Los handlers devuelven un Response de DRF o un HttpResponse ya armado.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+    authentication_classes = [AsyncJWTAuthentication]
+    permission_classes = [permissions.AllowAny]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        # Sin autenticadores: el usuario se carga en authenticate()
+        request = self.request = Request(request, authenticators=())
+        try:
+            self.negotiate(request)
+            await self.authenticate(request)
+            self.check_permissions(request)
+
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        return self.finalize_response(request, response)
+
+    def negotiate(self, request):
+        renderers = [renderer() for renderer in self.renderer_classes]
+        renderer, media_type = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS().select_renderer(
+            request, renderers
+        )
+        request.accepted_renderer = renderer
+        request.accepted_media_type = media_type
+
+    async def authenticate(self, request):
+        for authenticator in [auth() for auth in self.authentication_classes]:
+            result = await authenticator.aauthenticate(request)
+            if result is not None:
+                request.user, request.auth = result
+                return
+        request.user = api_settings.UNAUTHENTICATED_USER()
+        request.auth = None
+
+    def check_permissions(self, request):
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+    def handle_exception(self, exc):
+        """Como APIView.handle_exception"""
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            if self.authentication_classes:
+                exc.auth_header = self.authentication_classes[0]().authenticate_header(self.request)
+            else:
+                exc.status_code = 403
+
+        context = {'view': self, 'args': self.args, 'kwargs': self.kwargs, 'request': self.request}
+        response = exception_handler(exc, context)
+        if response is None:
+            raise exc
+        response.exception = True
+        return response
+
+    def finalize_response(self, request, response):
+        """
+        Renderiza el Response de DRF acá: si llegara sin renderizar, Django lo
+        renderizaría en un hilo.
+        """
+        if isinstance(response, HttpResponseBase) and not isinstance(response, Response):
+            return response
+
+        renderer = getattr(request, 'accepted_renderer', None)
+        if renderer is None:
+            # Falló la negociación (406): se responde con el primer formato
+            renderer = self.renderer_classes[0]()
+            request.accepted_renderer = renderer
+            request.accepted_media_type = renderer.media_type
+        media_type = request.accepted_media_type
+
+        content = b''
+        if response.data is not None:
+            content = renderer.render(response.data, media_type, {
+                'view': self,
+                'request': request,
+                'response': response,
+            })
+        content_type = media_type
+        if renderer.charset:
+            content_type = f'{media_type}; charset={renderer.charset}'
+
+        rendered = HttpResponse(content, status=response.status_code, content_type=content_type)
+        for name, value in response.items():
+            if name.lower() != 'content-type':
+                rendered[name] = value
+        if len(self.renderer_classes) > 1:
+            patch_vary_headers(rendered, ['Accept'])
+        return rendered
+
+
+# ========== CATÁLOGO ==========
+
+class AsyncCatalogView(AsyncAPIView):
+    """
+    Lectura async con la configuración de una vista de core.views
+    (`view_class`): queryset, filtros, ?fields=, serializer, paginación y
+    validadores (ETag / Last-Modified).
+    """
+
+    view_class = None
+
+    def get_view(self, request):
+        return self.view_class(request=request, args=self.args, kwargs=self.kwargs, format_kwarg=None)
+
+    async def filter_queryset(self, view):
+        queryset = view.get_queryset()
+        search_fields = getattr(view, 'search_fields', None)
+        if search_fields and _param(view.request, api_settings.SEARCH_PARAM):
+            # La búsqueda de texto completo consulta su índice con SQL crudo
+            return await sync_to_async(view.filter_queryset)(queryset)
+        return view.filter_queryset(queryset)
+
+    async def paginate(self, view, queryset):
+        paginator = view.paginator
+        if paginator is None:
+            return None
+        if hasattr(paginator, 'apaginate_queryset'):
+            return await paginator.apaginate_queryset(queryset, view.request, view=view)
+        return await sync_to_async(paginator.paginate_queryset)(queryset, view.request, view=view)
+
+    async def serialize(self, view, instance, many=False):
+        # Los serializers con objetos pueden leer relaciones no precargadas
+        return await sync_to_async(lambda: view.get_serializer(instance, many=many).data)()
+
+
+class AsyncCatalogListView(AsyncCatalogView):
+    """Como ValuesListMixin + SparseFieldsetMixin + ConditionalGetMixin + ListAPIView"""
+
+    async def get(self, request, *args, **kwargs):
+        view = self.get_view(request)
+        queryset = await self.filter_queryset(view)
+
+        etag, last_modified = validators(
+            request,
+            view.get_catalog_models(),
+            await _astamps([queryset, *view.related_querysets(queryset)]),
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        response = await self.list(view, queryset)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
+
+    async def list(self, view, queryset):
+        serializer_class = view.get_serializer_class()
+        fields, include = requested_fields(view.request)
+        extra = [name.lstrip('-') for name in getattr(view, 'cursor_ordering', ())]
+        rows = serializer_class.values_queryset(queryset, fields, include, extra)
+
+        if rows is not None:
+            page = await self.paginate(view, rows)
+            data = serializer_class.values_data(
+                await _alist(rows) if page is None else page, fields, include, view.request
+            )
+        else:
+            page = await self.paginate(view, queryset)
+            data = await self.serialize(view, await _alist(queryset) if page is None else page, many=True)
+
+        if page is not None:
+            return view.get_paginated_response(data)
+        return Response(data)
+
+
+class AsyncCatalogDetailView(AsyncCatalogView):
+    """Como SparseFieldsetMixin + ConditionalGetMixin + RetrieveAPIView"""
+
+    async def get(self, request, *args, **kwargs):
+        view = self.get_view(request)
+        etag, last_modified = validators(
+            request, view.get_catalog_models(), await _astamps(view.get_conditional_querysets())
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        queryset = await self.filter_queryset(view)
+        lookup = view.lookup_url_kwarg or view.lookup_field
+        try:
+            instance = await queryset.aget(**{view.lookup_field: self.kwargs[lookup]})
+        except queryset.model.DoesNotExist:
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+
+        response = Response(await self.serialize(view, instance))
+        set_validators(response, etag, last_modified)
+        return response
+
+
+class AsyncBranchListView(AsyncCatalogListView):
+    """GET /api/async/branches/"""
+    view_class = views.BranchListView
+
+
+class AsyncBranchDetailView(AsyncCatalogDetailView):
+    """GET /api/async/branches/{id}/"""
+    view_class = views.BranchDetailView
+
+
+class AsyncServiceListView(AsyncCatalogListView):
+    """GET /api/async/services/"""
+    view_class = views.ServiceListView
+
+
+class AsyncServiceDetailView(AsyncCatalogDetailView):
+    """GET /api/async/services/{id}/"""
+    view_class = views.ServiceDetailView
+
+
+class AsyncProfessionalListView(AsyncCatalogListView):
+    """GET /api/async/professionals/"""
+    view_class = views.ProfessionalListView
+
+
+class AsyncProfessionalDetailView(AsyncCatalogDetailView):
+    """GET /api/async/professionals/{id}/"""
+    view_class = views.ProfessionalDetailView
+
+
+class AsyncProfessionalsByBranchView(AsyncCatalogListView):
+    """GET /api/async/branches/{branch_id}/professionals/"""
+    view_class = views.ProfessionalsByBranchView
+
+
+class AsyncProfessionalsByServiceView(AsyncCatalogListView):
+    """GET /api/async/services/{service_id}/professionals/"""
+    view_class = views.ProfessionalsByServiceView
+
+
+# ========== VISTAS DE INFORMACIÓN GENERAL ==========
+
+async def _services_summary():
+    services = Service.objects.filter(is_active=True)
+    return {
+        'total_services': await services.acount(),
+        'services': ServiceSerializer(await _alist(services[:10]), many=True).data,
+    }
+
+
+async def _professionals_summary():
+    professionals = Professional.objects.filter(is_active=True)
+    return {
+        'total_professionals': await professionals.acount(),
+        'professionals': ProfessionalListSerializer.values_data(await _alist(
+            ProfessionalListSerializer.values_queryset(professionals)[:10]
+        )),
+    }
+
+
+async def _home_data():
+    branches = Branch.objects.filter(is_active=True)
+    services = Service.objects.filter(is_active=True)[:10]
+    professionals = Professional.objects.filter(is_active=True)
+
+    return {
+        'branches': BranchListSerializer.values_data(
+            await _alist(BranchListSerializer.values_queryset(branches))
+        ),
+        'services': ServiceSerializer(await _alist(services), many=True).data,
+        'professionals': ProfessionalListSerializer.values_data(await _alist(
+            ProfessionalListSerializer.values_queryset(professionals)[:10]
+        )),
+    }
+
+
+class AsyncCachedView(AsyncAPIView):
+    """
+    Como core.views._cached_json: respuesta pre-renderizada desde la caché del
+    catálogo (compartida con las vistas sync), con `build` async ante un miss.
+    """
+
+    name = None
+    models = ()
+    build = None
+
+    async def get(self, request):
+        renderer = request.accepted_renderer
+        etag = make_etag(self.name, renderer.format, catalog.versions(self.models))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                await catalog.acached_content(self.name, self.models, type(self).build, renderer),
+                content_type=renderer.media_type,
+            )
+        return set_validators(response, etag)
+
+
+class AsyncHomeView(AsyncCachedView):
+    """GET /api/async/home/"""
+    name = 'home'
+    models = catalog.MODELS
+    build = _home_data
+
+
+class AsyncServicesSummaryView(AsyncCachedView):
+    """GET /api/async/services/summary/"""
+    name = 'services_summary'
+    models = [catalog.SERVICE]
+    build = _services_summary
+
+
+class AsyncProfessionalsSummaryView(AsyncCachedView):
+    """GET /api/async/professionals/summary/"""
+    name = 'professionals_summary'
+    models = [catalog.PROFESSIONAL]
+    build = _professionals_summary
+
+
+# ========== DISPONIBILIDAD ==========
+
+class AsyncAvailabilityView(AsyncAPIView):
+    """
+    GET /api/async/availability/?branch={id}&service={id}
+    Mismos parámetros y respuesta que /api/availability/. El cálculo lee y
+    completa los mapas de bits con código sync: corre en el hilo del request.
+    """
+
+    async def get(self, request):
+        return await sync_to_async(views.AvailabilityView().get)(request)
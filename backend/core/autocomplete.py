@@ -0,0 +1,160 @@
+"""
+Autocompletado del buscador de turnos.
+
+Cada proceso tiene en memoria un índice de prefijos (listas ordenadas que se
+recorren con bisect) con los nombres de sucursales, servicios, profesionales
+y las especialidades. Una consulta nunca toca la base de datos:
+
+- Si la versión del catálogo (core.catalog) no cambió, se usa el índice local.
+- Si cambió, se arma desde las entradas que otro proceso dejó en la caché.
+- Si tampoco están en la caché, se regeneran en un hilo aparte (uno solo a la
+  vez) y mientras tanto se responde con el índice anterior.
+- El servidor lo arma al arrancar (warm(), desde wsgi.py y asgi.py); hasta
+  que esté listo las consultas no devuelven sugerencias.
+"""
+
+import re
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from . import catalog
+from .models import Branch, Professional, Service
+from .search import normalize
+
+ENTRIES_KEY = 'core:autocomplete:{versions}'
+LOCK_KEY = 'core:autocomplete:lock:{versions}'
+LOCK_SECONDS = 60
+
+# Orden de los tipos cuando empatan (primero lo que más se busca)
+TYPE_ORDER = {'service': 0, 'professional': 1, 'specialty': 2, 'branch': 3}
+
+
+class PrefixIndex:
+    """
+    Índice de prefijos sobre etiquetas normalizadas.
+    Las coincidencias al principio de la etiqueta van antes que las que
+    empiezan en otra palabra (ej: "gom" -> "Martín Gómez").
+    """
+
+    def __init__(self, entries):
+        heads, words = [], []
+        for position, (kind, object_id, label) in enumerate(entries):
+            text = normalize(label)
+            item = (kind, object_id, label)
+            heads.append((text, TYPE_ORDER.get(kind, 9), position, item))
+            for match in re.finditer(r'\w+', text):
+                if match.start() > 0:
+                    words.append((text[match.start():], TYPE_ORDER.get(kind, 9), position, item))
+        heads.sort()
+        words.sort()
+        self.levels = [
+            ([key for key, *_ in heads], [item for *_, item in heads]),
+            ([key for key, *_ in words], [item for *_, item in words]),
+        ]
+
+    def search(self, prefix, limit):
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+        results, seen = [], set()
+        for keys, items in self.levels:
+            index = bisect_left(keys, prefix)
+            while index < len(keys) and keys[index].startswith(prefix):
+                kind, object_id, label = items[index]
+                identity = (kind, object_id if object_id is not None else normalize(label))
+                if identity not in seen:
+                    seen.add(identity)
+                    results.append({'type': kind, 'id': object_id, 'label': label})
+                    if len(results) >= limit:
+                        return results
+                index += 1
+        return results
+
+
+def build_entries():
+    """Entradas del índice leídas de la base: [(tipo, id, etiqueta)]"""
+    entries = [
+        ('branch', pk, name)
+        for pk, name in Branch.objects.filter(is_active=True).values_list('id', 'name')
+    ]
+    entries += [
+        ('service', pk, name)
+        for pk, name in Service.objects.filter(is_active=True).values_list('id', 'name')
+    ]
+    specialties = {}
+    for pk, first_name, last_name, text in Professional.objects.filter(
+        is_active=True
+    ).values_list('id', 'first_name', 'last_name', 'specialties'):
+        entries.append(('professional', pk, f'{first_name} {last_name}'.strip()))
+        for specialty in re.split(r'[,;\n]', text or ''):
+            specialty = specialty.strip()
+            if specialty:
+                specialties.setdefault(normalize(specialty), specialty)
+    entries += [('specialty', None, label) for label in specialties.values()]
+    return entries
+
+
+# Índice del proceso: (versión del catálogo, PrefixIndex)
+_state = {'version': None, 'index': PrefixIndex([])}
+_lock = threading.Lock()
+
+
+def refresh(version=None):
+    """Regenera las entradas desde la base, las deja en la caché y las carga"""
+    version = version or catalog.versions()
+    entries = build_entries()
+    cache.set(ENTRIES_KEY.format(versions=version), entries, settings.CATALOG_CACHE_SECONDS)
+    _install(version, entries)
+
+
+def _install(version, entries):
+    index = PrefixIndex(entries)
+    with _lock:
+        _state['version'] = version
+        _state['index'] = index
+
+
+def _refresh_in_background(version):
+    """Regenera en otro hilo; solo un proceso lo hace por versión"""
+    lock = LOCK_KEY.format(versions=version)
+    if not cache.add(lock, 1, LOCK_SECONDS):
+        return
+
+    def run():
+        try:
+            refresh(version)
+        finally:
+            cache.delete(lock)
+            connection.close()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def get_index():
+    """Índice de prefijos vigente, sin consultar la base"""
+    version = catalog.versions()
+    if _state['version'] != version:
+        entries = cache.get(ENTRIES_KEY.format(versions=version))
+        if entries is not None:
+            _install(version, entries)
+        else:
+            _refresh_in_background(version)
+    return _state['index']
+
+
+def warm():
+    """Arma el índice en segundo plano al arrancar el proceso"""
+    version = catalog.versions()
+    entries = cache.get(ENTRIES_KEY.format(versions=version))
+    if entries is not None:
+        _install(version, entries)
+    else:
+        _refresh_in_background(version)
+
+
+def suggest(text, limit):
+    return get_index().search(text, limit)
@@ -0,0 +1,537 @@
+"""
+Motor de disponibilidad de turnos.
+
+Combina la ventana de atención de la sucursal, los horarios semanales de cada
+profesional (ProfessionalSchedule) y sus bloqueos (ProfessionalUnavailability)
+mediante aritmética de intervalos. Cada consulta hace una query por tabla para
+todo el rango pedido, sin importar la cantidad de días o profesionales.
+
+El resultado se materializa en AvailabilityBitmap (un mapa de bits por
+profesional, sucursal y fecha), que las señales mantienen actualizado; las
+lecturas solo combinan mapas de bits. Los turnos tomados no se materializan:
+cambian demasiado seguido, así que se leen en cada consulta (una query
+indexada) y se restan como máscaras, igual que las retenciones temporales
+(core.holds) que están en la caché.
+"""
+
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import bitmaps, offerings
+from .capacity import full_masks
+from .holds import held_masks
+from .intervals import (
+    intersect_intervals,
+    merge_intervals,
+    minutes_to_str,
+    subtract_intervals,
+    time_to_minutes,
+)
+from .models import (
+    Appointment,
+    AvailabilityBitmap,
+    Professional,
+    ProfessionalSchedule,
+    ProfessionalUnavailability,
+)
+
+
+def get_slot_minutes():
+    """Granularidad de los horarios de inicio ofrecidos"""
+    return settings.BOOKING_SLOT_MINUTES
+
+
+def horizon():
+    """Rango de fechas (inclusive) que se mantiene materializado"""
+    today = timezone.localdate()
+    return today, today + timedelta(days=settings.AVAILABILITY_HORIZON_DAYS - 1)
+
+
+def daterange(date_from, date_to):
+    """Itera las fechas entre date_from y date_to inclusive"""
+    for offset in range((date_to - date_from).days + 1):
+        yield date_from + timedelta(days=offset)
+
+
+def professionals_for(branch, service):
+    """Profesionales activos que trabajan en la sucursal y ofrecen el servicio"""
+    return offerings.filter_professionals(
+        Professional.objects.filter(is_active=True),
+        branch_id=branch.pk,
+        service_id=service.pk,
+    )
+
+
+def branch_window(branch, day):
+    """Intervalo de atención de la sucursal para una fecha (o lista vacía)"""
+    if not branch.is_open_on_day(day.weekday()):
+        return []
+    start = time_to_minutes(branch.opening_time)
+    end = time_to_minutes(branch.closing_time)
+    return [(start, end)] if start < end else []
+
+
+def free_intervals(branch, professional_ids, date_from, date_to):
+    """
+    Intervalos libres por profesional y fecha.
+    Retorna {professional_id: {fecha: [(inicio, fin), ...]}} con solo los días
+    que tienen algún intervalo libre.
+    """
+    professional_ids = list(professional_ids)
+    if not professional_ids:
+        return {}
+
+    # Horarios semanales: (profesional, día de semana) -> intervalo
+    schedules = {}
+    for schedule in ProfessionalSchedule.objects.filter(
+        branch=branch,
+        professional_id__in=professional_ids,
+        is_active=True,
+    ).only('professional_id', 'weekday', 'start_time', 'end_time'):
+        schedules[(schedule.professional_id, schedule.weekday)] = (
+            time_to_minutes(schedule.start_time),
+            time_to_minutes(schedule.end_time),
+        )
+
+    # Bloqueos que se superponen con el rango pedido (índice en memoria)
+    trees = ProfessionalUnavailability.objects.interval_trees(professional_ids)
+    blocks = {
+        professional_id: tree.overlapping(date_from, date_to)
+        for professional_id, tree in trees.items()
+    }
+
+    result = {}
+    for day in daterange(date_from, date_to):
+        window = branch_window(branch, day)
+        if not window:
+            continue
+        weekday = day.weekday()
+
+        for professional_id in professional_ids:
+            shift = schedules.get((professional_id, weekday))
+            if shift is None:
+                continue
+
+            free = intersect_intervals(window, [shift])
+            if not free:
+                continue
+
+            cuts = []
+            for block in blocks.get(professional_id, ()):
+                blocked = block.blocked_minutes_on(day)
+                if blocked:
+                    cuts.append(blocked)
+            if cuts:
+                free = subtract_intervals(free, merge_intervals(cuts))
+
+            if free:
+                result.setdefault(professional_id, {})[day] = free
+
+    return result
+
+
+def earliest_start(day, now):
+    """
+    Primer minuto reservable de una fecha según la hora actual.
+    Retorna None si la fecha ya pasó.
+    """
+    today = now.date()
+    if day < today:
+        return None
+    if day > today:
+        return 0
+    return now.hour * 60 + now.minute + 1
+
+
+def compute_bitmaps(branch, professional_ids, date_from, date_to):
+    """
+    Calcula desde los horarios los mapas de bits de cada profesional y fecha.
+    Retorna {(professional_id, fecha): bits}, incluidos los días sin lugar.
+    """
+    free = free_intervals(branch, professional_ids, date_from, date_to)
+    return {
+        (professional_id, day): bitmaps.from_intervals(
+            free.get(professional_id, {}).get(day, ())
+        )
+        for professional_id in professional_ids
+        for day in daterange(date_from, date_to)
+    }
+
+
+def store_bitmaps(branch, computed):
+    """Inserta o actualiza los mapas de bits calculados"""
+    rows = [
+        AvailabilityBitmap(
+            professional_id=professional_id,
+            branch=branch,
+            date=day,
+            bits=bitmaps.to_bytes(bits),
+        )
+        for (professional_id, day), bits in computed.items()
+    ]
+    AvailabilityBitmap.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['branch', 'date', 'professional'],
+        update_fields=['bits', 'updated_at'],
+    )
+
+
+def refresh_bitmaps(branch, professional_ids, dates):
+    """
+    Recalcula y guarda solo las fechas indicadas que caen dentro del horizonte.
+    Usado por las señales para el mantenimiento incremental.
+    """
+    start, end = horizon()
+    dates = sorted(day for day in set(dates) if start <= day <= end)
+    professional_ids = list(professional_ids)
+    if not dates or not professional_ids:
+        return
+
+    computed = compute_bitmaps(branch, professional_ids, dates[0], dates[-1])
+    wanted = set(dates)
+    store_bitmaps(branch, {
+        key: bits for key, bits in computed.items() if key[1] in wanted
+    })
+
+
+def load_bitmaps(branch, professional_ids, date_from, date_to):
+    """
+    Mapas de bits de disponibilidad {(professional_id, fecha): bits}.
+    Lee los materializados y completa (y guarda, si están en el horizonte)
+    los que falten.
+    """
+    professional_ids = list(professional_ids)
+    if not professional_ids:
+        return {}
+
+    result = {
+        (professional_id, day): bitmaps.from_bytes(bits)
+        for professional_id, day, bits in AvailabilityBitmap.objects.filter(
+            branch=branch,
+            professional_id__in=professional_ids,
+            date__range=(date_from, date_to),
+        ).values_list('professional_id', 'date', 'bits')
+    }
+
+    missing = [
+        (professional_id, day)
+        for professional_id in professional_ids
+        for day in daterange(date_from, date_to)
+        if (professional_id, day) not in result
+    ]
+    if missing:
+        missing_ids = {professional_id for professional_id, _ in missing}
+        missing_days = [day for _, day in missing]
+        computed = compute_bitmaps(branch, missing_ids, min(missing_days), max(missing_days))
+        computed = {key: computed[key] for key in missing}
+        result.update(computed)
+
+        start, end = horizon()
+        store_bitmaps(branch, {
+            key: bits for key, bits in computed.items() if start <= key[1] <= end
+        })
+
+    return result
+
+
+def booked_masks(professional_ids, date_from, date_to):
+    """
+    Bloques ocupados por turnos activos de cada profesional, en cualquier
+    sucursal: {(professional_id, fecha): bits}.
+    """
+    masks = {}
+    for professional_id, day, start, end in Appointment.objects.filter(
+        professional_id__in=list(professional_ids),
+        date__range=(date_from, date_to),
+        status__in=Appointment.ACTIVE_STATUSES,
+    ).values_list('professional_id', 'date', 'start_time', 'end_time'):
+        key = (professional_id, day)
+        masks[key] = masks.get(key, 0) | bitmaps.cover_intervals(
+            [(time_to_minutes(start), time_to_minutes(end))]
+        )
+    return masks
+
+
+def load_free_bits(branch, professional_ids, date_from, date_to):
+    """
+    Bloques reservables {(professional_id, fecha): bits}: disponibilidad
+    materializada menos turnos tomados, retenciones vigentes y
+    bloques sin sillas libres. Solo incluye las claves con algún bloque libre.
+    """
+    professional_ids = list(professional_ids)
+    day_bits = load_bitmaps(branch, professional_ids, date_from, date_to)
+    booked = booked_masks(professional_ids, date_from, date_to)
+    held = held_masks(professional_ids, daterange(date_from, date_to))
+    chairs_full = full_masks(branch, date_from, date_to)
+
+    result = {}
+    for key, bits in day_bits.items():
+        bits &= ~booked.get(key, 0) & ~held.get(key, 0) & ~chairs_full.get(key[1], 0)
+        if bits:
+            result[key] = bits
+    return result
+
+
+def available_slots(branch, service, date_from, date_to, professionals=None, now=None):
+    """
+    Horarios de inicio reservables por profesional.
+
+    Retorna una lista con un elemento por profesional:
+    {'professional_id', 'full_name', 'days': [{'date', 'slots': ['HH:MM', ...]}]}
+    """
+    if professionals is None:
+        professionals = professionals_for(branch, service)
+    professionals = list(professionals)
+    now = timezone.localtime(now)
+
+    step = get_slot_minutes()
+    duration = service.duration_minutes
+    day_bits = load_free_bits(branch, [p.id for p in professionals], date_from, date_to)
+
+    result = []
+    for professional in professionals:
+        days = []
+        for day in daterange(date_from, date_to):
+            not_before = earliest_start(day, now)
+            bits = day_bits.get((professional.id, day), 0)
+            if not_before is None or not bits:
+                continue
+            starts = bitmaps.start_slots(bits, duration, step, not_before)
+            if starts:
+                days.append({
+                    'date': day.isoformat(),
+                    'slots': [minutes_to_str(start) for start in starts],
+                })
+
+        result.append({
+            'professional_id': professional.id,
+            'full_name': professional.get_full_name(),
+            'days': days,
+        })
+
+    return result
+
+
+def start_grids(branch, service, date_from, date_to, professionals=None, now=None):
+    """
+    Horarios de inicio reservables como grillas de bits: una por día, donde el
+    bit i indica un inicio a los i * get_slot_minutes() minutos.
+
+    Retorna [(profesional, [grilla por día])], en el orden de `professionals`.
+    """
+    if professionals is None:
+        professionals = professionals_for(branch, service)
+    professionals = list(professionals)
+    now = timezone.localtime(now)
+
+    step = get_slot_minutes()
+    duration = service.duration_minutes
+    day_bits = load_free_bits(branch, [p.id for p in professionals], date_from, date_to)
+    limits = [(day, earliest_start(day, now)) for day in daterange(date_from, date_to)]
+
+    result = []
+    for professional in professionals:
+        grids = []
+        for day, not_before in limits:
+            bits = day_bits.get((professional.id, day), 0)
+            if not_before is None or not bits:
+                grids.append(0)
+                continue
+            starts = bitmaps.start_mask(bits, duration, step, not_before)
+            grids.append(bitmaps.to_grid(starts, step))
+        result.append((professional, grids))
+
+    return result
+
+
+class BitmapWindow:
+    """
+    Acceso perezoso a los mapas de bits de varios profesionales.
+    Carga bloques de `chunk_days` días para todos a la vez (una query por
+    bloque) recién cuando algún profesional los necesita.
+    """
+
+    def __init__(self, branch, professional_ids, date_from, date_to, chunk_days=7):
+        self.branch = branch
+        self.professional_ids = list(professional_ids)
+        self.date_from = date_from
+        self.date_to = date_to
+        self.chunk_days = chunk_days
+        self.loaded = {}
+        self.chunks = set()
+
+    def get(self, professional_id, day):
+        """Bloques reservables del profesional en la fecha"""
+        chunk = (day - self.date_from).days // self.chunk_days
+        if chunk not in self.chunks:
+            start = self.date_from + timedelta(days=chunk * self.chunk_days)
+            end = min(start + timedelta(days=self.chunk_days - 1), self.date_to)
+            self.loaded.update(load_free_bits(self.branch, self.professional_ids, start, end))
+            self.chunks.add(chunk)
+        return self.loaded.get((professional_id, day), 0)
+
+
+def slot_stream(window, professional_id, duration, step, now):
+    """Genera (fecha, minuto, professional_id) en orden cronológico"""
+    for day in daterange(window.date_from, window.date_to):
+        not_before = earliest_start(day, now)
+        if not_before is None:
+            continue
+        bits = window.get(professional_id, day)
+        if not bits:
+            continue
+        for start in bitmaps.start_slots(bits, duration, step, not_before):
+            yield (day, start, professional_id)
+
+
+def first_available(branch, service, count, professionals=None, now=None):
+    """
+    Los primeros `count` turnos libres con cualquier profesional.
+    Mezcla los flujos de cada profesional con un heap y se detiene al llegar a
+    `count`, sin calcular el calendario completo de nadie.
+    """
+    if professionals is None:
+        professionals = professionals_for(branch, service)
+    professionals = {p.id: p for p in professionals}
+    now = timezone.localtime(now)
+
+    date_from, date_to = horizon()
+    window = BitmapWindow(branch, professionals, date_from, date_to)
+    streams = [
+        slot_stream(window, professional_id, service.duration_minutes, get_slot_minutes(), now)
+        for professional_id in professionals
+    ]
+
+    return [
+        {
+            'date': day.isoformat(),
+            'time': minutes_to_str(start),
+            'professional_id': professional_id,
+            'full_name': professionals[professional_id].get_full_name(),
+        }
+        for day, start, professional_id in islice(heapq.merge(*streams), count)
+    ]
+
+
+def _fewest_handoffs(candidates):
+    """
+    Elige un profesional por servicio minimizando los cambios de profesional.
+    `candidates` es una lista (por servicio) de conjuntos de profesionales.
+    Programación dinámica: O(servicios x profesionales^2).
+    """
+    # costo[p] = (cambios, camino) del mejor itinerario que termina con p
+    best = {p: (0, [p]) for p in sorted(candidates[0])}
+    for options in candidates[1:]:
+        step = {}
+        for p in sorted(options):
+            handoffs, path = min(
+                (cost + (previous != p), path)
+                for previous, (cost, path) in best.items()
+            )
+            step[p] = (handoffs, path + [p])
+        best = step
+    return min(best.values())[1]
+
+
+def bundle_slots(branch, services, date_from, date_to, same_professional=False, limit=50, now=None):
+    """
+    Itinerarios para hacer varios servicios seguidos en una visita.
+
+    Para cada servicio se calcula, por profesional, la máscara de inicios
+    posibles; desplazándolas por el tiempo acumulado de los servicios previos y
+    combinándolas con AND/OR se obtienen los inicios factibles de todo el
+    paquete sin enumerar combinaciones. Solo para esos inicios se elige la
+    asignación de profesionales (la de menos cambios).
+    """
+    now = timezone.localtime(now)
+    step = get_slot_minutes()
+
+    qualified = [
+        set(professionals_for(branch, service).values_list('id', flat=True))
+        for service in services
+    ]
+    if same_professional:
+        common = set.intersection(*qualified)
+        qualified = [common for _ in services]
+
+    professional_ids = set().union(*qualified)
+    names = {
+        p.id: p.get_full_name()
+        for p in Professional.objects.filter(id__in=professional_ids).only('first_name', 'last_name')
+    }
+    day_bits = load_free_bits(branch, professional_ids, date_from, date_to)
+
+    # Desplazamiento (en bloques) del inicio de cada servicio
+    lengths = [bitmaps.slots_for(service.duration_minutes) for service in services]
+    offsets = [sum(lengths[:i]) for i in range(len(services))]
+
+    result = []
+    for day in daterange(date_from, date_to):
+        not_before = earliest_start(day, now)
+        if not_before is None:
+            continue
+
+        # fits[i][p]: bits de inicio del paquete en que p puede hacer el servicio i
+        fits = []
+        for i, options in enumerate(qualified):
+            fits.append({})
+            for p in options:
+                free = day_bits.get((p, day), 0)
+                bits = bitmaps.fit_mask(free, lengths[i]) >> offsets[i]
+                if bits:
+                    fits[i][p] = bits
+
+        if same_professional:
+            starts = 0
+            for p in qualified[0]:
+                mask = bitmaps.FULL_DAY
+                for i in range(len(services)):
+                    mask &= fits[i].get(p, 0)
+                starts |= mask
+        else:
+            starts = bitmaps.FULL_DAY
+            for per_professional in fits:
+                union = 0
+                for bits in per_professional.values():
+                    union |= bits
+                starts &= union
+
+        starts &= bitmaps.step_mask(step)
+        starts &= ~bitmaps.range_mask(0, bitmaps.slots_for(not_before))
+
+        for index in bitmaps.iter_set_bits(starts):
+            candidates = [
+                {p for p, bits in per_professional.items() if bits >> index & 1}
+                for per_professional in fits
+            ]
+            path = _fewest_handoffs(candidates)
+            start = index * bitmaps.SLOT_MINUTES
+            steps = [
+                {
+                    'service_id': service.id,
+                    'professional_id': p,
+                    'full_name': names[p],
+                    'start': minutes_to_str(start + offsets[i] * bitmaps.SLOT_MINUTES),
+                    'end': minutes_to_str(
+                        start + offsets[i] * bitmaps.SLOT_MINUTES + service.duration_minutes
+                    ),
+                }
+                for i, (service, p) in enumerate(zip(services, path))
+            ]
+            result.append({
+                'date': day.isoformat(),
+                'start': minutes_to_str(start),
+                # El último servicio termina a su duración real, no al final del bloque
+                'end': steps[-1]['end'],
+                'steps': steps,
+            })
+            if len(result) >= limit:
+                return result
+
+    return result
@@ -0,0 +1,98 @@
+"""
+Varias consultas GET de la API en un solo viaje (POST /api/batch/).
+
+Cada sub-consulta se resuelve con el mismo urlconf y se ejecuta en el mismo
+proceso, hilo y conexión a la base, una después de otra. El usuario ya
+autenticado en el batch se reutiliza (no se vuelve a validar el token en cada
+una) y cada vista aplica sus propios permisos, así que el resultado es el
+mismo que pedir cada URL por separado. Las vistas async (core.async_views) se
+esperan con async_to_sync.
+"""
+
+import json
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+
+API_PREFIX = '/api/'
+
+# Headers de la consulta original que se pasan a cada sub-consulta
+FORWARDED_META = (
+    'HTTP_HOST',
+    'SERVER_NAME',
+    'SERVER_PORT',
+    'REMOTE_ADDR',
+    'HTTP_USER_AGENT',
+    'HTTP_ACCEPT_LANGUAGE',
+)
+
+# Headers de la respuesta que se devuelven con cada resultado
+RETURNED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+
+
+def normalize_path(path):
+    """Acepta rutas con o sin /api (ej: '/branches/' o '/api/branches/')"""
+    if not path.startswith(API_PREFIX):
+        path = API_PREFIX.rstrip('/') + '/' + path.lstrip('/')
+    return path
+
+
+def build_request(request, url, if_none_match=None):
+    """HttpRequest GET para `url` con la autenticación de `request`"""
+    parts = urlsplit(normalize_path(url))
+    sub = HttpRequest()
+    sub.method = 'GET'
+    sub.path = sub.path_info = parts.path
+    sub.META = {
+        key: request.META[key] for key in FORWARDED_META if key in request.META
+    }
+    sub.META.update({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': parts.path,
+        'QUERY_STRING': parts.query,
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.url_scheme': request.scheme,
+    })
+    if if_none_match:
+        sub.META['HTTP_IF_NONE_MATCH'] = if_none_match
+    sub.GET = QueryDict(parts.query)
+
+    # DRF usa estos atributos en lugar de los autenticadores de la vista
+    if request.user and request.user.is_authenticated:
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+    return sub
+
+
+def run(request, item, batch_view):
+    """Ejecuta una sub-consulta y devuelve su resultado serializable"""
+    result = {'id': item.get('id'), 'path': item['path']}
+    sub = build_request(request, item['path'], item.get('if_none_match'))
+    try:
+        match = resolve(sub.path_info)
+    except Resolver404:
+        return {**result, 'status': 404, 'headers': {}, 'body': {'error': 'Ruta inexistente.'}}
+    if getattr(match.func, 'view_class', None) is batch_view:
+        return {**result, 'status': 400, 'headers': {}, 'body': {'error': 'No se puede anidar un batch.'}}
+
+    view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+    response = view(sub, *match.args, **match.kwargs)
+    return {
+        **result,
+        'status': response.status_code,
+        'headers': {name: response[name] for name in RETURNED_HEADERS if response.has_header(name)},
+        'body': _body(response),
+    }
+
+
+def _body(response):
+    # Las respuestas de DRF traen los datos sin renderizar
+    data = getattr(response, 'data', None)
+    if data is not None:
+        return data
+    if response.status_code == 304 or not response.content:
+        return None
+    # Respuestas pre-renderizadas (ej: home)
+    return json.loads(response.content)
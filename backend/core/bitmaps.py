@@ -0,0 +1,166 @@
+"""
+Codificación de la disponibilidad diaria como mapa de bits.
+
+Cada día se divide en bloques de SLOT_MINUTES minutos; el bit i vale 1 si el
+bloque [i * SLOT_MINUTES, (i + 1) * SLOT_MINUTES) está libre. En memoria el
+mapa es un int de Python, así que combinar disponibilidades es un AND bit a bit.
+"""
+
+import base64
+from functools import lru_cache
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+BITMAP_BYTES = SLOTS_PER_DAY // 8
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+
+def to_bytes(bits):
+    """Serializa un mapa de bits para guardarlo en la base"""
+    return bits.to_bytes(BITMAP_BYTES, 'little')
+
+
+def from_bytes(data):
+    """Deserializa un mapa de bits guardado en la base"""
+    return int.from_bytes(bytes(data), 'little')
+
+
+def slots_for(minutes):
+    """Cantidad de bloques necesarios para cubrir `minutes` minutos"""
+    return -(-minutes // SLOT_MINUTES)
+
+
+def range_mask(start, end):
+    """Mapa con los bloques [start, end) en 1 (índices de bloque)"""
+    if start >= end:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def from_intervals(intervals):
+    """
+    Convierte intervalos libres (minutos) en un mapa de bits.
+    Solo se marcan los bloques completamente libres.
+    """
+    bits = 0
+    for start, end in intervals:
+        bits |= range_mask(slots_for(start), end // SLOT_MINUTES)
+    return bits
+
+
+def cover_intervals(intervals):
+    """
+    Convierte intervalos ocupados (minutos) en un mapa de bits.
+    Se marcan todos los bloques que tocan algún intervalo.
+    """
+    bits = 0
+    for start, end in intervals:
+        bits |= range_mask(start // SLOT_MINUTES, slots_for(end))
+    return bits
+
+
+def to_intervals(bits):
+    """Convierte un mapa de bits en intervalos libres (minutos)"""
+    intervals = []
+    index = 0
+    while bits:
+        # Saltar ceros
+        zeros = (bits & -bits).bit_length() - 1
+        bits >>= zeros
+        index += zeros
+        # Contar unos consecutivos
+        ones = (~bits & (bits + 1)).bit_length() - 1
+        intervals.append((index * SLOT_MINUTES, (index + ones) * SLOT_MINUTES))
+        bits >>= ones
+        index += ones
+    return intervals
+
+
+def fit_mask(bits, length):
+    """
+    Bits de inicio donde hay `length` bloques libres consecutivos.
+    Usa desplazamientos por duplicación: O(log length) operaciones.
+    """
+    if length <= 0:
+        return bits
+    run, span = bits, 1
+    while span < length:
+        shift = min(span, length - span)
+        run &= run >> shift
+        span += shift
+    return run
+
+
+def check_step(step_minutes):
+    """
+    Los inicios se alinean a bloques: el paso tiene que ser un múltiplo
+    positivo de SLOT_MINUTES (lo verifica también el system check core.E001).
+    """
+    if step_minutes <= 0 or step_minutes % SLOT_MINUTES:
+        raise ValueError(
+            f'El paso de los horarios ({step_minutes} min) tiene que ser un '
+            f'múltiplo de {SLOT_MINUTES} minutos.'
+        )
+    return step_minutes // SLOT_MINUTES
+
+
+@lru_cache(maxsize=None)
+def step_mask(step_minutes):
+    """Mapa con 1 en los bloques que son múltiplos de `step_minutes`"""
+    stride = check_step(step_minutes)
+    bits = 0
+    for index in range(0, SLOTS_PER_DAY, stride):
+        bits |= 1 << index
+    return bits
+
+
+def iter_set_bits(bits):
+    """Índices de los bits en 1, en orden creciente"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def start_mask(bits, duration_minutes, step_minutes, not_before=0):
+    """
+    Bloques de inicio donde entra un turno de `duration_minutes`, alineados a
+    `step_minutes` y no antes de `not_before`.
+    """
+    starts = fit_mask(bits, slots_for(duration_minutes)) & step_mask(step_minutes)
+    if not_before > 0:
+        starts &= ~range_mask(0, slots_for(not_before))
+    return starts
+
+
+def start_slots(bits, duration_minutes, step_minutes, not_before=0):
+    """Minutos de inicio de start_mask"""
+    starts = start_mask(bits, duration_minutes, step_minutes, not_before)
+    return [index * SLOT_MINUTES for index in iter_set_bits(starts)]
+
+
+def to_grid(starts, step_minutes):
+    """
+    Pasa una máscara de inicios alineados a `step_minutes` a la grilla de ese
+    paso: el bit i vale 1 si hay inicio a los i * step_minutes minutos.
+    """
+    stride = check_step(step_minutes)
+    grid = 0
+    for index in iter_set_bits(starts):
+        grid |= 1 << (index // stride)
+    return grid
+
+
+def grid_bytes(step_minutes):
+    """Bytes por día de una grilla de `step_minutes`"""
+    return -(-(24 * 60 // step_minutes) // 8)
+
+
+def encode_grids(grids, step_minutes):
+    """
+    Codifica en base64 varias grillas diarias seguidas, cada una ocupando
+    grid_bytes(step_minutes) bytes little-endian.
+    """
+    size = grid_bytes(step_minutes)
+    data = b''.join(grid.to_bytes(size, 'little') for grid in grids)
+    return base64.b64encode(data).decode('ascii')
@@ -0,0 +1,139 @@
+"""
+Reserva de turnos.
+
+Cada reserva toma con SELECT ... FOR UPDATE la fila de la sucursal y la del
+profesional dentro de una transacción. Las reservas que compiten por la misma
+sucursal se serializan entre sí (hace falta para respetar las sillas), pero no
+bloquean a las de otras sucursales: no hay un lock global. La restricción única
+de Appointment es una segunda barrera a nivel base de datos.
+
+Antes de confirmar, el cliente puede retener el horario unos minutos
+(core.holds); la reserva respeta las retenciones de otros clientes y libera la
+propia una vez confirmada.
+"""
+
+from datetime import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from users.models import UserProfile
+
+from . import bitmaps, holds
+from .availability import load_bitmaps, load_free_bits
+from .capacity import ChairOccupancy, booked_intervals
+from .intervals import time_to_minutes
+from .models import Appointment, Branch, Professional
+
+
+class SlotUnavailable(Exception):
+    """El horario pedido ya no se puede reservar"""
+
+
+def _slot_bounds(service, start_time):
+    """Inicio y fin del turno en minutos"""
+    start = time_to_minutes(start_time)
+    end = start + service.duration_minutes
+    # time() no representa las 24:00: el turno tiene que terminar antes
+    if end >= 24 * 60:
+        raise SlotUnavailable('El turno tiene que terminar antes de la medianoche.')
+    return start, end
+
+
+def hold_slot(client, branch, professional, service, day, start_time):
+    """
+    Retiene un horario libre para el cliente durante BOOKING_HOLD_SECONDS.
+    No toma locks ni escribe en la base: la confirmación vuelve a validar todo.
+    Lanza SlotUnavailable si el horario no está libre o ya está retenido.
+    """
+    start, end = _slot_bounds(service, start_time)
+
+    # Liberar antes la retención anterior del cliente, que podría ser este horario
+    holds.release_client_hold(client)
+
+    free = load_free_bits(branch, [professional.id], day, day).get((professional.id, day), 0)
+    wanted = bitmaps.range_mask(start // bitmaps.SLOT_MINUTES, bitmaps.slots_for(end))
+    if free & wanted != wanted:
+        raise SlotUnavailable('El horario ya no está disponible.')
+
+    try:
+        return holds.create_hold(client, branch, professional, service, day, start, end)
+    except holds.HoldConflict as e:
+        raise SlotUnavailable(str(e))
+
+
+def book_appointment(client, branch, professional, service, day, start_time, notes='', hold=None):
+    """
+    Reserva un turno verificando, bajo lock, la agenda del profesional, sus
+    turnos tomados, las retenciones de otros clientes y las sillas de la
+    sucursal. `hold` es el token de una retención del propio cliente.
+    Lanza SlotUnavailable si el horario no está libre.
+    """
+    start, end = _slot_bounds(service, start_time)
+    end_time = time(end // 60, end % 60)
+
+    # Solo cuenta la retención si es del cliente
+    held = holds.get_hold(hold, client)
+    token = held['token'] if held else None
+
+    try:
+        with transaction.atomic():
+            # Orden fijo de locks (sucursal, profesional) para evitar deadlocks
+            branch = Branch.objects.select_for_update().get(pk=branch.pk)
+            professional = Professional.objects.select_for_update().get(pk=professional.pk)
+
+            # Agenda del profesional (horarios y bloqueos)
+            free = load_bitmaps(branch, [professional.id], day, day).get((professional.id, day), 0)
+            wanted = bitmaps.range_mask(start // bitmaps.SLOT_MINUTES, bitmaps.slots_for(end))
+            if free & wanted != wanted:
+                raise SlotUnavailable('El profesional no atiende en ese horario.')
+
+            # Turnos ya tomados por el profesional
+            if Appointment.objects.filter(
+                professional=professional,
+                date=day,
+                status__in=Appointment.ACTIVE_STATUSES,
+                start_time__lt=end_time,
+                end_time__gt=start_time,
+            ).exists():
+                raise SlotUnavailable('El profesional ya tiene un turno en ese horario.')
+
+            # Retenciones de otros clientes
+            if holds.held_by_others(professional.id, day, start, end, token):
+                raise SlotUnavailable('El horario está retenido por otro cliente.')
+
+            # Sillas de la sucursal (turnos y retenciones ajenas)
+            occupancy = ChairOccupancy(
+                branch.total_chairs,
+                booked_intervals(branch, day, day, exclude_hold=token).get(day, []),
+            )
+            if not occupancy.can_fit(start, end):
+                raise SlotUnavailable('No hay sillas libres en ese horario.')
+
+            appointment = Appointment.objects.create(
+                client=client,
+                professional=professional,
+                branch=branch,
+                service=service,
+                date=day,
+                start_time=start_time,
+                end_time=end_time,
+                price=service.price,
+                notes=notes,
+            )
+
+            # Sin tocar updated_at ni la versión del catálogo: solo el detalle
+            # muestra el contador y su ETag ya cuenta los turnos del profesional
+            Professional.objects.filter(pk=professional.pk).update(
+                total_appointments=F('total_appointments') + 1
+            )
+            UserProfile.objects.filter(user=client).update(
+                total_appointments=F('total_appointments') + 1
+            )
+
+            if token:
+                transaction.on_commit(lambda: holds.release_hold(token, client))
+    except IntegrityError:
+        raise SlotUnavailable('El horario acaba de ser reservado por otro cliente.')
+
+    return appointment
@@ -0,0 +1,164 @@
+"""
+Calendario de sucursal vectorizado con NumPy.
+
+Para la vista de recepción se necesita el estado de cada profesional en cada
+bloque de 5 minutos durante varios días. En lugar de recorrer horarios y
+bloqueos en Python, se cargan en arreglos y se aplican como máscaras sobre una
+matriz profesionales x días x bloques.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+from . import bitmaps
+from .capacity import full_masks
+from .holds import held_masks
+from .models import Appointment, ProfessionalSchedule, ProfessionalUnavailability
+
+# Estados de cada bloque de la matriz
+CLOSED = 0       # Sucursal cerrada o fuera del horario del profesional
+FREE = 1         # Libre para reservar
+BLOCKED = 2      # Bloqueo del profesional (vacaciones, ausencia, etc.)
+CHAIRS_FULL = 3  # La sucursal no tiene sillas libres
+BOOKED = 4       # Turno tomado
+HELD = 5         # Retenido por un cliente que todavía no confirmó
+
+STATE_LABELS = {
+    CLOSED: 'Fuera de horario',
+    FREE: 'Libre',
+    BLOCKED: 'Bloqueado',
+    CHAIRS_FULL: 'Sin sillas libres',
+    BOOKED: 'Reservado',
+    HELD: 'Retenido',
+}
+
+DAY_MINUTES = 24 * 60
+SLOT_MINUTES = bitmaps.SLOT_MINUTES
+SLOTS_PER_DAY = bitmaps.SLOTS_PER_DAY
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _bits_to_array(bits):
+    """Convierte un mapa de bits de un día en un arreglo booleano de bloques"""
+    data = np.frombuffer(bitmaps.to_bytes(bits), dtype=np.uint8)
+    return np.unpackbits(data, bitorder='little').astype(bool)
+
+
+def branch_calendar(branch, professional_ids, date_from, days):
+    """
+    Matriz de estados (profesionales x días x bloques de 5 minutos).
+    Retorna (fechas, matriz int8); las filas siguen el orden de professional_ids.
+    """
+    professional_ids = list(professional_ids)
+    index = {pid: i for i, pid in enumerate(professional_ids)}
+    dates = [date_from + timedelta(days=offset) for offset in range(days)]
+    date_to = dates[-1]
+    n_prof = len(professional_ids)
+
+    slot_start = np.arange(SLOTS_PER_DAY, dtype=np.int32) * SLOT_MINUTES
+    slot_end = slot_start + SLOT_MINUTES
+    weekdays = np.array([day.weekday() for day in dates])
+
+    # Sucursal: días abiertos x ventana de atención -> (días, bloques)
+    open_days = np.array([branch.is_open_on_day(w) for w in range(7)])[weekdays]
+    window = (slot_start >= _minutes(branch.opening_time)) & (slot_end <= _minutes(branch.closing_time))
+    branch_open = open_days[:, None] & window[None, :]
+
+    # Horarios semanales -> (profesionales, 7) con -1 si no trabaja
+    shift_start = np.full((n_prof, 7), -1, dtype=np.int32)
+    shift_end = np.full((n_prof, 7), -1, dtype=np.int32)
+    for professional_id, weekday, start, end in ProfessionalSchedule.objects.filter(
+        branch=branch,
+        professional_id__in=professional_ids,
+        is_active=True,
+    ).values_list('professional_id', 'weekday', 'start_time', 'end_time'):
+        shift_start[index[professional_id], weekday] = _minutes(start)
+        shift_end[index[professional_id], weekday] = _minutes(end)
+
+    start_pd = shift_start[:, weekdays][:, :, None]
+    end_pd = shift_end[:, weekdays][:, :, None]
+    working = (start_pd >= 0) & (slot_start >= start_pd) & (slot_end <= end_pd)
+    working &= branch_open[None, :, :]
+
+    # Bloqueos y turnos como diferencias sobre la línea de tiempo absoluta de bloques
+    total_slots = days * SLOTS_PER_DAY
+
+    def timeline(rows, starts, ends):
+        """Matriz booleana (profesionales, días, bloques) cubierta por los intervalos"""
+        diff = np.zeros((n_prof, total_slots + 1), dtype=np.int32)
+        if rows:
+            rows = np.array(rows)
+            starts = np.clip(np.array(starts), 0, total_slots)
+            ends = np.clip(np.array(ends), 0, total_slots)
+            np.add.at(diff, (rows, starts), 1)
+            np.add.at(diff, (rows, ends), -1)
+        return (np.cumsum(diff[:, :-1], axis=1) > 0).reshape(n_prof, days, SLOTS_PER_DAY)
+
+    rows, starts, ends = [], [], []
+    trees = ProfessionalUnavailability.objects.interval_trees(professional_ids)
+    for block in (
+        block
+        for tree in trees.values()
+        for block in tree.overlapping(date_from, date_to)
+    ):
+        first = (block.start_date - date_from).days * DAY_MINUTES
+        last = (block.end_date - date_from).days * DAY_MINUTES
+        if block.is_full_day():
+            last += DAY_MINUTES
+        else:
+            first += _minutes(block.start_time)
+            last += _minutes(block.end_time)
+        rows.append(index[block.professional_id])
+        starts.append(first // SLOT_MINUTES)
+        ends.append(-(-last // SLOT_MINUTES))
+
+    blocked = timeline(rows, starts, ends)
+
+    rows, starts, ends = [], [], []
+    for professional_id, day, start, end in Appointment.objects.filter(
+        professional_id__in=professional_ids,
+        date__range=(date_from, date_to),
+        status__in=Appointment.ACTIVE_STATUSES,
+    ).values_list('professional_id', 'date', 'start_time', 'end_time'):
+        offset = (day - date_from).days * DAY_MINUTES
+        rows.append(index[professional_id])
+        starts.append((offset + _minutes(start)) // SLOT_MINUTES)
+        ends.append(-(-(offset + _minutes(end)) // SLOT_MINUTES))
+    booked = timeline(rows, starts, ends)
+
+    held = np.zeros((n_prof, days, SLOTS_PER_DAY), dtype=bool)
+    for (professional_id, day), bits in held_masks(professional_ids, dates).items():
+        if professional_id in index:
+            held[index[professional_id], (day - date_from).days] = _bits_to_array(bits)
+
+    # Sillas: bloques sin lugar en la sucursal -> (días, bloques)
+    chairs_full = np.zeros((days, SLOTS_PER_DAY), dtype=bool)
+    for day, bits in full_masks(branch, date_from, date_to).items():
+        chairs_full[(day - date_from).days] = _bits_to_array(bits)
+
+    matrix = np.full((n_prof, days, SLOTS_PER_DAY), CLOSED, dtype=np.int8)
+    matrix[working] = FREE
+    matrix[working & chairs_full[None, :, :]] = CHAIRS_FULL
+    matrix[working & held] = HELD
+    matrix[working & booked] = BOOKED
+    matrix[working & blocked] = BLOCKED
+    return dates, matrix
+
+
+def free_bits(matrix_row):
+    """Mapa de bits (como core.bitmaps) de los bloques libres de un día"""
+    packed = np.packbits(matrix_row == FREE, bitorder='little')
+    return bitmaps.from_bytes(packed.tobytes())
+
+
+def encode_rows(matrix):
+    """Cada día de cada profesional como cadena de dígitos de estado"""
+    digits = (matrix + ord('0')).astype(np.uint8)
+    return [
+        [digits[p, d].tobytes().decode('ascii') for d in range(matrix.shape[1])]
+        for p in range(matrix.shape[0])
+    ]
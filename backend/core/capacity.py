@@ -0,0 +1,102 @@
+"""
+Capacidad de sillas por sucursal.
+
+Branch.total_chairs limita cuántos turnos pueden atenderse a la vez en una
+sucursal, sin importar cuántos profesionales estén trabajando. La ocupación de
+cada día se calcula con un barrido de eventos (+1 al inicio y -1 al fin de cada
+turno) sobre los turnos ya tomados y las retenciones vigentes, de modo que la
+búsqueda de horarios aplica la restricción con una máscara por día en lugar de
+contar turnos por horario.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from . import bitmaps
+from .holds import holds_by_day
+from .intervals import merge_intervals, time_to_minutes
+from .models import Appointment
+
+
+class ChairOccupancy:
+    """Ocupación de sillas de una sucursal durante un día"""
+
+    def __init__(self, chairs, intervals):
+        self.chairs = chairs
+        self.segments = self._sweep(intervals)
+        self.full = merge_intervals(
+            (start, end) for start, end, count in self.segments if count >= chairs
+        )
+
+    @staticmethod
+    def _sweep(intervals):
+        """Segmentos [(inicio, fin, sillas ocupadas)] con ocupación constante"""
+        events = defaultdict(int)
+        for start, end in intervals:
+            if start < end:
+                events[start] += 1
+                events[end] -= 1
+
+        segments = []
+        count = 0
+        previous = None
+        for point in sorted(events):
+            if previous is not None and count > 0:
+                segments.append((previous, point, count))
+            count += events[point]
+            previous = point
+        return segments
+
+    def peak(self, start, end):
+        """Máximo de sillas ocupadas en [start, end)"""
+        return max(
+            (count for seg_start, seg_end, count in self.segments
+             if seg_start < end and seg_end > start),
+            default=0,
+        )
+
+    def can_fit(self, start, end):
+        """Indica si queda al menos una silla libre durante todo [start, end)"""
+        return self.peak(start, end) < self.chairs
+
+    def full_bits(self):
+        """Bloques de 5 minutos en los que no queda ninguna silla libre"""
+        return bitmaps.cover_intervals(self.full)
+
+
+def booked_intervals(branch, date_from, date_to, exclude_hold=None):
+    """
+    Turnos activos y retenciones vigentes de la sucursal:
+    {fecha: [(inicio, fin), ...]} en minutos.
+    exclude_hold omite la retención del cliente que está confirmando.
+    """
+    booked = defaultdict(list)
+    for day, start, end in Appointment.objects.filter(
+        branch=branch,
+        date__range=(date_from, date_to),
+        status__in=Appointment.ACTIVE_STATUSES,
+    ).values_list('date', 'start_time', 'end_time'):
+        booked[day].append((time_to_minutes(start), time_to_minutes(end)))
+
+    dates = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+    for day, holds in holds_by_day(branch.id, dates, exclude=exclude_hold).items():
+        booked[day].extend((start, end) for _, start, end in holds)
+    return booked
+
+
+def occupancy_by_day(branch, date_from, date_to):
+    """Ocupación de sillas {fecha: ChairOccupancy} para los días con turnos"""
+    return {
+        day: ChairOccupancy(branch.total_chairs, intervals)
+        for day, intervals in booked_intervals(branch, date_from, date_to).items()
+    }
+
+
+def full_masks(branch, date_from, date_to):
+    """Máscaras {fecha: bits} de los bloques sin sillas libres"""
+    masks = {}
+    for day, occupancy in occupancy_by_day(branch, date_from, date_to).items():
+        bits = occupancy.full_bits()
+        if bits:
+            masks[day] = bits
+    return masks
@@ -0,0 +1,152 @@
+"""
+Caché de las respuestas del catálogo (home y resúmenes).
+
+Las respuestas se guardan ya renderizadas (bytes JSON o MessagePack) bajo una
+clave que incluye el formato y la versión de cada modelo del que dependen. Las señales incrementan la
+versión de un modelo cuando se guarda, se borra o cambian sus relaciones M2M,
+así que las entradas viejas dejan de leerse sin tener que borrarlas. También
+guardan cuándo cambió cada modelo (changed_at()): a diferencia de
+max(updated_at), avanza cuando se borra o se desactiva una fila.
+
+Ante un miss, un solo proceso regenera la respuesta (single-flight): toma un
+lock con cache.add y el resto espera a que aparezca el valor.
+acached_content() es lo mismo para las vistas async (core.async_views).
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from .renderers import FastJSONRenderer
+
+VERSION_KEY = 'core:catalog:version:{model}'
+CHANGED_KEY = 'core:catalog:changed:{model}'
+ENTRY_KEY = 'core:catalog:{name}:{format}:{versions}'
+LOCK_KEY = 'core:catalog:lock:{name}:{format}:{versions}'
+
+# Espera máxima de los que no regeneran, antes de regenerar por su cuenta
+LOCK_SECONDS = 10
+POLL_SECONDS = 0.02
+
+BRANCH = 'branch'
+SERVICE = 'service'
+PROFESSIONAL = 'professional'
+MODELS = (BRANCH, SERVICE, PROFESSIONAL)
+
+
+def version(model):
+    """Versión actual del catálogo de un modelo"""
+    key = VERSION_KEY.format(model=model)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, 1, None)
+        value = cache.get(key, 1)
+    return value
+
+
+def versions(models=MODELS):
+    """Versiones de varios modelos como texto (ej: '3.1.7')"""
+    keys = [VERSION_KEY.format(model=model) for model in models]
+    found = cache.get_many(keys)
+    return '.'.join(
+        str(found[key]) if key in found else str(version(model))
+        for key, model in zip(keys, models)
+    )
+
+
+def bump(model):
+    """Invalida las respuestas que dependen del modelo"""
+    key = VERSION_KEY.format(model=model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # La clave no existía (caché vacía o expulsada)
+        if not cache.add(key, 2, None):
+            cache.incr(key)
+    touch(model)
+
+
+def touch(model):
+    """Registra que cambió algo que muestran las respuestas del modelo"""
+    cache.set(CHANGED_KEY.format(model=model), time.time(), None)
+
+
+def changed_at(models=MODELS):
+    """Último cambio registrado de varios modelos"""
+    keys = [CHANGED_KEY.format(model=model) for model in models]
+    found = cache.get_many(keys)
+    stamps = []
+    for key in keys:
+        if key not in found:
+            # Sin registro (caché vacía o expulsada) no se sabe cuándo fue el
+            # último cambio: se toma desde ahora
+            cache.add(key, time.time(), None)
+            found[key] = cache.get(key, time.time())
+        stamps.append(found[key])
+    return datetime.fromtimestamp(max(stamps), timezone.utc) if stamps else None
+
+
+def cached_content(name, models, build, renderer=None):
+    """
+    Bytes de `build()` (JSON, o el formato de `renderer`) cacheados hasta que
+    cambie algún modelo de `models`. Con un miss concurrente, `build` se
+    ejecuta una sola vez.
+    """
+    renderer = renderer or FastJSONRenderer()
+    tag = versions(models)
+    key = ENTRY_KEY.format(name=name, format=renderer.format, versions=tag)
+    content = cache.get(key)
+    if content is not None:
+        return content
+
+    lock = LOCK_KEY.format(name=name, format=renderer.format, versions=tag)
+    deadline = time.monotonic() + LOCK_SECONDS
+    while not cache.add(lock, 1, LOCK_SECONDS):
+        time.sleep(POLL_SECONDS)
+        content = cache.get(key)
+        if content is not None:
+            return content
+        if time.monotonic() > deadline:
+            # El que regeneraba no terminó: regenerar sin lock
+            return renderer.render(build())
+
+    try:
+        # Pudo haberla guardado otro justo antes de liberar el lock
+        content = cache.get(key)
+        if content is None:
+            content = renderer.render(build())
+            cache.set(key, content, settings.CATALOG_CACHE_SECONDS)
+    finally:
+        cache.delete(lock)
+    return content
+
+
+async def acached_content(name, models, build, renderer=None):
+    """cached_content() con `build` async y la caché async"""
+    renderer = renderer or FastJSONRenderer()
+    tag = versions(models)
+    key = ENTRY_KEY.format(name=name, format=renderer.format, versions=tag)
+    content = await cache.aget(key)
+    if content is not None:
+        return content
+
+    lock = LOCK_KEY.format(name=name, format=renderer.format, versions=tag)
+    deadline = time.monotonic() + LOCK_SECONDS
+    while not await cache.aadd(lock, 1, LOCK_SECONDS):
+        await asyncio.sleep(POLL_SECONDS)
+        content = await cache.aget(key)
+        if content is not None:
+            return content
+        if time.monotonic() > deadline:
+            return renderer.render(await build())
+
+    try:
+        content = await cache.aget(key)
+        if content is None:
+            content = renderer.render(await build())
+            await cache.aset(key, content, settings.CATALOG_CACHE_SECONDS)
+    finally:
+        await cache.adelete(lock)
+    return content
@@ -0,0 +1,45 @@
+"""
+System checks de core (se corren con manage.py check y al iniciar).
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+from . import bitmaps
+
+
+@register()
+def booking_slot_minutes(app_configs, **kwargs):
+    """Los horarios de inicio se alinean a los bloques de los mapas de bits"""
+    step = settings.BOOKING_SLOT_MINUTES
+    if step > 0 and step % bitmaps.SLOT_MINUTES == 0:
+        return []
+    return [
+        Error(
+            f'BOOKING_SLOT_MINUTES={step} no es un múltiplo de {bitmaps.SLOT_MINUTES}.',
+            hint=(
+                'La disponibilidad se guarda en bloques de '
+                f'{bitmaps.SLOT_MINUTES} minutos (core.bitmaps); usar 5, 10, 15, 20, 30...'
+            ),
+            id='core.E001',
+        )
+    ]
+
+
+@register(deploy=True)
+def shared_cache(app_configs, **kwargs):
+    """Con varios procesos la caché tiene que ser compartida (ver settings.CACHES)"""
+    backend = settings.CACHES['default']['BACKEND']
+    if backend.endswith(('LocMemCache', 'DummyCache')):
+        return [
+            Warning(
+                f'La caché por defecto ({backend}) no se comparte entre procesos.',
+                hint=(
+                    'Las versiones del catálogo, las retenciones y los índices en '
+                    'memoria quedan desactualizados en los demás workers. Configurar '
+                    'CACHE_URL con Redis o Memcached, o correr un único proceso.'
+                ),
+                id='core.W001',
+            )
+        ]
+    return []
@@ -0,0 +1,191 @@
+"""
+Caché de respuestas comprimidas del catálogo.
+
+Las respuestas GET del catálogo (home, sucursales, servicios, profesionales)
+traen un ETag (ver core.conditional). El middleware guarda en la caché la
+versión comprimida (brotli o gzip) bajo un hash del cuerpo: la primera
+respuesta se comprime una sola vez, con el nivel más alto, y las siguientes
+con los mismos bytes salen de la caché sin comprimir nada. No se usa el ETag
+como clave porque dos cuerpos distintos pueden compartirlo (ej: un ETag débil
+o uno que no cubre todo lo que se muestra).
+
+La codificación se elige por Accept-Encoding (brotli si está instalado y el
+cliente lo acepta, si no gzip). Los contadores de aciertos se leen con stats()
+o en GET /api/stats/compression/.
+"""
+
+import gzip
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+ENTRY_KEY = 'core:compressed:{encoding}:{digest}'
+COUNTER_KEY = 'core:compressed:stats:{event}:{encoding}'
+
+COMPRESSORS = {'gzip': lambda content: gzip.compress(content, compresslevel=9, mtime=0)}
+if brotli is not None:
+    COMPRESSORS['br'] = lambda content: brotli.compress(content, quality=11)
+
+# Preferencia cuando el cliente acepta varias
+PREFERENCE = ('br', 'gzip')
+
+HIT = 'hit'
+MISS = 'miss'
+IDENTITY = 'identity'
+
+
+def accepted_encodings(header):
+    """Codificaciones de Accept-Encoding con q > 0"""
+    accepted = set()
+    for part in header.split(','):
+        token, *params = [item.strip() for item in part.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if token and quality > 0:
+            accepted.add(token.lower())
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = accepted_encodings(header)
+    for encoding in PREFERENCE:
+        if encoding in COMPRESSORS and (encoding in accepted or '*' in accepted):
+            return encoding
+    return None
+
+
+# ========== CONTADORES ==========
+
+def record(event, encoding):
+    key = COUNTER_KEY.format(event=event, encoding=encoding)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # La clave no existía (caché vacía o expulsada)
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def stats():
+    """Aciertos y fallos por codificación y la tasa de aciertos total"""
+    encodings = list(COMPRESSORS)
+    keys = {
+        (event, encoding): COUNTER_KEY.format(event=event, encoding=encoding)
+        for event in (HIT, MISS)
+        for encoding in encodings
+    }
+    identity_key = COUNTER_KEY.format(event=IDENTITY, encoding=IDENTITY)
+    found = cache.get_many([*keys.values(), identity_key])
+
+    by_encoding = {
+        encoding: {event: found.get(keys[(event, encoding)], 0) for event in (HIT, MISS)}
+        for encoding in encodings
+    }
+    hits = sum(counts[HIT] for counts in by_encoding.values())
+    misses = sum(counts[MISS] for counts in by_encoding.values())
+    return {
+        'hits': hits,
+        'misses': misses,
+        'uncompressed': found.get(identity_key, 0),
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+        'by_encoding': by_encoding,
+    }
+
+
+def reset_stats():
+    cache.delete_many([
+        COUNTER_KEY.format(event=event, encoding=encoding)
+        for event in (HIT, MISS)
+        for encoding in COMPRESSORS
+    ] + [COUNTER_KEY.format(event=IDENTITY, encoding=IDENTITY)])
+
+
+# ========== MIDDLEWARE ==========
+
+class PrecompressedCacheMiddleware:
+    """
+    Comprime una sola vez cada respuesta cacheable del catálogo y la reutiliza
+    mientras no cambie su contenido. Va antes de cualquier middleware que lea o
+    modifique el cuerpo de la respuesta.
+
+    Funciona también en modo async (ASGI), para no obligar a Django a pasar las
+    vistas async de core.async_views a un hilo.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(settings.COMPRESSED_CACHE_PATHS)
+        self.min_bytes = settings.COMPRESSED_CACHE_MIN_BYTES
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if not self.is_cacheable(request, response):
+            return response
+        return self.compress(request, response)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if not self.is_cacheable(request, response):
+            return response
+        # La caché y la compresión son sync
+        return await sync_to_async(self.compress)(request, response)
+
+    def compress(self, request, response):
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            record(IDENTITY, IDENTITY)
+            return response
+
+        etag = response['ETag']
+        digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        key = ENTRY_KEY.format(encoding=encoding, digest=digest)
+        content = cache.get(key)
+        if content is None:
+            record(MISS, encoding)
+            content = COMPRESSORS[encoding](response.content)
+            cache.set(key, content, settings.CATALOG_CACHE_SECONDS)
+            response['X-Compression-Cache'] = 'MISS'
+        else:
+            record(HIT, encoding)
+            response['X-Compression-Cache'] = 'HIT'
+
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        # Como GZipMiddleware: los bytes ya no son los del ETag fuerte
+        if not etag.startswith('W/'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def is_cacheable(self, request, response):
+        return (
+            request.method == 'GET'
+            and request.path.startswith(self.paths)
+            and response.status_code == 200
+            and not response.streaming
+            and response.has_header('ETag')
+            and not response.has_header('Content-Encoding')
+            and len(response.content) >= self.min_bytes
+        )
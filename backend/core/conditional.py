@@ -0,0 +1,153 @@
+"""
+GET condicional (ETag / Last-Modified) para las vistas del catálogo.
+
+El validador de una respuesta sale de max(updated_at) y la cantidad de filas
+de cada queryset del que depende, calculados en una sola query (UNION ALL de
+agregados), más la versión del catálogo (core.catalog), que cubre los cambios
+en relaciones M2M que no tocan updated_at, y el formato negociado por Accept
+(JSON o MessagePack). Si el cliente ya tiene esa versión se responde 304 sin
+serializar nada. Last-Modified también tiene en cuenta catalog.changed_at(),
+porque max(updated_at) no avanza cuando se borra o se desactiva una fila.
+
+Cuando la respuesta muestra datos de otros modelos (ej: ?include=branches_data)
+también cuentan la versión y las filas de esos modelos, así que renombrar una
+sucursal cambia el ETag de los profesionales que la muestran.
+"""
+
+import hashlib
+
+from django.db.models import Count, IntegerField, Max, Value
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from . import catalog
+from .fieldsets import requested_fields
+
+
+def _stamps_query(querysets):
+    """Query de [(max(updated_at), cantidad)] de cada queryset"""
+    parts = []
+    for queryset in querysets:
+        if queryset.query.distinct:
+            # Los agregados sobre un DISTINCT con joins contarían repetidos
+            queryset = queryset.model.objects.filter(pk__in=queryset.values('pk'))
+        parts.append(
+            queryset.order_by()
+            .annotate(_group=Value(0, output_field=IntegerField()))
+            .values('_group')
+            .annotate(last=Max('updated_at'), count=Count('pk'))
+            .values_list('last', 'count')
+        )
+    if len(parts) == 1:
+        return parts[0]
+    return parts[0].union(*parts[1:], all=True)
+
+
+def _stamps(querysets):
+    """[(max(updated_at), cantidad)] de cada queryset, con una sola query"""
+    return list(_stamps_query(querysets))
+
+
+async def _astamps(querysets):
+    """_stamps() con el ORM async"""
+    return [row async for row in _stamps_query(querysets)]
+
+
+def validators(request, catalog_models, stamps):
+    """(ETag, Last-Modified) de una respuesta del catálogo"""
+    last_modified = max((last for last, _ in stamps if last is not None), default=None)
+    changed = catalog.changed_at(catalog_models)
+    if changed is not None and (last_modified is None or changed > last_modified):
+        last_modified = changed
+    etag = make_etag(
+        request.get_full_path(),
+        request.accepted_media_type,
+        catalog.versions(catalog_models),
+        *(f'{last.isoformat() if last else "-"}:{count}' for last, count in stamps),
+    )
+    return etag, last_modified
+
+
+def make_etag(*parts):
+    """ETag fuerte a partir de las partes que identifican la respuesta"""
+    return quote_etag(hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest())
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # El mismo recurso cambia de representación según Accept
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def not_modified(request, etag, last_modified=None):
+    """Respuesta 304 (o 412) si el cliente ya tiene esta versión, si no None"""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag y Last-Modified para vistas genéricas de lectura del catálogo.
+    Las vistas indican en `catalog_models` de qué versiones del catálogo
+    dependen y pueden sumar querysets relacionados en
+    get_conditional_querysets().
+
+    `related_catalog` ({campo: (modelo del catálogo, relación)}) lista los
+    campos anidados del serializer: si el campo sale en la respuesta, también
+    cuentan esa versión del catálogo y las filas relacionadas.
+    """
+
+    catalog_models = ()
+    related_catalog = {}
+
+    def shown_related(self):
+        """(modelo del catálogo, relación) de los campos anidados que se muestran"""
+        if not self.related_catalog:
+            return []
+        shown = set(self.get_serializer_class().selected_fields(*requested_fields(self.request)))
+        return [value for name, value in self.related_catalog.items() if name in shown]
+
+    def get_catalog_models(self):
+        return [*self.catalog_models, *(model for model, _ in self.shown_related())]
+
+    def related_querysets(self, queryset):
+        """Filas de las relaciones que se muestran, de los objetos de `queryset`"""
+        related = []
+        for _, relation in self.shown_related():
+            field = queryset.model._meta.get_field(relation)
+            related.append(field.related_model.objects.filter(**{
+                f'{field.related_query_name()}__in': queryset.values('pk'),
+            }).distinct())
+        return related
+
+    def get_conditional_querysets(self):
+        """Querysets de los que depende la respuesta"""
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        if lookup in self.kwargs:
+            queryset = self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup]})
+        else:
+            queryset = self.filter_queryset(self.get_queryset())
+        return [queryset, *self.related_querysets(queryset)]
+
+    def get_validators(self, request):
+        return validators(request, self.get_catalog_models(), _stamps(self.get_conditional_querysets()))
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
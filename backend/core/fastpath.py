@@ -0,0 +1,169 @@
+"""
+Serialización rápida de listados a partir de filas de .values().
+
+Para páginas grandes, la maquinaria por campo de DRF (get_attribute,
+to_representation, SerializerMethodField) pesa más que la query. En modo
+rápido el serializer arma cada dict directo desde la fila, con un accessor por
+campo que se compila una sola vez por combinación de campos pedidos.
+
+La salida es idéntica a la del serializer normal: los campos de texto, enteros
+y booleanos pasan tal cual, los decimales usan el to_representation del campo
+de DRF, los archivos arman la misma URL y los campos calculados llaman al mismo
+método del modelo (Meta.values_methods) sobre la fila. Si algún campo pedido
+no tiene accessor (ej: serializers anidados con ?include=) la vista usa el
+camino normal.
+"""
+
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .fieldsets import requested_fields
+
+# Campos de DRF cuyo to_representation no cambia un valor que ya viene de la base
+PASSTHROUGH_FIELDS = (serializers.IntegerField, serializers.CharField, serializers.BooleanField)
+
+
+class Row(dict):
+    """Fila de .values() que también se lee por atributo (para los métodos del modelo)"""
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class ValuesSerializerMixin:
+    """
+    Modo rápido de solo lectura para serializers de listados (junto con
+    SparseFieldsMixin). Meta.values_methods indica, para cada campo calculado,
+    el método del modelo que lo produce; sus columnas salen de
+    Meta.field_columns.
+    """
+
+    @classmethod
+    def _accessors(cls, names):
+        """[(nombre, accessor(fila, request))] o None si algún campo no tiene"""
+        cache = cls.__dict__.get('_compiled_accessors')
+        if cache is None:
+            cache = {}
+            setattr(cls, '_compiled_accessors', cache)
+        key = tuple(names)
+        if key not in cache:
+            cache[key] = cls._compile(names)
+        return cache[key]
+
+    @classmethod
+    def _compile(cls, names):
+        methods = getattr(cls.Meta, 'values_methods', {})
+        # Todos los campos, también los opcionales que el serializer recorta
+        serializer = cls()
+        fields = serializer.get_fields()
+        for name, field in fields.items():
+            field.bind(name, serializer)
+        accessors = []
+        for name in names:
+            field = fields[name]
+            if name in methods:
+                accessors.append((name, _method_accessor(methods[name])))
+            elif isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)):
+                return None
+            elif field.source != name:
+                return None
+            elif isinstance(field, serializers.FileField):
+                storage = cls.Meta.model._meta.get_field(name).storage
+                accessors.append((name, _file_accessor(name, storage, field)))
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                accessors.append((name, _value_accessor(name)))
+            else:
+                accessors.append((name, _field_accessor(name, field)))
+        return accessors
+
+    @classmethod
+    def values_columns(cls, names, extra_columns=()):
+        """Columnas que hay que pedirle a .values() para `names`"""
+        field_columns = getattr(cls.Meta, 'field_columns', {})
+        columns = list(extra_columns)
+        for name in names:
+            columns.extend(field_columns.get(name, [name]))
+        return list(dict.fromkeys(columns))
+
+    @classmethod
+    def values_queryset(cls, queryset, fields=None, include=(), extra_columns=()):
+        """
+        Queryset de filas para el modo rápido, o None si los campos pedidos
+        no lo admiten.
+        """
+        names = cls.selected_fields(fields, include)
+        if cls._accessors(names) is None:
+            return None
+        return queryset.values(*cls.values_columns(names, extra_columns))
+
+    @classmethod
+    def values_data(cls, rows, fields=None, include=(), request=None):
+        """Lista de dicts igual a Serializer(objetos, many=True).data"""
+        accessors = cls._accessors(cls.selected_fields(fields, include))
+        return [{name: access(row, request) for name, access in accessors} for row in map(Row, rows)]
+
+
+def _value_accessor(column):
+    def access(row, request):
+        return row[column]
+    return access
+
+
+def _field_accessor(column, field):
+    to_representation = field.to_representation
+
+    def access(row, request):
+        value = row[column]
+        return None if value is None else to_representation(value)
+    return access
+
+
+def _file_accessor(column, storage, field):
+    # Igual que FileField.to_representation de DRF
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return _value_accessor(column)
+
+    def access(row, request):
+        name = row[column]
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return access
+
+
+def _method_accessor(method):
+    def access(row, request):
+        return method(row)
+    return access
+
+
+class ValuesListMixin:
+    """
+    Para ListAPIView con un serializer ValuesSerializerMixin: pagina filas de
+    .values() y las serializa en modo rápido. Va antes de SparseFieldsetMixin.
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        fields, include = requested_fields(request)
+        extra = [name.lstrip('-') for name in getattr(self, 'cursor_ordering', ())]
+        rows = serializer_class.values_queryset(
+            self.filter_queryset(self.get_queryset()), fields, include, extra
+        )
+        if rows is None:
+            return super().list(request, *args, **kwargs)
+
+        page = self.paginate_queryset(rows)
+        data = serializer_class.values_data(
+            rows if page is None else page, fields, include, request
+        )
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,108 @@
+"""
+Campos a pedido (?fields= / ?include=) para los serializers del catálogo.
+
+- ?fields=id,full_name devuelve solo esos campos.
+- ?include=branches_data suma campos opcionales, que cada serializer lista en
+  Meta.optional_fields y no salen si no se piden.
+
+La vista adapta el queryset a los campos pedidos: trae solo las columnas que
+usan (only) y precarga las relaciones únicamente si algún campo las muestra.
+Para eso cada serializer declara en Meta.field_columns las columnas que lee
+cada campo calculado y en Meta.field_prefetch la relación que precarga cada
+campo anidado. Los nombres desconocidos se ignoran.
+"""
+
+from django.db.models.constants import LOOKUP_SEP
+
+FIELDS_PARAM = 'fields'
+INCLUDE_PARAM = 'include'
+
+
+def parse_names(value):
+    """'a, b,,c' -> ['a', 'b', 'c']"""
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def requested_fields(request):
+    """(fields, include) de la query; fields es None si no se restringió"""
+    if request is None:
+        return None, []
+    params = getattr(request, 'query_params', request.GET)
+    return parse_names(params.get(FIELDS_PARAM)) or None, parse_names(params.get(INCLUDE_PARAM))
+
+
+class SparseFieldsMixin:
+    """
+    Recorta los campos de un ModelSerializer según la query del request del
+    contexto. Solo se recorta el serializer raíz: los anidados salen completos.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, include = requested_fields(self.context.get('request'))
+        if fields is None and not getattr(self.Meta, 'optional_fields', ()):
+            return
+        selected = set(self.selected_fields(fields, include))
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, fields=None, include=()):
+        """Nombres de los campos que salen en la respuesta, en orden"""
+        optional = set(getattr(cls.Meta, 'optional_fields', ()))
+        wanted = set(include) | set(fields or ())
+        names = [name for name in cls.Meta.fields if name not in optional or name in wanted]
+        if fields:
+            names = [name for name in names if name in wanted]
+        return names
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None, include=(), extra_columns=()):
+        """
+        Queryset que trae solo lo que usan los campos pedidos.
+        `extra_columns` son columnas que necesita la vista (ej: las del cursor).
+        Si algún campo no declara sus columnas se traen todas.
+        """
+        meta = cls.Meta
+        field_columns = getattr(meta, 'field_columns', {})
+        field_prefetch = getattr(meta, 'field_prefetch', {})
+        concrete = {field.name for field in meta.model._meta.concrete_fields}
+
+        columns, lookups, complete = ['pk', *extra_columns], [], True
+        for name in cls.selected_fields(fields, include):
+            if name in field_prefetch:
+                lookups.append(field_prefetch[name])
+            elif name in field_columns:
+                columns.extend(field_columns[name])
+            elif name in concrete:
+                columns.append(name)
+            else:
+                complete = False
+
+        if lookups:
+            queryset = queryset.prefetch_related(*lookups)
+        if not complete:
+            return queryset
+
+        # Solo se unen las relaciones de las que se lee alguna columna
+        related = {column.split(LOOKUP_SEP)[0] for column in columns if LOOKUP_SEP in column}
+        if queryset.query.select_related:
+            queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*dict.fromkeys(columns))
+
+
+class SparseFieldsetMixin:
+    """
+    Para vistas genéricas cuyo serializer usa SparseFieldsMixin: adapta el
+    queryset a ?fields= / ?include=. Las vistas con cursor (KeysetPagination)
+    siempre traen las columnas de `cursor_ordering`.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields, include = requested_fields(self.request)
+        extra = [name.lstrip('-') for name in getattr(self, 'cursor_ordering', ())]
+        return self.get_serializer_class().optimize_queryset(queryset, fields, include, extra)
@@ -0,0 +1,143 @@
+"""
+Búsqueda de sucursales cercanas sin PostGIS.
+
+Cada sucursal guarda el geohash de su ubicación (Branch.geohash, indexado).
+Un geohash es una celda de una grilla jerárquica: todas las ubicaciones
+dentro de una celda de precisión p comparten los primeros p caracteres, así
+que "sucursales en la celda" es un rango sobre el índice
+(geohash >= 'abc' AND geohash < 'abc~'). No se usa LIKE porque en SQLite no
+distingue mayúsculas y entonces no aprovecha el índice.
+
+Para una búsqueda se arma el rectángulo que contiene el círculo pedido, se
+eligen las celdas más chicas que lo cubren con pocas consultas de rango
+(MAX_CELLS), se filtra además por el rectángulo y la distancia exacta
+(haversine) se calcula solo para esas pocas sucursales.
+"""
+
+import math
+
+from django.db.models import Q
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 8
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# Máximo de celdas (rangos del índice) por búsqueda
+MAX_CELLS = 16
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Geohash de una ubicación"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            target, bounds = float(longitude), lng_range
+        else:
+            target, bounds = float(latitude), lat_range
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if target >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(alto, ancho) en grados de una celda de la precisión dada"""
+    total = 5 * precision
+    lng_bits = (total + 1) // 2
+    lat_bits = total // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(lat_min, lat_max, lng_min, lng_max) del rectángulo que contiene el círculo"""
+    delta_lat = radius_km / KM_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    delta_lng = min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+    return (
+        max(latitude - delta_lat, -90.0),
+        min(latitude + delta_lat, 90.0),
+        longitude - delta_lng,
+        longitude + delta_lng,
+    )
+
+
+def _wrap(longitude):
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def covering_cells(box):
+    """Geohashes (la mayor precisión posible) que cubren el rectángulo"""
+    lat_min, lat_max, lng_min, lng_max = box
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor(lat_max / height) - math.floor(lat_min / height) + 1
+        cols = math.floor(lng_max / width) - math.floor(lng_min / width) + 1
+        if rows * cols <= MAX_CELLS:
+            break
+
+    cells = set()
+    for row in range(rows):
+        latitude = min(lat_min + row * height, lat_max)
+        for col in range(cols):
+            longitude = min(lng_min + col * width, lng_max)
+            cells.add(encode(latitude, _wrap(longitude), precision))
+    # Las esquinas superiores pueden caer en una fila o columna más
+    for latitude in (lat_min, lat_max):
+        for longitude in (lng_min, lng_max):
+            cells.add(encode(latitude, _wrap(longitude), precision))
+    return cells
+
+
+def box_filter(box):
+    """Q del rectángulo sobre latitude/longitude (con el cruce de ±180°)"""
+    lat_min, lat_max, lng_min, lng_max = box
+    condition = Q(latitude__gte=lat_min, latitude__lte=lat_max)
+    if lng_min < -180.0:
+        return condition & (Q(longitude__gte=lng_min + 360.0) | Q(longitude__lte=lng_max))
+    if lng_max > 180.0:
+        return condition & (Q(longitude__gte=lng_min) | Q(longitude__lte=lng_max - 360.0))
+    return condition & Q(longitude__gte=lng_min, longitude__lte=lng_max)
+
+
+def cells_filter(cells):
+    """Q de las ubicaciones dentro de alguna de las celdas (un rango por celda)"""
+    condition = Q()
+    for cell in sorted(cells):
+        # '~' va después de todos los caracteres de BASE32
+        condition |= Q(geohash__gte=cell, geohash__lt=cell + '~')
+    return condition
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    """Distancia haversine en km"""
+    lat1, lng1, lat2, lng2 = map(math.radians, map(float, (lat1, lng1, lat2, lng2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def nearby(queryset, latitude, longitude, radius_km):
+    """[(distancia_km, objeto)] de `queryset` dentro del radio, del más cercano al más lejano"""
+    box = bounding_box(latitude, longitude, radius_km)
+    candidates = queryset.filter(cells_filter(covering_cells(box))).filter(box_filter(box)).order_by()
+    found = []
+    for obj in candidates:
+        distance = distance_km(latitude, longitude, obj.latitude, obj.longitude)
+        if distance <= radius_km:
+            found.append((distance, obj))
+    found.sort(key=lambda item: (item[0], item[1].pk))
+    return found
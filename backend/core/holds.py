@@ -0,0 +1,213 @@
+"""
+Retenciones temporales de horarios (holds).
+
+Entre elegir un horario y confirmar el turno, el cliente puede retenerlo unos
+minutos. Las retenciones viven solo en la caché y vencen solas (TTL); nunca
+tocan la base de datos.
+
+Claves usadas:
+- core:hold:{token}: la retención (cliente, profesional, sucursal, horario).
+- core:hold:block:{profesional}:{fecha}:{bloque}: una por bloque de 5 minutos.
+  Se toman con cache.add, que es atómico, así que dos clientes no pueden
+  retener el mismo bloque del mismo profesional. Es la barrera real.
+- core:hold:day:{sucursal}:{fecha}: índice de retenciones del día en la
+  sucursal, usado para contarlas en las sillas.
+- core:hold:professional:{profesional}:{fecha}: índice de retenciones del
+  profesional en el día, en cualquier sucursal, usado para ocultarlas en la
+  disponibilidad (una retención en una sucursal lo ocupa en todas).
+  Los índices se actualizan leyendo y reescribiendo, así que ante carreras
+  pueden perder una entrada; en ese caso el horario solo se sigue mostrando, y
+  la confirmación lo rechaza igual.
+- core:hold:client:{usuario}: la retención vigente del cliente (una por vez).
+"""
+
+import time
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import bitmaps
+from .intervals import minutes_to_str
+
+HOLD_KEY = 'core:hold:{token}'
+BLOCK_KEY = 'core:hold:block:{professional_id}:{day}:{slot}'
+DAY_KEY = 'core:hold:day:{branch_id}:{day}'
+PROFESSIONAL_DAY_KEY = 'core:hold:professional:{professional_id}:{day}'
+CLIENT_KEY = 'core:hold:client:{user_id}'
+
+
+class HoldConflict(Exception):
+    """El horario ya está retenido por otro cliente"""
+
+
+def get_hold_seconds():
+    """Duración de una retención"""
+    return settings.BOOKING_HOLD_SECONDS
+
+
+def _block_keys(professional_id, day, start, end):
+    return [
+        BLOCK_KEY.format(professional_id=professional_id, day=day.isoformat(), slot=slot)
+        for slot in range(start // bitmaps.SLOT_MINUTES, bitmaps.slots_for(end))
+    ]
+
+
+def _day_key(branch_id, day):
+    return DAY_KEY.format(branch_id=branch_id, day=day.isoformat())
+
+
+def _professional_day_key(professional_id, day):
+    return PROFESSIONAL_DAY_KEY.format(professional_id=professional_id, day=day.isoformat())
+
+
+def _index_keys(hold):
+    """Claves de los índices diarios en los que figura la retención"""
+    return [
+        _day_key(hold['branch_id'], hold['date']),
+        _professional_day_key(hold['professional_id'], hold['date']),
+    ]
+
+
+def _alive(entries, now=None):
+    """Entradas del índice diario que todavía no vencieron"""
+    now = time.time() if now is None else now
+    return {token: entry for token, entry in entries.items() if entry[3] > now}
+
+
+def create_hold(client, branch, professional, service, day, start, end):
+    """
+    Retiene [start, end) (minutos) del profesional en la fecha.
+    Libera la retención anterior del cliente, si tenía una.
+    Lanza HoldConflict si algún bloque ya está retenido.
+    """
+    seconds = get_hold_seconds()
+    release_client_hold(client)
+
+    token = uuid.uuid4().hex
+    taken = []
+    for key in _block_keys(professional.id, day, start, end):
+        if not cache.add(key, token, seconds):
+            cache.delete_many(taken)
+            raise HoldConflict('El horario está retenido por otro cliente.')
+        taken.append(key)
+
+    expires = time.time() + seconds
+    hold = {
+        'token': token,
+        'client_id': client.pk,
+        'branch_id': branch.id,
+        'professional_id': professional.id,
+        'service_id': service.id,
+        'date': day,
+        'start': start,
+        'end': end,
+        'expires': expires,
+    }
+    cache.set(HOLD_KEY.format(token=token), hold, seconds)
+    cache.set(CLIENT_KEY.format(user_id=client.pk), token, seconds)
+
+    for day_key in _index_keys(hold):
+        entries = _alive(cache.get(day_key, {}))
+        entries[token] = (professional.id, start, end, expires)
+        cache.set(day_key, entries, seconds)
+    return hold
+
+
+def get_hold(token, client=None):
+    """Retención vigente (None si venció o es de otro cliente)"""
+    hold = cache.get(HOLD_KEY.format(token=token)) if token else None
+    if hold is None or hold['expires'] <= time.time():
+        return None
+    if client is not None and hold['client_id'] != client.pk:
+        return None
+    return hold
+
+
+def release_hold(token, client=None):
+    """Libera una retención. Retorna False si no existía o no era del cliente."""
+    hold = get_hold(token, client)
+    if hold is None:
+        return False
+
+    keys = _block_keys(hold['professional_id'], hold['date'], hold['start'], hold['end'])
+    # Solo los bloques que siguen siendo de esta retención
+    cache.delete_many([key for key, value in cache.get_many(keys).items() if value == token])
+    cache.delete(HOLD_KEY.format(token=token))
+    client_key = CLIENT_KEY.format(user_id=hold['client_id'])
+    if cache.get(client_key) == token:
+        cache.delete(client_key)
+
+    for day_key in _index_keys(hold):
+        entries = _alive(cache.get(day_key, {}))
+        if entries.pop(token, None) is not None:
+            if entries:
+                cache.set(day_key, entries, get_hold_seconds())
+            else:
+                cache.delete(day_key)
+    return True
+
+
+def release_client_hold(client):
+    """Libera la retención vigente del cliente, si tiene una"""
+    token = cache.get(CLIENT_KEY.format(user_id=client.pk))
+    return release_hold(token, client) if token else False
+
+
+def held_by_others(professional_id, day, start, end, token=None):
+    """Indica si algún bloque de [start, end) está retenido con otro token"""
+    values = cache.get_many(_block_keys(professional_id, day, start, end)).values()
+    return any(value != token for value in values)
+
+
+def _read_index(keys, exclude=None):
+    """{valor de `keys`: [(professional_id, inicio, fin), ...]} de los índices diarios"""
+    now = time.time()
+    result = {}
+    for key, entries in cache.get_many(list(keys)).items():
+        items = [
+            (professional_id, start, end)
+            for token, (professional_id, start, end, _) in _alive(entries, now).items()
+            if token != exclude
+        ]
+        if items:
+            result[keys[key]] = items
+    return result
+
+
+def holds_by_day(branch_id, dates, exclude=None):
+    """Retenciones vigentes en la sucursal {fecha: [(professional_id, inicio, fin), ...]}"""
+    return _read_index({_day_key(branch_id, day): day for day in dates}, exclude)
+
+
+def held_masks(professional_ids, dates):
+    """
+    Bloques retenidos de cada profesional en cualquier sucursal
+    {(professional_id, fecha): bits}
+    """
+    dates = list(dates)
+    keys = {
+        _professional_day_key(professional_id, day): (professional_id, day)
+        for professional_id in professional_ids
+        for day in dates
+    }
+    masks = {}
+    for key, items in _read_index(keys).items():
+        masks[key] = bitmaps.cover_intervals([(start, end) for _, start, end in items])
+    return masks
+
+
+def serialize_hold(hold):
+    """Representación de una retención para la API"""
+    return {
+        'token': hold['token'],
+        'branch': hold['branch_id'],
+        'professional': hold['professional_id'],
+        'service': hold['service_id'],
+        'date': hold['date'].isoformat(),
+        'start_time': minutes_to_str(hold['start']),
+        'end_time': minutes_to_str(hold['end']),
+        'expires_at': datetime.fromtimestamp(hold['expires'], tz=timezone.get_current_timezone()),
+    }
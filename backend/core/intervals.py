@@ -0,0 +1,140 @@
+"""
+Aritmética de intervalos para el cálculo de disponibilidad.
+
+Todos los intervalos son semiabiertos [inicio, fin) y se expresan en minutos
+desde la medianoche, de modo que las operaciones trabajan sobre unos pocos
+enteros por día en lugar de recorrer la agenda minuto a minuto.
+"""
+
+
+def time_to_minutes(value):
+    """Convierte un datetime.time a minutos desde la medianoche"""
+    return value.hour * 60 + value.minute
+
+
+def minutes_to_str(minutes):
+    """Formatea minutos desde la medianoche como HH:MM"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def merge_intervals(intervals):
+    """Ordena y une intervalos superpuestos o contiguos"""
+    merged = []
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect_intervals(a, b):
+    """Intersección de dos listas de intervalos ordenadas y disjuntas"""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def subtract_intervals(base, cuts):
+    """
+    Resta a `base` los intervalos de `cuts`.
+    Ambas listas deben estar ordenadas y sin superposiciones.
+    """
+    result = []
+    j = 0
+    for start, end in base:
+        # Saltar los cortes que terminan antes de este intervalo
+        while j < len(cuts) and cuts[j][1] <= start:
+            j += 1
+        k = j
+        current = start
+        while k < len(cuts) and cuts[k][0] < end:
+            if cuts[k][0] > current:
+                result.append((current, cuts[k][0]))
+            current = max(current, cuts[k][1])
+            k += 1
+        if current < end:
+            result.append((current, end))
+    return result
+
+
+class IntervalTree:
+    """
+    Árbol de intervalos centrado, estático.
+
+    Guarda tuplas (inicio, fin, dato) con extremos inclusivos de cualquier tipo
+    comparable (enteros, fechas) y responde qué intervalos se superponen con un
+    rango en O(log n + k).
+    """
+
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right', 'size')
+
+    def __init__(self, items):
+        items = list(items)
+        self.size = len(items)
+        self.left = self.right = None
+        self.by_start = self.by_end = []
+        self.center = None
+        if not items:
+            return
+
+        endpoints = sorted(point for start, end, _ in items for point in (start, end))
+        self.center = endpoints[len(endpoints) // 2]
+
+        here, left, right = [], [], []
+        for item in items:
+            if item[1] < self.center:
+                left.append(item)
+            elif item[0] > self.center:
+                right.append(item)
+            else:
+                here.append(item)
+
+        self.by_start = sorted(here, key=lambda item: item[0])
+        self.by_end = sorted(here, key=lambda item: item[1], reverse=True)
+        if left:
+            self.left = IntervalTree(left)
+        if right:
+            self.right = IntervalTree(right)
+
+    def __len__(self):
+        return self.size
+
+    def overlapping(self, start, end):
+        """Datos de los intervalos que se superponen con [start, end]"""
+        result = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node is None or node.center is None:
+                continue
+
+            if end < node.center:
+                for item in node.by_start:
+                    if item[0] > end:
+                        break
+                    result.append(item[2])
+                stack.append(node.left)
+            elif start > node.center:
+                for item in node.by_end:
+                    if item[1] < start:
+                        break
+                    result.append(item[2])
+                stack.append(node.right)
+            else:
+                result.extend(item[2] for item in node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return result
@@ -0,0 +1,89 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.availability import booked_masks, compute_bitmaps
+from core.bitmaps import SLOTS_PER_DAY
+from core.calendar_matrix import branch_calendar, encode_rows, free_bits
+from core.capacity import full_masks
+from core.models import Branch
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el calendario de sucursal vectorizado (NumPy) contra el '
+        'cálculo escalar por intervalos, ambos hasta la matriz densa que '
+        'consume la recepción: tiempos y coincidencia de resultados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('branch', type=int, help='ID de la sucursal')
+        parser.add_argument('--days', type=int, default=14)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        branch = Branch.objects.filter(pk=options['branch']).first()
+        if branch is None:
+            raise CommandError('Sucursal inexistente.')
+
+        days = options['days']
+        repeat = options['repeat']
+        date_from = timezone.localdate()
+        professional_ids = list(
+            branch.professionals.filter(is_active=True).values_list('id', flat=True)
+        )
+
+        def scalar():
+            date_to = date_from + timezone.timedelta(days=days - 1)
+            computed = compute_bitmaps(branch, professional_ids, date_from, date_to)
+            booked = booked_masks(professional_ids, date_from, date_to)
+            chairs_full = full_masks(branch, date_from, date_to)
+            free = {
+                key: bits & ~booked.get(key, 0) & ~chairs_full.get(key[1], 0)
+                for key, bits in computed.items()
+            }
+            # Matriz densa bloque a bloque (solo libre / no libre)
+            rows = {
+                key: ''.join('1' if bits >> i & 1 else '0' for i in range(SLOTS_PER_DAY))
+                for key, bits in free.items()
+            }
+            return free, rows
+
+        def vectorized():
+            dates, matrix = branch_calendar(branch, professional_ids, date_from, days)
+            return dates, matrix, encode_rows(matrix)
+
+        scalar_time, (expected, _) = self.measure(scalar, repeat)
+        vector_time, (dates, matrix, _) = self.measure(vectorized, repeat)
+
+        mismatches = sum(
+            1
+            for p, professional_id in enumerate(professional_ids)
+            for d, day in enumerate(dates)
+            if free_bits(matrix[p, d]) != expected[(professional_id, day)]
+        )
+
+        self.stdout.write(
+            f'{branch.name}: {len(professional_ids)} profesionales x {days} días '
+            f'x {matrix.shape[2]} bloques'
+        )
+        self.stdout.write(f'Escalar:     {scalar_time * 1000:8.2f} ms')
+        self.stdout.write(f'Vectorizado: {vector_time * 1000:8.2f} ms')
+        if vector_time:
+            self.stdout.write(f'Aceleración: {scalar_time / vector_time:8.2f}x')
+
+        if mismatches:
+            raise CommandError(f'{mismatches} días no coinciden entre ambos cálculos.')
+        self.stdout.write(self.style.SUCCESS('Resultados idénticos.'))
+
+    def measure(self, func, repeat):
+        """Mejor tiempo de `repeat` ejecuciones y el último resultado"""
+        best = None
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
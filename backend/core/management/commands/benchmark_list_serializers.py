@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.models import Branch, Professional, Service
+from core.serializers import BranchListSerializer, ProfessionalListSerializer, ServiceListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara los serializers de listados (DRF sobre instancias) contra el '
+        'modo rápido sobre filas de .values(), desde la query hasta los bytes '
+        'JSON: tiempos y coincidencia byte a byte.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help='Filas por listado')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        repeat = options['repeat']
+        request = Request(APIRequestFactory().get('/api/', HTTP_HOST='localhost'))
+        renderer = JSONRenderer()
+
+        failed = []
+        for serializer_class, model in (
+            (BranchListSerializer, Branch),
+            (ServiceListSerializer, Service),
+            (ProfessionalListSerializer, Professional),
+        ):
+            queryset = model.objects.order_by('id')[:limit]
+
+            def drf():
+                objects = serializer_class.optimize_queryset(queryset)
+                data = serializer_class(objects, many=True, context={'request': request}).data
+                return renderer.render(data)
+
+            def fast():
+                rows = serializer_class.values_queryset(model.objects.order_by('id'))[:limit]
+                return renderer.render(serializer_class.values_data(rows, request=request))
+
+            drf_time, expected = self.measure(drf, repeat)
+            fast_time, content = self.measure(fast, repeat)
+
+            rows = model.objects.count()
+            self.stdout.write(f'{serializer_class.__name__}: {min(rows, limit)} filas')
+            self.stdout.write(f'  DRF:    {drf_time * 1000:8.2f} ms')
+            self.stdout.write(f'  Rápido: {fast_time * 1000:8.2f} ms')
+            if fast_time:
+                self.stdout.write(f'  Aceleración: {drf_time / fast_time:6.2f}x')
+            if content != expected:
+                failed.append(serializer_class.__name__)
+
+        if failed:
+            raise CommandError(f'Salidas distintas en: {", ".join(failed)}.')
+        self.stdout.write(self.style.SUCCESS('Salidas idénticas byte a byte.'))
+
+    def measure(self, func, repeat):
+        """Mejor tiempo de `repeat` ejecuciones y el último resultado"""
+        best = None
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
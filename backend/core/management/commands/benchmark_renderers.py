@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Professional
+from core.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+from core.serializers import ProfessionalListSerializer
+from core.views import _home_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el JSONRenderer de DRF contra FastJSONRenderer (orjson) y '
+        'MessagePack sobre los datos del home y del listado de profesionales: '
+        'tiempos, tamaños y coincidencia byte a byte del JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help='Profesionales del listado')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson no está instalado: FastJSONRenderer usa json.'))
+
+        professionals = ProfessionalListSerializer.values_data(
+            ProfessionalListSerializer.values_queryset(
+                Professional.objects.filter(is_active=True).order_by('-average_rating', '-id')
+            )[:options['limit']]
+        )
+        payloads = {
+            'home': _home_data(),
+            f'profesionales ({len(professionals)})': {
+                'count': len(professionals),
+                'next': None,
+                'previous': None,
+                'results': professionals,
+            },
+        }
+        renderers = [('DRF JSON', JSONRenderer()), ('orjson', FastJSONRenderer())]
+        if msgpack is not None:
+            renderers.append(('MessagePack', MessagePackRenderer()))
+
+        mismatches = []
+        for name, data in payloads.items():
+            self.stdout.write(f'{name}:')
+            baseline_time = None
+            contents = {}
+            for label, renderer in renderers:
+                elapsed, content = self.measure(lambda: renderer.render(data), options['repeat'])
+                contents[label] = content
+                baseline_time = baseline_time or elapsed
+                self.stdout.write(
+                    f'  {label:<12} {elapsed * 1000:8.3f} ms  {len(content):>9} bytes'
+                    f'  {baseline_time / elapsed:6.2f}x'
+                )
+            if contents['orjson'] != contents['DRF JSON']:
+                mismatches.append(name)
+
+        if mismatches:
+            raise CommandError(f'El JSON no coincide en: {", ".join(mismatches)}.')
+        self.stdout.write(self.style.SUCCESS('JSON idéntico byte a byte.'))
+
+    def measure(self, func, repeat):
+        """Mejor tiempo de `repeat` ejecuciones y el último resultado"""
+        best = None
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta las copias estáticas del catálogo (JSON con hash en el nombre) '
+        'a CATALOG_SNAPSHOT_ROOT y cambia manifest.json a la nueva versión.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=None,
+            help='Versiones a conservar (por defecto CATALOG_SNAPSHOT_KEEP)',
+        )
+
+    def handle(self, *args, **options):
+        if options['keep'] is not None and options['keep'] < 1:
+            raise CommandError('--keep tiene que ser al menos 1.')
+
+        try:
+            manifest, switched = snapshots.export(keep=options['keep'])
+        except snapshots.ExportInProgress as e:
+            raise CommandError(str(e))
+        for name, item in manifest['files'].items():
+            self.stdout.write(f'  {name:<22} {item["file"]:<40} {item["bytes"]:>9} bytes')
+        if switched:
+            self.stdout.write(self.style.SUCCESS(f'Versión {manifest["version"]} publicada.'))
+        else:
+            self.stdout.write(f'Sin cambios: sigue la versión {manifest["version"]}.')
@@ -0,0 +1,199 @@
+import asyncio
+import statistics
+import time
+from io import BytesIO
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga en el mismo proceso, con un solo worker: las vistas '
+        'sync servidas por WSGI (un request a la vez), las mismas vistas sync '
+        'bajo ASGI y las vistas async de /api/async/ bajo ASGI, con la misma '
+        'cantidad de requests concurrentes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Ruta relativa a /api/ (se puede repetir). Por defecto: listados del catálogo.',
+        )
+        parser.add_argument('--requests', type=int, default=200, help='Requests por ruta y modo')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests simultáneos bajo ASGI')
+        parser.add_argument(
+            '--db-latency-ms',
+            type=float,
+            default=2.0,
+            help=(
+                'Demora agregada a cada consulta, para simular el viaje de red a '
+                'una base remota (SQLite es local). 0 para medir sin demora.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [
+            'branches/',
+            'services/',
+            'professionals/',
+            'professionals/?count=false',
+            'home/',
+        ]
+        total = options['requests']
+        concurrency = options['concurrency']
+        if total < 1 or concurrency < 1:
+            raise CommandError('--requests y --concurrency tienen que ser positivos.')
+
+        latency = options['db_latency_ms'] / 1000
+        if latency:
+            self.add_latency(latency)
+        self.stdout.write(
+            f'{total} requests por ruta, concurrencia ASGI {concurrency}, '
+            f'demora por consulta {options["db_latency_ms"]:g} ms'
+        )
+
+        wsgi = get_wsgi_application()
+        asgi = get_asgi_application()
+        for path in paths:
+            self.stdout.write(f'{path}:')
+            baseline = None
+            modes = [
+                ('WSGI sync', lambda: self.run_wsgi(wsgi, '/api/' + path, total)),
+                ('ASGI sync', lambda: self.run_asgi(asgi, '/api/' + path, total, concurrency)),
+                ('ASGI async', lambda: self.run_asgi(asgi, '/api/async/' + path, total, concurrency)),
+            ]
+            for label, run in modes:
+                elapsed, latencies, statuses = run()
+                if statuses - {200}:
+                    raise CommandError(f'{label} {path}: respuestas {sorted(statuses)}.')
+                throughput = total / elapsed
+                baseline = baseline or throughput
+                self.stdout.write(
+                    f'  {label:<11} {throughput:8.1f} req/s'
+                    f'  p50 {self.percentile(latencies, 50):7.1f} ms'
+                    f'  p95 {self.percentile(latencies, 95):7.1f} ms'
+                    f'  {throughput / baseline:5.2f}x'
+                )
+
+    def add_latency(self, seconds):
+        def delay(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        # Las conexiones de cada hilo se crean durante la prueba
+        connection_created.connect(install, weak=False)
+        for connection in connections.all(initialized_only=True):
+            install(None, connection)
+
+    # ========== WSGI ==========
+
+    def run_wsgi(self, app, path, total):
+        """Un worker sync: los requests se atienden de a uno"""
+        # Un request previo para llenar las cachés, igual que en ASGI
+        self.call_wsgi(app, path)
+        latencies, statuses = [], set()
+        start = time.perf_counter()
+        for _ in range(total):
+            began = time.perf_counter()
+            statuses.add(self.call_wsgi(app, path))
+            latencies.append(time.perf_counter() - began)
+        return time.perf_counter() - start, latencies, statuses
+
+    def call_wsgi(self, app, url):
+        path, _, query = url.partition('?')
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'HTTP_HOST': 'localhost',
+            'HTTP_ACCEPT': 'application/json',
+            'REMOTE_ADDR': '127.0.0.1',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': BytesIO(),
+            'wsgi.errors': BytesIO(),
+            'wsgi.version': (1, 0),
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        status = []
+        result = app(environ, lambda line, headers, exc_info=None: status.append(line))
+        try:
+            b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return int(status[0].split()[0])
+
+    # ========== ASGI ==========
+
+    def run_asgi(self, app, path, total, concurrency):
+        return asyncio.run(self.load_asgi(app, path, total, concurrency))
+
+    async def load_asgi(self, app, path, total, concurrency):
+        """Un worker ASGI: `concurrency` clientes repartiéndose los requests"""
+        await self.call_asgi(app, path)
+        latencies, statuses = [], set()
+        pending = iter(range(total))
+
+        async def client():
+            for _ in pending:
+                began = time.perf_counter()
+                statuses.add(await self.call_asgi(app, path))
+                latencies.append(time.perf_counter() - began)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return time.perf_counter() - start, latencies, statuses
+
+    async def call_asgi(self, app, url):
+        path, _, query = url.partition('?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'accept', b'application/json')],
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # El cliente no se desconecta: Django cancela la espera al terminar
+            await asyncio.Event().wait()
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await app(scope, receive, send)
+        return messages[0]['status']
+
+    def percentile(self, values, percent):
+        if len(values) < 2:
+            return values[0] * 1000
+        return statistics.quantiles(values, n=100)[percent - 1] * 1000
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import bitmaps
+from core.availability import compute_bitmaps, horizon, store_bitmaps
+from core.models import AvailabilityBitmap, Branch
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye desde cero los mapas de bits de disponibilidad del '
+        'horizonte, o verifica que los materializados estén al día (--verify).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--branch',
+            type=int,
+            help='Procesar solo esta sucursal',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='No escribe: compara lo materializado contra los horarios',
+        )
+
+    def handle(self, *args, **options):
+        branches = Branch.objects.filter(is_active=True)
+        if options['branch']:
+            branches = branches.filter(id=options['branch'])
+
+        date_from, date_to = horizon()
+        errors = 0
+
+        for branch in branches:
+            professional_ids = list(branch.professionals.values_list('id', flat=True))
+            computed = compute_bitmaps(branch, professional_ids, date_from, date_to)
+
+            if options['verify']:
+                errors += self.verify(branch, computed, date_from, date_to)
+                continue
+
+            with transaction.atomic():
+                AvailabilityBitmap.objects.filter(branch=branch).delete()
+                store_bitmaps(branch, computed)
+
+            self.stdout.write(
+                f'{branch.name}: {len(computed)} días materializados '
+                f'({date_from} a {date_to})'
+            )
+
+        # Los días pasados ya no se consultan
+        if not options['verify']:
+            AvailabilityBitmap.objects.filter(date__lt=date_from).delete()
+
+        if errors:
+            raise CommandError(f'{errors} mapas de bits desactualizados.')
+        self.stdout.write(self.style.SUCCESS('Disponibilidad materializada OK.'))
+
+    def verify(self, branch, computed, date_from, date_to):
+        """Cuenta los mapas de bits que difieren de los calculados"""
+        stored = {
+            (professional_id, day): bitmaps.from_bytes(bits)
+            for professional_id, day, bits in AvailabilityBitmap.objects.filter(
+                branch=branch,
+                date__range=(date_from, date_to),
+            ).values_list('professional_id', 'date', 'bits')
+        }
+
+        errors = 0
+        for key, bits in computed.items():
+            # Los días faltantes se completan al leerlos; no son un error
+            if key in stored and stored[key] != bits:
+                errors += 1
+                self.stdout.write(self.style.WARNING(
+                    f'{branch.name}: profesional {key[0]} el {key[1]} desactualizado'
+                ))
+
+        for key in stored.keys() - computed.keys():
+            errors += 1
+            self.stdout.write(self.style.WARNING(
+                f'{branch.name}: profesional {key[0]} el {key[1]} no debería existir'
+            ))
+
+        return errors
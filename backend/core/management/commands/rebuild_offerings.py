@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import offerings
+from core.models import ProfessionalOffering
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye la tabla de profesionales por sucursal y servicio '
+        '(necesario después de cargas masivas sin señales).'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            offerings.rebuild()
+        self.stdout.write(f'{ProfessionalOffering.objects.count()} filas cargadas')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import search
+from core.models import Professional, Service
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye el índice de búsqueda de texto completo de servicios y '
+        'profesionales (necesario después de cargas masivas sin señales).'
+    )
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('El motor de base de datos no tiene índice de texto completo.')
+
+        for model in (Service, Professional):
+            with transaction.atomic():
+                search.rebuild(model)
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {model.objects.count()} documentos indexados'
+            )
@@ -0,0 +1,206 @@
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.capacity import ChairOccupancy
+from core.intervals import time_to_minutes
+from core.models import Appointment, Branch, Professional, ProfessionalSchedule, Service
+from core.views import AppointmentListCreateView, SlotHoldView
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga de reservas concurrentes contra la base local: '
+        'dispara POST /api/appointments/ en paralelo sobre pocos horarios y '
+        'verifica que no haya turnos superpuestos ni sillas excedidas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Reservas a disparar')
+        parser.add_argument('--workers', type=int, default=16, help='Hilos en paralelo')
+        parser.add_argument('--professionals', type=int, default=4)
+        parser.add_argument('--chairs', type=int, default=3)
+        parser.add_argument('--slots', type=int, default=6, help='Horarios "calientes" en disputa')
+        parser.add_argument('--hold', action='store_true', help='Retener el horario antes de confirmar')
+        parser.add_argument('--keep', action='store_true', help='No borrar los datos creados')
+
+    def handle(self, *args, **options):
+        fixture = self.create_fixture(options)
+        try:
+            self.run(fixture, options)
+        finally:
+            if not options['keep']:
+                self.cleanup(fixture)
+
+    def create_fixture(self, options):
+        """Sucursal, servicio, profesionales y clientes descartables"""
+        tag = uuid.uuid4().hex[:8]
+        today = timezone.localdate()
+        # Próximo sábado: el día más disputado
+        day = today + timedelta(days=(5 - today.weekday()) % 7 or 7)
+
+        branch = Branch.objects.create(
+            name=f'Stress {tag}',
+            address='-',
+            phone='-',
+            total_chairs=options['chairs'],
+            opening_time='09:00',
+            closing_time='19:00',
+        )
+        service = Service.objects.create(
+            name=f'Stress {tag}',
+            description='-',
+            price=1000,
+            duration_minutes=30,
+        )
+
+        professionals = []
+        for i in range(options['professionals']):
+            professional = Professional.objects.create(first_name=f'Stress{i}', last_name=tag)
+            professional.branches.add(branch)
+            professional.services.add(service)
+            ProfessionalSchedule.objects.create(
+                professional=professional,
+                branch=branch,
+                weekday=day.weekday(),
+                start_time='09:00',
+                end_time='19:00',
+            )
+            professionals.append(professional)
+
+        clients = [
+            User.objects.create_user(
+                email=f'stress-{tag}-{i}@example.com',
+                password=None,
+                first_name='Stress',
+                last_name=str(i),
+            )
+            for i in range(options['workers'])
+        ]
+
+        return {
+            'day': day,
+            'branch': branch,
+            'service': service,
+            'professionals': professionals,
+            'clients': clients,
+        }
+
+    def run(self, fixture, options):
+        factory = APIRequestFactory()
+        view = AppointmentListCreateView.as_view()
+        # Horarios en disputa: 10:00, 10:15, ... (se superponen entre sí)
+        hot_slots = [f'{10 + (15 * i) // 60:02d}:{(15 * i) % 60:02d}' for i in range(options['slots'])]
+        local = threading.local()
+        lock = threading.Lock()
+        clients = iter(fixture['clients'])
+
+        hold_view = SlotHoldView.as_view()
+
+        def post(target, path, payload):
+            request = factory.post(path, payload, format='json')
+            force_authenticate(request, user=local.client)
+            return target(request)
+
+        def book(_):
+            if not hasattr(local, 'client'):
+                with lock:
+                    local.client = next(clients)
+            payload = {
+                'branch': fixture['branch'].id,
+                'service': fixture['service'].id,
+                'professional': random.choice(fixture['professionals']).id,
+                'date': fixture['day'].isoformat(),
+                'start_time': random.choice(hot_slots),
+            }
+
+            start = time.perf_counter()
+            try:
+                if options['hold']:
+                    # El conflicto se resuelve en la caché, sin tocar la base
+                    response = post(hold_view, '/api/holds/', payload)
+                    if response.status_code != 201:
+                        return f'hold {response.status_code}', time.perf_counter() - start
+                    payload['hold'] = response.data['token']
+                status_code = post(view, '/api/appointments/', payload).status_code
+            except Exception as e:
+                # Se reporta como respuesta inesperada
+                status_code = type(e).__name__
+            finally:
+                connections.close_all()
+            return status_code, time.perf_counter() - start
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(book, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        statuses = Counter(code for code, _ in results)
+        latencies = sorted(latency for _, latency in results)
+
+        self.stdout.write(f"{options['requests']} reservas con {options['workers']} hilos en {elapsed:.2f} s")
+        self.stdout.write(f"Throughput: {options['requests'] / elapsed:.1f} req/s")
+        self.stdout.write(
+            f"Latencia p50: {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms"
+        )
+        self.stdout.write(f'Respuestas: {dict(statuses)}')
+
+        problems = self.check_invariants(fixture)
+        unexpected = {code: n for code, n in statuses.items() if code not in (201, 409, 'hold 409')}
+        if unexpected:
+            problems.append(f'Respuestas inesperadas: {unexpected}')
+
+        if problems:
+            raise CommandError('\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS('Sin superposiciones ni sillas excedidas.'))
+
+    def check_invariants(self, fixture):
+        """Verifica en la base que no haya doble reserva ni sobreocupación"""
+        problems = []
+        appointments = list(Appointment.objects.filter(
+            branch=fixture['branch'],
+            status__in=Appointment.ACTIVE_STATUSES,
+        ).order_by('professional_id', 'start_time'))
+
+        by_professional = defaultdict(list)
+        for appointment in appointments:
+            by_professional[appointment.professional_id].append(appointment)
+
+        for professional_id, items in by_professional.items():
+            for previous, current in zip(items, items[1:]):
+                if current.start_time < previous.end_time:
+                    problems.append(
+                        f'Profesional {professional_id}: {previous.start_time} y '
+                        f'{current.start_time} se superponen'
+                    )
+
+        occupancy = ChairOccupancy(fixture['branch'].total_chairs, [
+            (time_to_minutes(a.start_time), time_to_minutes(a.end_time))
+            for a in appointments
+        ])
+        peak = max((count for _, _, count in occupancy.segments), default=0)
+        if peak > fixture['branch'].total_chairs:
+            problems.append(f'Sillas excedidas: {peak} de {fixture["branch"].total_chairs}')
+
+        self.stdout.write(f'Turnos creados: {len(appointments)}, pico de sillas: {peak}')
+        return problems
+
+    def cleanup(self, fixture):
+        Appointment.objects.filter(branch=fixture['branch']).delete()
+        for professional in fixture['professionals']:
+            professional.delete()
+        fixture['branch'].delete()
+        fixture['service'].delete()
+        User.objects.filter(pk__in=[client.pk for client in fixture['clients']]).delete()
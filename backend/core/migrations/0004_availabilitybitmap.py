@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_remove_professional_friday_end_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('bits', models.BinaryField(max_length=36, verbose_name='Bloques libres')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última actualización')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_bitmaps', to='core.branch', verbose_name='Sucursal')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_bitmaps', to='core.professional', verbose_name='Profesional')),
+            ],
+            options={
+                'verbose_name': 'Disponibilidad materializada',
+                'verbose_name_plural': 'Disponibilidades materializadas',
+                'constraints': [models.UniqueConstraint(fields=('branch', 'date', 'professional'), name='core_bitmap_branch_date_professional')],
+            },
+        ),
+    ]
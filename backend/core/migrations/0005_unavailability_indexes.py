@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_availabilitybitmap'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='professionalunavailability',
+            index=models.Index(fields=['professional', 'start_date', 'end_date'], name='core_unavail_prof_dates'),
+        ),
+        migrations.AddIndex(
+            model_name='professionalunavailability',
+            index=models.Index(fields=['start_date', 'end_date'], name='core_unavail_dates'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_unavailability_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Appointment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('start_time', models.TimeField(verbose_name='Hora de inicio')),
+                ('end_time', models.TimeField(verbose_name='Hora de fin')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('confirmed', 'Confirmado'), ('completed', 'Completado'), ('cancelled', 'Cancelado'), ('no_show', 'No asistió')], default='confirmed', max_length=20, verbose_name='Estado')),
+                ('price', models.DecimalField(decimal_places=2, help_text='Precio del servicio al momento de reservar', max_digits=10, verbose_name='Precio')),
+                ('notes', models.TextField(blank=True, verbose_name='Notas')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última actualización')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='appointments', to='core.branch', verbose_name='Sucursal')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to=settings.AUTH_USER_MODEL, verbose_name='Cliente')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='appointments', to='core.professional', verbose_name='Profesional')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='appointments', to='core.service', verbose_name='Servicio')),
+            ],
+            options={
+                'verbose_name': 'Turno',
+                'verbose_name_plural': 'Turnos',
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(fields=['professional', 'date'], name='core_appt_professional_date'), models.Index(fields=['branch', 'date'], name='core_appt_branch_date')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=('professional', 'date', 'start_time'), name='core_appt_unique_active_start'), models.CheckConstraint(condition=models.Q(('end_time__gt', models.F('start_time'))), name='core_appt_end_after_start')],
+            },
+        ),
+    ]
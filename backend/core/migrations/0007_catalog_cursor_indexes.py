@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_appointment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='professional',
+            index=models.Index(fields=['average_rating', 'id'], name='core_prof_rating_id'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['name', 'id'], name='core_service_name_id'),
+        ),
+    ]
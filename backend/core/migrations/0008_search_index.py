@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from core import search
+
+
+def create_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if not search.is_supported(conn):
+        return
+    search.create_tables(conn)
+    for name in ('Service', 'Professional'):
+        search.rebuild(apps.get_model('core', name), conn=conn)
+
+
+def drop_index(apps, schema_editor):
+    search.drop_tables(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_catalog_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
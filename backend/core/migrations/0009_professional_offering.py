@@ -0,0 +1,52 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.offerings import keys_for
+
+
+def populate(apps, schema_editor):
+    Professional = apps.get_model('core', 'Professional')
+    ProfessionalOffering = apps.get_model('core', 'ProfessionalOffering')
+
+    branches, services = {}, {}
+    for professional_id, branch_id in Professional.branches.through.objects.values_list(
+        'professional_id', 'branch_id'
+    ):
+        branches.setdefault(professional_id, []).append(branch_id)
+    for professional_id, service_id in Professional.services.through.objects.values_list(
+        'professional_id', 'service_id'
+    ):
+        services.setdefault(professional_id, []).append(service_id)
+
+    ProfessionalOffering.objects.bulk_create([
+        ProfessionalOffering(branch_key=branch_id, service_key=service_id, professional_id=pk)
+        for pk in Professional.objects.filter(is_active=True).values_list('id', flat=True)
+        for branch_id, service_id in keys_for(branches.get(pk, []), services.get(pk, []))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfessionalOffering',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('branch_key', models.PositiveIntegerField(verbose_name='Sucursal (0 = cualquiera)')),
+                ('service_key', models.PositiveIntegerField(verbose_name='Servicio (0 = cualquiera)')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offerings', to='core.professional', verbose_name='Profesional')),
+            ],
+            options={
+                'verbose_name': 'Oferta de profesional',
+                'verbose_name_plural': 'Ofertas de profesionales',
+                'constraints': [models.UniqueConstraint(fields=('branch_key', 'service_key', 'professional'), name='core_offering_branch_service_professional')],
+            },
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:53
+
+from django.db import migrations, models
+
+from core.geo import encode
+
+
+def populate(apps, schema_editor):
+    Branch = apps.get_model('core', 'Branch')
+    branches = list(
+        Branch.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    )
+    for branch in branches:
+        branch.geohash = encode(branch.latitude, branch.longitude)
+    Branch.objects.bulk_update(branches, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_professional_offering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='branch',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Celda de la ubicación para la búsqueda por cercanía (ver core.geo)', max_length=12, verbose_name='Geohash'),
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,16 @@
-from django.db import models
+import threading
+import uuid
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 from users.models import User
+from . import geo
+from .bitmaps import BITMAP_BYTES
+from .intervals import IntervalTree
 
 
 class Branch(models.Model):
@@ -41,6 +51,14 @@ class Branch(models.Model):
         blank=True,
         help_text='Coordenada GPS para el mapa'
     )
+    geohash = models.CharField(
+        'Geohash',
+        max_length=12,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text='Celda de la ubicación para la búsqueda por cercanía (ver core.geo)'
+    )
     
     # Capacidad
     total_chairs = models.PositiveIntegerField(
@@ -109,6 +127,45 @@ class Branch(models.Model):
             6: self.sunday_open,
         }
         return days_map.get(day_number, False)
+    
+    # Campo del día de atención según weekday() (0=Lunes)
+    DAY_FIELDS = (
+        'monday_open',
+        'tuesday_open',
+        'wednesday_open',
+        'thursday_open',
+        'friday_open',
+        'saturday_open',
+        'sunday_open',
+    )
+    
+    def is_open_at(self, moment):
+        """Verifica si está abierta en una fecha y hora (datetime local)"""
+        return (
+            self.is_open_on_day(moment.weekday())
+            and self.opening_time <= moment.time() < self.closing_time
+        )
+    
+    @classmethod
+    def open_at_filter(cls, moment):
+        """Q equivalente a is_open_at, para filtrar en la base"""
+        current = moment.time()
+        return models.Q(
+            **{cls.DAY_FIELDS[moment.weekday()]: True},
+            opening_time__lte=current,
+            closing_time__gt=current,
+        )
+    
+    def save(self, *args, **kwargs):
+        """Actualizar el geohash con la ubicación"""
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
 
 
 class Service(models.Model):
@@ -169,6 +226,10 @@ class Service(models.Model):
         verbose_name = 'Servicio'
         verbose_name_plural = 'Servicios'
         ordering = ['name']
+        indexes = [
+            # Paginación por cursor (ServiceListView)
+            models.Index(fields=['name', 'id'], name='core_service_name_id'),
+        ]
     
     def __str__(self):
         return f"{self.name} - ${self.price}"
@@ -265,6 +326,10 @@ class Professional(models.Model):
         verbose_name = 'Profesional'
         verbose_name_plural = 'Profesionales'
         ordering = ['first_name', 'last_name']
+        indexes = [
+            # Paginación por cursor de los listados de profesionales
+            models.Index(fields=['average_rating', 'id'], name='core_prof_rating_id'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -283,6 +348,82 @@ class Professional(models.Model):
         pass
 
 
+# Árboles de intervalos por profesional: {professional_id: (versión, árbol)},
+# del menos al más usado recientemente (LRU de AVAILABILITY_TREE_CACHE_SIZE)
+_unavailability_trees = OrderedDict()
+_unavailability_trees_lock = threading.Lock()
+
+
+class ProfessionalUnavailabilityQuerySet(models.QuerySet):
+    """QuerySet de bloqueos con consultas por rango de fechas"""
+    
+    def overlapping(self, start_date, end_date):
+        """Bloqueos que se superponen con [start_date, end_date]"""
+        return self.filter(start_date__lte=end_date, end_date__gte=start_date)
+    
+    def full_day(self):
+        return self.filter(models.Q(start_time__isnull=True) | models.Q(end_time__isnull=True))
+
+
+class ProfessionalUnavailabilityManager(models.Manager.from_queryset(ProfessionalUnavailabilityQuerySet)):
+    """
+    Manager de bloqueos con un índice de intervalos en memoria por profesional.
+    La versión de cada árbol vive en el cache compartido, así que una
+    invalidación se ve en todos los procesos.
+    """
+    
+    VERSION_KEY = 'core:unavailability:version:{}'
+    
+    def _version(self, professional_id, versions):
+        key = self.VERSION_KEY.format(professional_id)
+        version = versions.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex, None)
+            version = cache.get(key)
+        return version
+    
+    def interval_trees(self, professional_ids):
+        """
+        Árboles de intervalos (IntervalTree) de los bloqueos de cada profesional.
+        Solo consulta la base para los árboles que no están en memoria o quedaron
+        desactualizados, con una única query.
+        """
+        professional_ids = list(professional_ids)
+        versions = cache.get_many([self.VERSION_KEY.format(pid) for pid in professional_ids])
+        
+        trees = {}
+        stale = {}
+        with _unavailability_trees_lock:
+            for professional_id in professional_ids:
+                version = self._version(professional_id, versions)
+                cached = _unavailability_trees.get(professional_id)
+                if cached is not None and cached[0] == version:
+                    _unavailability_trees.move_to_end(professional_id)
+                    trees[professional_id] = cached[1]
+                else:
+                    stale[professional_id] = version
+        
+        if stale:
+            items = defaultdict(list)
+            for block in self.filter(professional_id__in=list(stale)):
+                items[block.professional_id].append((block.start_date, block.end_date, block))
+            with _unavailability_trees_lock:
+                for professional_id, version in stale.items():
+                    tree = IntervalTree(items[professional_id])
+                    _unavailability_trees[professional_id] = (version, tree)
+                    _unavailability_trees.move_to_end(professional_id)
+                    trees[professional_id] = tree
+                # Se descartan los menos usados; la versión sigue en la caché
+                while len(_unavailability_trees) > settings.AVAILABILITY_TREE_CACHE_SIZE:
+                    _unavailability_trees.popitem(last=False)
+        
+        return trees
+    
+    def invalidate(self, professional_id):
+        """Marca como desactualizado el árbol de un profesional"""
+        cache.set(self.VERSION_KEY.format(professional_id), uuid.uuid4().hex, None)
+
+
 class ProfessionalUnavailability(models.Model):
     """Bloqueos de horario del profesional (vacaciones, ausencias, etc.)"""
     
@@ -327,10 +468,19 @@ class ProfessionalUnavailability(models.Model):
     
     created_at = models.DateTimeField('Fecha de creación', auto_now_add=True)
     
+    objects = ProfessionalUnavailabilityManager()
+    
     class Meta:
         verbose_name = 'Indisponibilidad de Profesional'
         verbose_name_plural = 'Indisponibilidades de Profesionales'
         ordering = ['-start_date']
+        indexes = [
+            models.Index(
+                fields=['professional', 'start_date', 'end_date'],
+                name='core_unavail_prof_dates',
+            ),
+            models.Index(fields=['start_date', 'end_date'], name='core_unavail_dates'),
+        ]
     
     def __str__(self):
         return f"{self.professional.get_full_name()} - {self.start_date} a {self.end_date}"
@@ -338,7 +488,27 @@ class ProfessionalUnavailability(models.Model):
     def is_full_day(self):
         """Verifica si es un bloqueo de día completo"""
         return self.start_time is None or self.end_time is None
-    
+
+    def blocked_minutes_on(self, day):
+        """
+        Retorna el intervalo bloqueado (minutos desde medianoche) para una fecha.
+        Un bloqueo parcial de varios días corre desde start_time del primer día
+        hasta end_time del último.
+        """
+        if day < self.start_date or day > self.end_date:
+            return None
+
+        start, end = 0, 24 * 60
+        if not self.is_full_day():
+            if day == self.start_date:
+                start = self.start_time.hour * 60 + self.start_time.minute
+            if day == self.end_date:
+                end = self.end_time.hour * 60 + self.end_time.minute
+
+        if start >= end:
+            return None
+        return (start, end)
+
     def clean(self):
         """Validaciones personalizadas"""
         from django.core.exceptions import ValidationError
@@ -357,11 +527,66 @@ class ProfessionalUnavailability(models.Model):
                         raise ValidationError({
                             'end_time': 'La hora de fin debe ser posterior a la hora de inicio.'
                         })
+    
+    def _merge_candidates(self, exclude):
+        """Bloqueos del mismo profesional y motivo que se superponen o tocan con este"""
+        one_day = timedelta(days=1)
+        candidates = ProfessionalUnavailability.objects.filter(
+            professional_id=self.professional_id,
+            reason=self.reason,
+        ).overlapping(
+            self.start_date - one_day,
+            self.end_date + one_day,
+        ).exclude(pk__in=exclude)
+        
+        if self.is_full_day():
+            return list(candidates.full_day())
         
+        # Bloqueos parciales: solo se unen los de un mismo día
+        if self.start_date != self.end_date:
+            return []
+        return list(candidates.filter(
+            start_date=self.start_date,
+            end_date=self.start_date,
+            start_time__lte=self.end_time,
+            end_time__gte=self.start_time,
+        ))
+    
+    def normalize(self):
+        """
+        Absorbe los bloqueos superpuestos o contiguos del mismo motivo, para que
+        el conjunto de intervalos del profesional quede mínimo.
+        Retorna los bloqueos absorbidos (a borrar).
+        """
+        absorbed = []
+        exclude = [self.pk] if self.pk else []
+        
+        while True:
+            candidates = self._merge_candidates(exclude)
+            if not candidates:
+                break
+            
+            for other in candidates:
+                self.start_date = min(self.start_date, other.start_date)
+                self.end_date = max(self.end_date, other.end_date)
+                if not self.is_full_day():
+                    self.start_time = min(self.start_time, other.start_time)
+                    self.end_time = max(self.end_time, other.end_time)
+                if other.notes and other.notes not in self.notes:
+                    self.notes = '\n'.join(filter(None, [self.notes, other.notes]))
+                exclude.append(other.pk)
+            absorbed.extend(candidates)
+        
+        return absorbed
+    
     def save(self, *args, **kwargs):
-        """Ejecutar validaciones antes de guardar"""
+        """Ejecutar validaciones y unir bloqueos superpuestos antes de guardar"""
         self.clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            absorbed = self.normalize()
+            super().save(*args, **kwargs)
+            for other in absorbed:
+                other.delete()
 
 
 class ProfessionalSchedule(models.Model):
@@ -445,4 +670,171 @@ class ProfessionalSchedule(models.Model):
     def save(self, *args, **kwargs):
         """Ejecutar validaciones antes de guardar"""
         self.clean()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class AvailabilityBitmap(models.Model):
+    """
+    Disponibilidad materializada de un profesional en una sucursal y fecha.
+    Un bit por bloque de 5 minutos (ver core.bitmaps); se mantiene por señales.
+    """
+    
+    professional = models.ForeignKey(
+        Professional,
+        on_delete=models.CASCADE,
+        related_name='availability_bitmaps',
+        verbose_name='Profesional'
+    )
+    
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.CASCADE,
+        related_name='availability_bitmaps',
+        verbose_name='Sucursal'
+    )
+    
+    date = models.DateField('Fecha')
+    bits = models.BinaryField('Bloques libres', max_length=BITMAP_BYTES)
+    
+    updated_at = models.DateTimeField('Última actualización', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Disponibilidad materializada'
+        verbose_name_plural = 'Disponibilidades materializadas'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['branch', 'date', 'professional'],
+                name='core_bitmap_branch_date_professional',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.professional_id} - {self.branch_id} - {self.date}"
+
+
+class ProfessionalOffering(models.Model):
+    """
+    Profesionales activos por (sucursal, servicio), desnormalizado para los
+    listados filtrados: cada filtro es una búsqueda por índice, sin unir las
+    dos tablas M2M ni DISTINCT. 0 en la sucursal o el servicio significa
+    "cualquiera". Se mantiene por señales (ver core.offerings).
+    """
+    
+    ANY = 0
+    
+    branch_key = models.PositiveIntegerField('Sucursal (0 = cualquiera)')
+    service_key = models.PositiveIntegerField('Servicio (0 = cualquiera)')
+    
+    professional = models.ForeignKey(
+        Professional,
+        on_delete=models.CASCADE,
+        related_name='offerings',
+        verbose_name='Profesional'
+    )
+    
+    class Meta:
+        verbose_name = 'Oferta de profesional'
+        verbose_name_plural = 'Ofertas de profesionales'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['branch_key', 'service_key', 'professional'],
+                name='core_offering_branch_service_professional',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.branch_key} - {self.service_key} - {self.professional_id}"
+
+
+class Appointment(models.Model):
+    """Turno reservado por un cliente"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('confirmed', 'Confirmado'),
+        ('completed', 'Completado'),
+        ('cancelled', 'Cancelado'),
+        ('no_show', 'No asistió'),
+    ]
+    
+    # Estados que ocupan al profesional y una silla
+    ACTIVE_STATUSES = ['pending', 'confirmed']
+    
+    client = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='appointments',
+        verbose_name='Cliente'
+    )
+    
+    professional = models.ForeignKey(
+        Professional,
+        on_delete=models.PROTECT,
+        related_name='appointments',
+        verbose_name='Profesional'
+    )
+    
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.PROTECT,
+        related_name='appointments',
+        verbose_name='Sucursal'
+    )
+    
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.PROTECT,
+        related_name='appointments',
+        verbose_name='Servicio'
+    )
+    
+    date = models.DateField('Fecha')
+    start_time = models.TimeField('Hora de inicio')
+    end_time = models.TimeField('Hora de fin')
+    
+    status = models.CharField(
+        'Estado',
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='confirmed'
+    )
+    
+    price = models.DecimalField(
+        'Precio',
+        max_digits=10,
+        decimal_places=2,
+        help_text='Precio del servicio al momento de reservar'
+    )
+    notes = models.TextField('Notas', blank=True)
+    
+    created_at = models.DateTimeField('Fecha de creación', auto_now_add=True)
+    updated_at = models.DateTimeField('Última actualización', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Turno'
+        verbose_name_plural = 'Turnos'
+        ordering = ['date', 'start_time']
+        indexes = [
+            models.Index(fields=['professional', 'date'], name='core_appt_professional_date'),
+            models.Index(fields=['branch', 'date'], name='core_appt_branch_date'),
+        ]
+        constraints = [
+            # Red de seguridad en la base: un profesional no puede tener dos
+            # turnos activos que empiecen a la misma hora
+            models.UniqueConstraint(
+                fields=['professional', 'date', 'start_time'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                name='core_appt_unique_active_start',
+            ),
+            models.CheckConstraint(
+                condition=models.Q(end_time__gt=models.F('start_time')),
+                name='core_appt_end_after_start',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.start_time:%H:%M} - {self.professional} - {self.service.name}"
+    
+    def is_active(self):
+        """Indica si el turno ocupa lugar en la agenda"""
+        return self.status in self.ACTIVE_STATUSES
@@ -0,0 +1,88 @@
+"""
+Tabla desnormalizada de profesionales por sucursal y servicio
+(ProfessionalOffering).
+
+Cada profesional activo tiene una fila por cada combinación de filtros que lo
+incluye: (sucursal, servicio), (sucursal, cualquiera) y (cualquiera,
+servicio). Así "profesionales de la sucursal B que hacen el servicio S" es una
+búsqueda por el índice único (branch_key, service_key, professional) en lugar
+de dos joins M2M con DISTINCT.
+
+Las señales reescriben las filas del profesional cuando cambian sus
+sucursales, sus servicios o is_active, en la misma transacción. Los cambios
+masivos (bulk_create, update) no disparan señales: después de esos correr
+`manage.py rebuild_offerings`.
+"""
+
+from .models import Professional, ProfessionalOffering
+
+ANY = ProfessionalOffering.ANY
+
+
+def keys_for(branch_ids, service_ids):
+    """Combinaciones (sucursal, servicio) en las que aparece un profesional"""
+    keys = [(branch_id, ANY) for branch_id in branch_ids]
+    keys += [(ANY, service_id) for service_id in service_ids]
+    keys += [
+        (branch_id, service_id)
+        for branch_id in branch_ids
+        for service_id in service_ids
+    ]
+    return keys
+
+
+def _rows(professionals):
+    """Filas de los profesionales dados ({id: is_active})"""
+    active = [pk for pk, is_active in professionals.items() if is_active]
+    branches, services = {}, {}
+    for professional_id, branch_id in Professional.branches.through.objects.filter(
+        professional_id__in=active
+    ).values_list('professional_id', 'branch_id'):
+        branches.setdefault(professional_id, []).append(branch_id)
+    for professional_id, service_id in Professional.services.through.objects.filter(
+        professional_id__in=active
+    ).values_list('professional_id', 'service_id'):
+        services.setdefault(professional_id, []).append(service_id)
+
+    return [
+        ProfessionalOffering(branch_key=branch_id, service_key=service_id, professional_id=pk)
+        for pk in active
+        for branch_id, service_id in keys_for(branches.get(pk, []), services.get(pk, []))
+    ]
+
+
+def sync(professional_ids):
+    """Reescribe las filas de los profesionales dados"""
+    professional_ids = set(professional_ids)
+    if not professional_ids:
+        return
+    professionals = dict(
+        Professional.objects.filter(id__in=professional_ids).values_list('id', 'is_active')
+    )
+    ProfessionalOffering.objects.filter(professional_id__in=professional_ids).delete()
+    ProfessionalOffering.objects.bulk_create(_rows(professionals), batch_size=1000)
+
+
+def remove_branch(branch_id):
+    ProfessionalOffering.objects.filter(branch_key=branch_id).delete()
+
+
+def remove_service(service_id):
+    ProfessionalOffering.objects.filter(service_key=service_id).delete()
+
+
+def rebuild():
+    """Vacía y vuelve a cargar la tabla completa"""
+    ProfessionalOffering.objects.all().delete()
+    professionals = dict(Professional.objects.values_list('id', 'is_active'))
+    ProfessionalOffering.objects.bulk_create(_rows(professionals), batch_size=1000)
+
+
+def filter_professionals(queryset, branch_id=None, service_id=None):
+    """Profesionales de `queryset` en la sucursal y/o con el servicio indicados"""
+    if not branch_id and not service_id:
+        return queryset
+    return queryset.filter(
+        offerings__branch_key=branch_id or ANY,
+        offerings__service_key=service_id or ANY,
+    )
@@ -0,0 +1,233 @@
+"""
+Paginación de los listados del catálogo.
+
+Además de la paginación por número de página de siempre, los listados pueden
+pedirse por cursor (keyset): cada página continúa desde los valores de orden
+del último elemento, con un WHERE sobre el índice compuesto en lugar de un
+OFFSET, así que la página 500 cuesta lo mismo que la primera.
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage, Page
+from django.db.models import Q
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+async def _alist(queryset):
+    return [row async for row in queryset]
+
+
+def _value(row, field):
+    """Valor de un campo en un objeto o en una fila de .values()"""
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Paginación por página (?page=N) o por cursor (?cursor=, vacío para la
+    primera página), solo hacia adelante, pensada para scroll infinito.
+
+    La vista define el orden del cursor en `cursor_ordering`, que tiene que
+    terminar en un campo único (ej: ('-average_rating', '-id')) y tener un
+    índice compuesto. Con ?count=false se omite el COUNT total.
+    """
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.include_count = request.query_params.get(
+            self.count_query_param, 'true'
+        ).lower() not in ('0', 'false', 'no')
+
+        if self.cursor_query_param in request.query_params:
+            return self.paginate_keyset(queryset, request, view)
+        if self.include_count:
+            self.mode = 'page'
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_without_count(queryset, request)
+
+    # ========== PÁGINAS SIN COUNT ==========
+
+    def paginate_without_count(self, queryset, request):
+        """Página N trayendo un elemento de más para saber si hay siguiente"""
+        return self.page_without_count(list(self.slice_without_count(queryset, request)))
+
+    def slice_without_count(self, queryset, request):
+        self.mode = 'page_no_count'
+        self.page_size = self.get_page_size(request)
+        try:
+            self.page_number = max(int(request.query_params.get(self.page_query_param, 1)), 1)
+        except ValueError:
+            self.page_number = 1
+
+        offset = (self.page_number - 1) * self.page_size
+        return queryset[offset:offset + self.page_size + 1]
+
+    def page_without_count(self, rows):
+        self.has_next = len(rows) > self.page_size
+        return rows[:self.page_size]
+
+    # ========== CURSOR ==========
+
+    def paginate_keyset(self, queryset, request, view):
+        queryset = self.keyset_queryset(queryset, request, view)
+        self.count = queryset.count() if self.include_count else None
+        return self.keyset_page(list(self.keyset_slice(queryset, request)))
+
+    def keyset_queryset(self, queryset, request, view):
+        """Queryset en el orden del cursor (sin la posición ni el límite)"""
+        self.mode = 'cursor'
+        self.ordering = tuple(view.cursor_ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+        # Se acepta el orden del cursor o un prefijo (ej: -average_rating)
+        requested = tuple(filter(None, request.query_params.get('ordering', '').split(',')))
+        if requested and requested != self.ordering[:len(requested)]:
+            raise serializers.ValidationError({
+                'ordering': f'Con cursor solo se puede ordenar por {",".join(self.ordering)}.'
+            })
+
+        return queryset.order_by(*self.ordering)
+
+    def keyset_slice(self, queryset, request):
+        """Filas desde el cursor, con una de más para saber si hay siguiente"""
+        position = self.decode_cursor(request.query_params[self.cursor_query_param], queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        self.page_size = self.get_page_size(request)
+        return queryset[:self.page_size + 1]
+
+    def keyset_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = (
+            [_value(rows[-1], field) for field in self.fields]
+            if self.has_next else None
+        )
+        return rows
+
+    def after(self, position):
+        """
+        Filas posteriores a `position` en el orden del cursor:
+        (a > x) OR (a = x AND b > y) OR ..., con < en los campos descendentes.
+        """
+        condition = Q()
+        for i, name in enumerate(self.ordering):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            step = Q(**{f'{self.fields[i]}__{lookup}': position[i]})
+            for field, value in zip(self.fields[:i], position[:i]):
+                step &= Q(**{field: value})
+            condition |= step
+        return condition
+
+    def encode_cursor(self, position):
+        data = json.dumps([str(value) for value in position]).encode()
+        return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor, model):
+        """Valores de orden del cursor (None para la primera página)"""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (ValueError, TypeError, DjangoValidationError):
+            raise serializers.ValidationError({'cursor': 'Cursor inválido.'})
+
+    # ========== ASYNC ==========
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset con el ORM async (ver core.async_views)"""
+        self.request = request
+        self.include_count = request.query_params.get(
+            self.count_query_param, 'true'
+        ).lower() not in ('0', 'false', 'no')
+
+        if self.cursor_query_param in request.query_params:
+            queryset = self.keyset_queryset(queryset, request, view)
+            self.count = await queryset.acount() if self.include_count else None
+            return self.keyset_page(await _alist(self.keyset_slice(queryset, request)))
+        if self.include_count:
+            self.mode = 'page'
+            return await self.apaginate_pages(queryset, request)
+        return self.page_without_count(await _alist(self.slice_without_count(queryset, request)))
+
+    async def apaginate_pages(self, queryset, request):
+        """Como PageNumberPagination.paginate_queryset, con el COUNT async"""
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count es un cached_property: se completa antes de usarlo
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+
+        bottom = (number - 1) * page_size
+        top = bottom + page_size
+        if top + paginator.orphans >= paginator.count:
+            top = paginator.count
+        self.page = Page(await _alist(queryset[bottom:top]), number, paginator)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    # ========== RESPUESTA ==========
+
+    def get_next_link(self):
+        if self.mode == 'page':
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.mode == 'cursor':
+            return replace_query_param(
+                url, self.cursor_query_param, self.encode_cursor(self.next_position)
+            )
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.mode == 'page':
+            return super().get_previous_link()
+        if self.mode == 'cursor' or self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        if self.mode == 'page':
+            return super().get_paginated_response(data)
+
+        payload = {}
+        if self.mode == 'cursor' and self.include_count:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        if self.mode == 'page_no_count':
+            payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
@@ -0,0 +1,63 @@
+"""
+Renderers de la API.
+
+- FastJSONRenderer: mismo JSON que el JSONRenderer de DRF (byte a byte en las
+  respuestas de la API), pero con orjson, que serializa en C fechas, horas y
+  arrays de NumPy. Si orjson no está instalado se comporta como el de DRF.
+- MessagePackRenderer: application/msgpack, mismo contenido que el JSON en
+  binario. Solo se registra si msgpack está instalado (ver settings).
+
+El renderer se elige por el header Accept (o ?format=json / ?format=msgpack).
+"""
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+# Lo que orjson no serializa solo (Decimal, lazy strings, sets...) se convierte
+# igual que en el encoder de DRF
+_default = JSONEncoder().default
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer con orjson para la salida compacta"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent is not None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        # Igual que DRF: JSON que también es JavaScript válido
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack con el mismo contenido que la respuesta JSON"""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Fechas, horas y Decimal salen como en el JSON
+        return msgpack.packb(data, default=_default, use_bin_type=True, datetime=False)
@@ -0,0 +1,192 @@
+"""
+Búsqueda de texto completo en servicios y profesionales.
+
+Cada modelo tiene una tabla índice aparte, con la misma clave que el modelo:
+- SQLite: tabla virtual FTS5, ordenada por bm25.
+- PostgreSQL: columna tsvector con índice GIN, ordenada por ts_rank.
+Con otros motores no hay índice y FullTextSearchFilter se comporta como el
+SearchFilter de DRF.
+
+El texto se guarda y se busca sin tildes ni mayúsculas, así "coloración" y
+"coloracion" coinciden. Cada palabra buscada coincide también como prefijo
+("colo" encuentra "coloración"). El título (nombre) pesa más que el cuerpo
+(descripción o especialidades).
+
+Las señales mantienen el índice al guardar y borrar. Los cambios masivos
+(bulk_create, update) no disparan señales: después de esos correr
+`manage.py rebuild_search_index`.
+"""
+
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+# Modelo -> (tabla índice, función que arma (título, cuerpo))
+DOCUMENTS = {
+    'service': (
+        'core_search_service',
+        lambda obj: (obj.name, obj.description),
+    ),
+    'professional': (
+        'core_search_professional',
+        lambda obj: (f'{obj.first_name} {obj.last_name}', obj.specialties),
+    ),
+}
+
+# Pesos de título y cuerpo
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+def normalize(text):
+    """Minúsculas y sin tildes"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    return re.findall(r'\w+', normalize(text))
+
+
+def _kind(model):
+    return model._meta.model_name
+
+
+def is_supported(conn=None):
+    """Indica si el motor de base tiene índice de texto completo"""
+    return (conn or connection).vendor in ('sqlite', 'postgresql')
+
+
+def is_indexed(model):
+    return _kind(model) in DOCUMENTS and is_supported()
+
+
+# ========== ESQUEMA ==========
+
+def create_tables(conn):
+    """Crea las tablas índice (se usa desde la migración)"""
+    with conn.cursor() as cursor:
+        for table, _ in DOCUMENTS.values():
+            if conn.vendor == 'sqlite':
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} '
+                    f"USING fts5(title, body, tokenize='unicode61 remove_diacritics 2')"
+                )
+            elif conn.vendor == 'postgresql':
+                cursor.execute(
+                    f'CREATE TABLE IF NOT EXISTS {table} '
+                    f'(id bigint PRIMARY KEY, document tsvector NOT NULL)'
+                )
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_document '
+                    f'ON {table} USING GIN (document)'
+                )
+
+
+def drop_tables(conn):
+    if not is_supported(conn):
+        return
+    with conn.cursor() as cursor:
+        for table, _ in DOCUMENTS.values():
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+# ========== ESCRITURA ==========
+
+def index_objects(model, objects, conn=None):
+    """Agrega o reemplaza los documentos de `objects` en el índice"""
+    conn = conn or connection
+    table, build = DOCUMENTS[_kind(model)]
+    rows = []
+    for obj in objects:
+        title, body = build(obj)
+        rows.append((obj.pk, normalize(title), normalize(body)))
+    if not rows:
+        return
+
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.executemany(f'DELETE FROM {table} WHERE rowid = %s', [(pk,) for pk, _, _ in rows])
+            cursor.executemany(f'INSERT INTO {table} (rowid, title, body) VALUES (%s, %s, %s)', rows)
+        else:
+            cursor.executemany(
+                f'INSERT INTO {table} (id, document) VALUES (%s, '
+                f"setweight(to_tsvector('spanish', %s), 'A') || "
+                f"setweight(to_tsvector('spanish', %s), 'B')) "
+                f'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document',
+                rows,
+            )
+
+
+def remove_objects(model, pks):
+    table, _ = DOCUMENTS[_kind(model)]
+    column = 'rowid' if connection.vendor == 'sqlite' else 'id'
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {table} WHERE {column} = %s', [(pk,) for pk in pks])
+
+
+def rebuild(model, queryset=None, conn=None):
+    """Vacía y vuelve a cargar el índice de un modelo"""
+    conn = conn or connection
+    table, _ = DOCUMENTS[_kind(model)]
+    with conn.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+    queryset = model._default_manager.all() if queryset is None else queryset
+    index_objects(model, queryset.iterator(chunk_size=2000), conn)
+
+
+# ========== LECTURA ==========
+
+def search_queryset(queryset, text):
+    """
+    `queryset` filtrado a los objetos que coinciden con todas las palabras de
+    `text` y anotado con `search_rank` (menor es más relevante). Todo queda
+    en SQL, así que el COUNT y cada página ven todas las coincidencias.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return queryset.none()
+    table, _ = DOCUMENTS[_kind(queryset.model)]
+    meta = queryset.model._meta
+    outer = f'{connection.ops.quote_name(meta.db_table)}.{connection.ops.quote_name(meta.pk.column)}'
+
+    if connection.vendor == 'sqlite':
+        query = ' '.join(f'"{token}"*' for token in tokens)
+        matches = f'SELECT rowid FROM {table} WHERE {table} MATCH %s'
+        rank = (
+            f'SELECT bm25({table}, {TITLE_WEIGHT}, {BODY_WEIGHT}) FROM {table} '
+            f'WHERE {table} MATCH %s AND rowid = {outer}'
+        )
+    else:
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        matches = f"SELECT id FROM {table} WHERE document @@ to_tsquery('spanish', %s)"
+        rank = (
+            f"SELECT -ts_rank(document, to_tsquery('spanish', %s)) FROM {table} "
+            f'WHERE id = {outer}'
+        )
+
+    return queryset.filter(pk__in=RawSQL(matches, [query])).annotate(
+        search_rank=RawSQL(rank, [query], output_field=FloatField())
+    )
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ?search= sobre el índice de texto completo.
+    Sin ?ordering los resultados se ordenan por relevancia; el filtro tiene
+    que ir después de OrderingFilter para que ese orden no se pise.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        if not tokenize(text) or not is_indexed(queryset.model):
+            return super().filter_queryset(request, queryset, view)
+
+        queryset = search_queryset(queryset, text)
+        if not request.query_params.get('ordering'):
+            queryset = queryset.order_by('search_rank', 'pk')
+        return queryset
@@ -1,8 +1,15 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Branch, Service, Professional, ProfessionalUnavailability, ProfessionalSchedule
+from .fastpath import ValuesSerializerMixin
+from .fieldsets import SparseFieldsMixin
+from .models import Branch, Service, Professional, ProfessionalUnavailability, ProfessionalSchedule, Appointment
 
 
-class BranchSerializer(serializers.ModelSerializer):
+class BranchSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer para Sucursales"""
     
     working_days = serializers.SerializerMethodField()
@@ -32,13 +39,19 @@ class BranchSerializer(serializers.ModelSerializer):
             'image',
             'description',
         ]
+        field_columns = {
+            'working_days': [
+                'monday_open', 'tuesday_open', 'wednesday_open', 'thursday_open',
+                'friday_open', 'saturday_open', 'sunday_open',
+            ],
+        }
     
     def get_working_days(self, obj):
         """Retorna lista de días que está abierta"""
         return obj.get_working_days()
 
 
-class BranchListSerializer(serializers.ModelSerializer):
+class BranchListSerializer(ValuesSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer simplificado para listar sucursales"""
     
     class Meta:
@@ -53,7 +66,20 @@ class BranchListSerializer(serializers.ModelSerializer):
         ]
 
 
-class ServiceSerializer(serializers.ModelSerializer):
+class NearbyBranchSerializer(BranchListSerializer):
+    """Sucursal cercana con su ubicación y la distancia al punto buscado"""
+    
+    distance_km = serializers.FloatField(read_only=True)
+    
+    class Meta(BranchListSerializer.Meta):
+        fields = BranchListSerializer.Meta.fields + [
+            'latitude',
+            'longitude',
+            'distance_km',
+        ]
+
+
+class ServiceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer para Servicios"""
     
     duration_display = serializers.SerializerMethodField()
@@ -73,13 +99,14 @@ class ServiceSerializer(serializers.ModelSerializer):
             'points_earned',
             'is_active',
         ]
+        field_columns = {'duration_display': ['duration_minutes']}
     
     def get_duration_display(self, obj):
         """Duración en formato legible"""
         return obj.get_duration_display()
 
 
-class ServiceListSerializer(serializers.ModelSerializer):
+class ServiceListSerializer(ValuesSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer simplificado para listar servicios"""
     
     duration_display = serializers.SerializerMethodField()
@@ -94,12 +121,14 @@ class ServiceListSerializer(serializers.ModelSerializer):
             'duration_display',
             'image',
         ]
+        field_columns = {'duration_display': ['duration_minutes']}
+        values_methods = {'duration_display': Service.get_duration_display}
     
     def get_duration_display(self, obj):
         return obj.get_duration_display()
 
 
-class ProfessionalSerializer(serializers.ModelSerializer):
+class ProfessionalSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer para Profesionales"""
     
     full_name = serializers.SerializerMethodField()
@@ -125,15 +154,26 @@ class ProfessionalSerializer(serializers.ModelSerializer):
             'total_reviews',
             'is_active',
         ]
+        field_columns = {'full_name': ['first_name', 'last_name']}
+        field_prefetch = {
+            'branches_data': Prefetch(
+                'branches', queryset=BranchListSerializer.optimize_queryset(Branch.objects.all())
+            ),
+            'services_data': Prefetch(
+                'services', queryset=ServiceListSerializer.optimize_queryset(Service.objects.all())
+            ),
+        }
     
     def get_full_name(self, obj):
         return obj.get_full_name()
 
 
-class ProfessionalListSerializer(serializers.ModelSerializer):
+class ProfessionalListSerializer(ValuesSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer simplificado para listar profesionales"""
     
     full_name = serializers.SerializerMethodField()
+    branches_data = BranchListSerializer(source='branches', many=True, read_only=True)
+    services_data = ServiceListSerializer(source='services', many=True, read_only=True)
     
     class Meta:
         model = Professional
@@ -144,13 +184,20 @@ class ProfessionalListSerializer(serializers.ModelSerializer):
             'specialties',
             'average_rating',
             'total_reviews',
+            'branches_data',
+            'services_data',
         ]
+        # Solo con ?include=branches_data,services_data
+        optional_fields = ['branches_data', 'services_data']
+        field_columns = {'full_name': ['first_name', 'last_name']}
+        field_prefetch = ProfessionalSerializer.Meta.field_prefetch
+        values_methods = {'full_name': Professional.get_full_name}
     
     def get_full_name(self, obj):
         return obj.get_full_name()
 
 
-class ProfessionalDetailSerializer(serializers.ModelSerializer):
+class ProfessionalDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer detallado para un profesional específico"""
     
     full_name = serializers.SerializerMethodField()
@@ -178,13 +225,28 @@ class ProfessionalDetailSerializer(serializers.ModelSerializer):
             'total_reviews',
             'is_active',
         ]
+        field_columns = {'full_name': ['first_name', 'last_name']}
+        field_prefetch = {
+            'branches_data': ProfessionalSerializer.Meta.field_prefetch['branches_data'],
+            'services_data': Prefetch(
+                'services', queryset=ServiceSerializer.optimize_queryset(Service.objects.all())
+            ),
+            'schedules_by_branch': Prefetch(
+                'schedules',
+                queryset=ProfessionalSchedule.objects.filter(is_active=True).select_related('branch'),
+                to_attr='active_schedules',
+            ),
+        }
     
     def get_full_name(self, obj):
         return obj.get_full_name()
     
     def get_schedules_by_branch(self, obj):
         """Retorna horarios agrupados por sucursal"""
-        schedules = obj.schedules.filter(is_active=True).select_related('branch')
+        # La vista los precarga en active_schedules (ver Meta.field_prefetch)
+        schedules = getattr(obj, 'active_schedules', None)
+        if schedules is None:
+            schedules = obj.schedules.filter(is_active=True).select_related('branch')
         
         # Agrupar por sucursal
         result = {}
@@ -209,7 +271,7 @@ class ProfessionalDetailSerializer(serializers.ModelSerializer):
         return list(result.values())
 
 
-class ProfessionalScheduleSerializer(serializers.ModelSerializer):
+class ProfessionalScheduleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer para horarios de profesionales"""
     
     weekday_display = serializers.CharField(source='get_weekday_display', read_only=True)
@@ -228,6 +290,10 @@ class ProfessionalScheduleSerializer(serializers.ModelSerializer):
             'end_time',
             'is_active',
         ]
+        field_columns = {
+            'weekday_display': ['weekday'],
+            'branch_name': ['branch__name'],
+        }
     
     def validate(self, data):
         """Validaciones personalizadas"""
@@ -248,7 +314,7 @@ class ProfessionalScheduleSerializer(serializers.ModelSerializer):
         return data
 
 
-class ProfessionalUnavailabilitySerializer(serializers.ModelSerializer):
+class ProfessionalUnavailabilitySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer para indisponibilidades de profesionales"""
     
     professional_name = serializers.CharField(source='professional.get_full_name', read_only=True)
@@ -271,6 +337,11 @@ class ProfessionalUnavailabilitySerializer(serializers.ModelSerializer):
             'is_full_day',
             'created_at',
         ]
+        field_columns = {
+            'professional_name': ['professional__first_name', 'professional__last_name'],
+            'reason_display': ['reason'],
+            'is_full_day': ['start_time', 'end_time'],
+        }
     
     def get_is_full_day(self, obj):
         return obj.is_full_day()
@@ -292,4 +363,237 @@ class ProfessionalUnavailabilitySerializer(serializers.ModelSerializer):
                         'end_time': 'La hora de fin debe ser posterior a la hora de inicio.'
                     })
         
-        return data
\ No newline at end of file
+        return data
+
+
+class DateRangeQuerySerializer(serializers.Serializer):
+    """Rango de fechas de una consulta de disponibilidad"""
+    
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    
+    def validate(self, data):
+        """Completa y valida el rango de fechas"""
+        date_from = data.get('date_from') or timezone.localdate()
+        date_to = data.get('date_to') or date_from + timedelta(days=6)
+        
+        if date_to < date_from:
+            raise serializers.ValidationError({
+                'date_to': 'La fecha de fin no puede ser anterior a la fecha de inicio.'
+            })
+        
+        max_days = settings.AVAILABILITY_MAX_DAYS
+        if (date_to - date_from).days + 1 > max_days:
+            raise serializers.ValidationError({
+                'date_to': f'El rango no puede superar {max_days} días.'
+            })
+        
+        data['date_from'] = date_from
+        data['date_to'] = date_to
+        return data
+
+
+class AvailabilityQuerySerializer(DateRangeQuerySerializer):
+    """Parámetros de consulta de disponibilidad"""
+    
+    branch = serializers.PrimaryKeyRelatedField(queryset=Branch.objects.filter(is_active=True))
+    service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.filter(is_active=True))
+    professional = serializers.PrimaryKeyRelatedField(
+        queryset=Professional.objects.filter(is_active=True),
+        required=False
+    )
+
+
+class NearbyBranchesQuerySerializer(serializers.Serializer):
+    """Parámetros de búsqueda de sucursales cercanas"""
+    
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(required=False, default=10, min_value=0.1, help_text='Radio en km')
+    open_now = serializers.BooleanField(required=False, default=False)
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
+    
+    def validate_radius(self, value):
+        max_radius = settings.NEARBY_MAX_RADIUS_KM
+        if value > max_radius:
+            raise serializers.ValidationError(f'El radio no puede superar {max_radius} km.')
+        return value
+
+
+class FirstAvailableQuerySerializer(serializers.Serializer):
+    """Parámetros de búsqueda del primer turno libre"""
+    
+    branch = serializers.PrimaryKeyRelatedField(queryset=Branch.objects.filter(is_active=True))
+    service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.filter(is_active=True))
+    n = serializers.IntegerField(required=False, default=5, min_value=1, max_value=50)
+
+
+class BundleQuerySerializer(DateRangeQuerySerializer):
+    """Parámetros de búsqueda de varios servicios seguidos"""
+    
+    branch = serializers.PrimaryKeyRelatedField(queryset=Branch.objects.filter(is_active=True))
+    services = serializers.CharField(help_text='IDs de servicios separados por coma, en orden')
+    same_professional = serializers.BooleanField(required=False, default=False)
+    limit = serializers.IntegerField(required=False, default=50, min_value=1, max_value=200)
+    
+    def validate_services(self, value):
+        """Convierte la lista de IDs en servicios activos, respetando el orden"""
+        try:
+            ids = [int(item) for item in value.split(',') if item.strip()]
+        except ValueError:
+            raise serializers.ValidationError('Lista de servicios inválida.')
+        
+        if not 1 <= len(ids) <= 6:
+            raise serializers.ValidationError('Indicar entre 1 y 6 servicios.')
+        
+        services = Service.objects.in_bulk(set(ids))
+        services = {pk: s for pk, s in services.items() if s.is_active}
+        missing = [pk for pk in ids if pk not in services]
+        if missing:
+            raise serializers.ValidationError(f'Servicios inexistentes: {missing}')
+        return [services[pk] for pk in ids]
+
+
+class WeekAvailabilityQuerySerializer(serializers.Serializer):
+    """Parámetros de la disponibilidad semanal de una sucursal"""
+    
+    ENCODING_CHOICES = [
+        ('bits', 'Grillas de bits en base64'),
+        ('json', 'Listas de horarios'),
+    ]
+    
+    branch = serializers.PrimaryKeyRelatedField(queryset=Branch.objects.filter(is_active=True))
+    service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.filter(is_active=True))
+    date_from = serializers.DateField(required=False)
+    days = serializers.IntegerField(required=False, default=7, min_value=1, max_value=14)
+    encoding = serializers.ChoiceField(choices=ENCODING_CHOICES, required=False, default='bits')
+    
+    def validate(self, data):
+        data['date_from'] = data.get('date_from') or timezone.localdate()
+        data['date_to'] = data['date_from'] + timedelta(days=data['days'] - 1)
+        return data
+
+
+class AutocompleteQuerySerializer(serializers.Serializer):
+    """Parámetros del autocompletado"""
+    
+    q = serializers.CharField(max_length=100, allow_blank=True, trim_whitespace=True)
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=25)
+
+
+class BranchCalendarQuerySerializer(serializers.Serializer):
+    """Parámetros del calendario de recepción de una sucursal"""
+    
+    date_from = serializers.DateField(required=False)
+    days = serializers.IntegerField(required=False, default=14, min_value=1, max_value=31)
+
+
+class AppointmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer para Turnos"""
+    
+    professional_name = serializers.CharField(source='professional.get_full_name', read_only=True)
+    branch_name = serializers.CharField(source='branch.name', read_only=True)
+    service_name = serializers.CharField(source='service.name', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    
+    class Meta:
+        model = Appointment
+        fields = [
+            'id',
+            'professional',
+            'professional_name',
+            'branch',
+            'branch_name',
+            'service',
+            'service_name',
+            'date',
+            'start_time',
+            'end_time',
+            'status',
+            'status_display',
+            'price',
+            'notes',
+            'created_at',
+        ]
+        read_only_fields = fields
+        field_columns = {
+            'professional_name': ['professional__first_name', 'professional__last_name'],
+            'branch_name': ['branch__name'],
+            'service_name': ['service__name'],
+            'status_display': ['status'],
+        }
+
+
+class SlotRequestSerializer(serializers.Serializer):
+    """Serializer para pedir un horario (retenerlo o reservarlo)"""
+    
+    branch = serializers.PrimaryKeyRelatedField(queryset=Branch.objects.filter(is_active=True))
+    service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.filter(is_active=True))
+    professional = serializers.PrimaryKeyRelatedField(queryset=Professional.objects.filter(is_active=True))
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    
+    def validate_start_time(self, value):
+        """El horario debe coincidir con la grilla de turnos"""
+        step = settings.BOOKING_SLOT_MINUTES
+        if value.second or value.microsecond or (value.hour * 60 + value.minute) % step:
+            raise serializers.ValidationError(f'El horario debe ser múltiplo de {step} minutos.')
+        return value
+    
+    def validate(self, data):
+        """Validaciones personalizadas"""
+        professional = data['professional']
+        
+        # No reservar en el pasado
+        now = timezone.localtime()
+        if (data['date'], data['start_time']) <= (now.date(), now.time()):
+            raise serializers.ValidationError({
+                'start_time': 'No se puede reservar un turno en el pasado.'
+            })
+        
+        # El turno tiene que terminar el mismo día
+        start = data['start_time'].hour * 60 + data['start_time'].minute
+        if start + data['service'].duration_minutes >= 24 * 60:
+            raise serializers.ValidationError({
+                'start_time': 'El turno tiene que terminar antes de la medianoche.'
+            })
+        
+        # Validar que el profesional trabaje en la sucursal y ofrezca el servicio
+        if not professional.branches.filter(id=data['branch'].id).exists():
+            raise serializers.ValidationError({
+                'professional': 'El profesional no trabaja en esta sucursal.'
+            })
+        if not professional.services.filter(id=data['service'].id).exists():
+            raise serializers.ValidationError({
+                'professional': 'El profesional no ofrece este servicio.'
+            })
+        
+        return data
+
+
+class AppointmentCreateSerializer(SlotRequestSerializer):
+    """Serializer para reservar un turno"""
+    
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    hold = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """Una consulta GET dentro de un batch"""
+    
+    id = serializers.CharField(required=False, max_length=50)
+    method = serializers.ChoiceField(choices=['GET'], default='GET')
+    path = serializers.CharField(max_length=2000, help_text='Ej: /branches/ o /api/auth/me/')
+    if_none_match = serializers.CharField(required=False, max_length=200)
+
+
+class BatchSerializer(serializers.Serializer):
+    """Consultas de POST /api/batch/"""
+    
+    requests = BatchItemSerializer(many=True)
+    
+    def validate_requests(self, value):
+        max_requests = settings.BATCH_MAX_REQUESTS
+        if not 1 <= len(value) <= max_requests:
+            raise serializers.ValidationError(f'Indicar entre 1 y {max_requests} consultas.')
+        return value
@@ -0,0 +1,290 @@
+"""
+Señales de core.
+
+Mantienen incrementalmente los mapas de bits de disponibilidad
+(AvailabilityBitmap): cada cambio recalcula solo las fechas afectadas, una vez
+confirmada la transacción. También invalidan la caché del catálogo
+(core.catalog) y exportan sus copias estáticas (core.snapshots) cuando
+cambian sucursales, servicios o profesionales, y
+mantienen el índice de búsqueda (core.search) y la tabla de profesionales por
+sucursal y servicio (core.offerings).
+"""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import catalog, offerings, search, snapshots
+from .availability import daterange, horizon, refresh_bitmaps
+from .models import (
+    AvailabilityBitmap,
+    Branch,
+    Professional,
+    ProfessionalSchedule,
+    ProfessionalUnavailability,
+    Service,
+)
+
+BRANCH_DAY_FIELDS = [
+    'monday_open',
+    'tuesday_open',
+    'wednesday_open',
+    'thursday_open',
+    'friday_open',
+    'saturday_open',
+    'sunday_open',
+]
+
+
+def _previous(instance):
+    """Versión guardada de la instancia antes del save (None si es nueva)"""
+    if instance.pk is None:
+        return None
+    return type(instance).objects.filter(pk=instance.pk).first()
+
+
+def _horizon_dates(weekdays=None):
+    """Fechas del horizonte materializado, opcionalmente filtradas por día"""
+    start, end = horizon()
+    return [
+        day for day in daterange(start, end)
+        if weekdays is None or day.weekday() in weekdays
+    ]
+
+
+def _refresh_on_commit(branch_id, professional_ids, dates):
+    """Programa el recálculo de mapas de bits para después del commit"""
+    professional_ids = set(professional_ids)
+    dates = list(dates)
+    if not professional_ids or not dates:
+        return
+
+    def run():
+        branch = Branch.objects.filter(pk=branch_id).first()
+        if branch is None:
+            return
+        # El profesional pudo haberse borrado en la misma transacción
+        existing = Professional.objects.filter(
+            id__in=professional_ids
+        ).values_list('id', flat=True)
+        refresh_bitmaps(branch, existing, dates)
+
+    transaction.on_commit(run)
+
+
+# ========== HORARIOS ==========
+
+@receiver(pre_save, sender=ProfessionalSchedule)
+def schedule_pre_save(sender, instance, **kwargs):
+    instance._previous_state = _previous(instance)
+
+
+@receiver(post_save, sender=ProfessionalSchedule)
+def schedule_post_save(sender, instance, **kwargs):
+    affected = {(instance.professional_id, instance.branch_id): {instance.weekday}}
+
+    previous = getattr(instance, '_previous_state', None)
+    if previous is not None:
+        key = (previous.professional_id, previous.branch_id)
+        affected.setdefault(key, set()).add(previous.weekday)
+
+    for (professional_id, branch_id), weekdays in affected.items():
+        _refresh_on_commit(branch_id, [professional_id], _horizon_dates(weekdays))
+
+
+@receiver(post_delete, sender=ProfessionalSchedule)
+def schedule_post_delete(sender, instance, **kwargs):
+    # El detalle del profesional muestra los horarios: su Last-Modified no
+    # puede salir solo de max(updated_at) de los que quedan
+    transaction.on_commit(lambda: catalog.touch(catalog.PROFESSIONAL))
+    _refresh_on_commit(
+        instance.branch_id,
+        [instance.professional_id],
+        _horizon_dates({instance.weekday}),
+    )
+
+
+# ========== BLOQUEOS ==========
+
+def _refresh_unavailability(professional_id, ranges):
+    """Recalcula las fechas de los rangos en todas las sucursales del profesional"""
+    transaction.on_commit(
+        lambda: ProfessionalUnavailability.objects.invalidate(professional_id)
+    )
+
+    dates = set()
+    for start_date, end_date in ranges:
+        dates.update(daterange(start_date, end_date))
+
+    branch_ids = Branch.objects.filter(
+        professionals__id=professional_id
+    ).values_list('id', flat=True)
+    for branch_id in branch_ids:
+        _refresh_on_commit(branch_id, [professional_id], dates)
+
+
+@receiver(pre_save, sender=ProfessionalUnavailability)
+def unavailability_pre_save(sender, instance, **kwargs):
+    instance._previous_state = _previous(instance)
+
+
+@receiver(post_save, sender=ProfessionalUnavailability)
+def unavailability_post_save(sender, instance, **kwargs):
+    ranges = [(instance.start_date, instance.end_date)]
+
+    previous = getattr(instance, '_previous_state', None)
+    if previous is not None:
+        if previous.professional_id != instance.professional_id:
+            _refresh_unavailability(
+                previous.professional_id,
+                [(previous.start_date, previous.end_date)],
+            )
+        else:
+            ranges.append((previous.start_date, previous.end_date))
+
+    _refresh_unavailability(instance.professional_id, ranges)
+
+
+@receiver(post_delete, sender=ProfessionalUnavailability)
+def unavailability_post_delete(sender, instance, **kwargs):
+    _refresh_unavailability(
+        instance.professional_id,
+        [(instance.start_date, instance.end_date)],
+    )
+
+
+# ========== SUCURSALES ==========
+
+@receiver(pre_save, sender=Branch)
+def branch_pre_save(sender, instance, **kwargs):
+    instance._previous_state = _previous(instance)
+
+
+@receiver(post_save, sender=Branch)
+def branch_post_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    if created or previous is None:
+        return
+
+    if (previous.opening_time != instance.opening_time
+            or previous.closing_time != instance.closing_time):
+        weekdays = None
+    else:
+        weekdays = {
+            weekday
+            for weekday, field in enumerate(BRANCH_DAY_FIELDS)
+            if getattr(previous, field) != getattr(instance, field)
+        }
+        if not weekdays:
+            return
+
+    professional_ids = instance.professionals.values_list('id', flat=True)
+    _refresh_on_commit(instance.id, professional_ids, _horizon_dates(weekdays))
+
+
+@receiver(m2m_changed, sender=Professional.branches.through)
+def professional_branches_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Descarta los mapas de bits de sucursales que el profesional dejó"""
+    if action not in ('post_remove', 'post_clear'):
+        return
+
+    bitmaps = AvailabilityBitmap.objects.all()
+    if reverse:
+        bitmaps = bitmaps.filter(branch=instance)
+        if pk_set is not None:
+            bitmaps = bitmaps.filter(professional_id__in=pk_set)
+    else:
+        bitmaps = bitmaps.filter(professional=instance)
+        if pk_set is not None:
+            bitmaps = bitmaps.filter(branch_id__in=pk_set)
+    bitmaps.delete()
+
+
+# ========== CATÁLOGO ==========
+
+CATALOG_MODELS = {
+    Branch: catalog.BRANCH,
+    Service: catalog.SERVICE,
+    Professional: catalog.PROFESSIONAL,
+}
+
+
+def _bump_on_commit(model):
+    """
+    Invalida la caché del catálogo y exporta sus copias estáticas una vez
+    confirmada la transacción
+    """
+    transaction.on_commit(lambda: catalog.bump(model))
+    snapshots.schedule()
+
+
+@receiver(post_save, sender=Branch)
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Professional)
+@receiver(post_delete, sender=Branch)
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Professional)
+def catalog_changed(sender, **kwargs):
+    _bump_on_commit(CATALOG_MODELS[sender])
+
+
+@receiver(m2m_changed, sender=Professional.branches.through)
+@receiver(m2m_changed, sender=Professional.services.through)
+def catalog_relations_changed(sender, action, **kwargs):
+    """Cambios en sucursales o servicios de un profesional"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _bump_on_commit(catalog.PROFESSIONAL)
+
+
+# ========== BÚSQUEDA ==========
+
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Professional)
+def search_index_save(sender, instance, raw=False, **kwargs):
+    # En la misma transacción: si se revierte, el índice también
+    if search.is_indexed(sender) and not raw:
+        search.index_objects(sender, [instance])
+
+
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Professional)
+def search_index_delete(sender, instance, **kwargs):
+    if search.is_indexed(sender):
+        search.remove_objects(sender, [instance.pk])
+
+
+# ========== PROFESIONALES POR SUCURSAL Y SERVICIO ==========
+
+@receiver(post_save, sender=Professional)
+def offerings_professional_saved(sender, instance, created, raw=False, **kwargs):
+    # Uno nuevo todavía no tiene sucursales ni servicios; si cambió is_active
+    # hay que agregar o quitar sus filas
+    if not created and not raw:
+        offerings.sync([instance.pk])
+
+
+@receiver(m2m_changed, sender=Professional.branches.through)
+@receiver(m2m_changed, sender=Professional.services.through)
+def offerings_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        offerings.sync([instance.pk])
+    elif pk_set is not None:
+        offerings.sync(pk_set)
+    elif sender is Professional.branches.through:
+        # branch.professionals.clear(): ningún profesional queda en la sucursal
+        offerings.remove_branch(instance.pk)
+    else:
+        offerings.remove_service(instance.pk)
+
+
+@receiver(post_delete, sender=Branch)
+def offerings_branch_deleted(sender, instance, **kwargs):
+    # Las filas M2M se borran en cascada sin m2m_changed
+    offerings.remove_branch(instance.pk)
+
+
+@receiver(post_delete, sender=Service)
+def offerings_service_deleted(sender, instance, **kwargs):
+    offerings.remove_service(instance.pk)
@@ -0,0 +1,260 @@
+"""
+Copias estáticas del catálogo (snapshots), servidas sin consultar la base.
+
+`manage.py export_catalog` y, con CATALOG_SNAPSHOT_ON_SAVE, las señales (al
+confirmarse un cambio en sucursales, servicios o profesionales) escriben en CATALOG_SNAPSHOT_ROOT un
+JSON por documento, con el hash del contenido en el nombre
+(ej: branches.3f2a9c1b7d4e.json), y un manifest.json con la versión actual y
+los archivos que la forman. Los archivos con hash no cambian nunca, así que se
+pueden cachear para siempre; solo cambia manifest.json, que se reemplaza con
+os.replace (atómico): un lector ve completa la versión anterior o la nueva.
+
+El SPA lee manifest.json desde CATALOG_SNAPSHOT_URL (lo sirve el servidor
+web, como el resto de MEDIA_ROOT) y después los archivos que indica. La API
+los sirve en /api/catalog/snapshot/ leyendo los archivos, sin tocar la base.
+Se guardan las últimas CATALOG_SNAPSHOT_KEEP versiones para los clientes que
+todavía tengan un manifest anterior.
+
+export() y prune() toman un lock en la caché (compartida entre procesos): si
+corrieran a la vez, una limpieza podría borrar los archivos que otra
+exportación acaba de escribir y todavía no publicó.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .renderers import FastJSONRenderer
+
+MANIFEST = 'manifest.json'
+HASH_LENGTH = 12
+FILE_PATTERN = re.compile(r'^(?P<name>[a-z_]+)\.(?P<hash>[0-9a-f]{%d})\.json$' % HASH_LENGTH)
+
+LOCK_KEY = 'core:snapshots:lock'
+# Duración del lock y espera máxima del que no lo consigue
+LOCK_SECONDS = 120
+POLL_SECONDS = 0.1
+
+
+class ExportInProgress(Exception):
+    """Otra exportación o limpieza no terminó a tiempo"""
+
+
+def documents():
+    """{nombre: función que arma los datos} de cada documento exportado"""
+    # views importa este módulo para servir las copias
+    from . import views
+    from .models import Branch, Professional, Service
+    from .serializers import (
+        BranchListSerializer,
+        ProfessionalListSerializer,
+        ServiceListSerializer,
+    )
+
+    def listing(serializer_class, queryset):
+        def build():
+            rows = serializer_class.values_data(serializer_class.values_queryset(queryset))
+            return {'count': len(rows), 'results': rows}
+        return build
+
+    return {
+        'home': views._home_data,
+        'services_summary': views._services_summary,
+        'professionals_summary': views._professionals_summary,
+        'branches': listing(
+            BranchListSerializer,
+            Branch.objects.filter(is_active=True).order_by('name', 'id'),
+        ),
+        'services': listing(
+            ServiceListSerializer,
+            Service.objects.filter(is_active=True).order_by('name', 'id'),
+        ),
+        'professionals': listing(
+            ProfessionalListSerializer,
+            Professional.objects.filter(is_active=True).order_by('-average_rating', '-id'),
+        ),
+    }
+
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+
+
+def root():
+    return Path(settings.CATALOG_SNAPSHOT_ROOT)
+
+
+def _write(path, content):
+    """Escribe en un temporal del mismo directorio y lo mueve (atómico)"""
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp crea el archivo solo legible por el dueño
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+@contextmanager
+def _locked():
+    """Una sola exportación o limpieza a la vez entre todos los procesos"""
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_SECONDS
+    while not cache.add(LOCK_KEY, token, LOCK_SECONDS):
+        if time.monotonic() > deadline:
+            raise ExportInProgress('Hay otra exportación del catálogo en curso.')
+        time.sleep(POLL_SECONDS)
+    try:
+        yield
+    finally:
+        # Si el lock venció, ya puede ser de otro
+        if cache.get(LOCK_KEY) == token:
+            cache.delete(LOCK_KEY)
+
+
+# ========== EXPORTACIÓN ==========
+
+def export(keep=None):
+    """
+    Exporta el catálogo. Si el contenido no cambió no se crea otra versión.
+    Retorna (manifest actual, True si se cambió de versión).
+    """
+    with _locked():
+        return _export(settings.CATALOG_SNAPSHOT_KEEP if keep is None else keep)
+
+
+def _export(keep):
+    directory = root()
+    directory.mkdir(parents=True, exist_ok=True)
+    renderer = FastJSONRenderer()
+
+    files = {}
+    for name, build in documents().items():
+        content = renderer.render(build())
+        digest = content_hash(content)
+        filename = f'{name}.{digest}.json'
+        if not (directory / filename).exists():
+            _write(directory / filename, content)
+        files[name] = {'file': filename, 'hash': digest, 'bytes': len(content)}
+
+    version = content_hash(
+        '|'.join(f'{name}:{files[name]["hash"]}' for name in sorted(files)).encode()
+    )
+    current = read_manifest()
+    if current is not None and current['version'] == version:
+        return current, False
+
+    manifest = {
+        'version': version,
+        'generated_at': timezone.now().isoformat(),
+        'files': files,
+    }
+    content = renderer.render(manifest)
+    # Copia con la versión en el nombre: es la lista de versiones para prune()
+    _write(directory / f'manifest.{version}.json', content)
+    _write(directory / MANIFEST, content)
+    _prune(keep)
+    return manifest, True
+
+
+def prune(keep):
+    """Borra las versiones más viejas que las últimas `keep` y sus archivos"""
+    with _locked():
+        _prune(keep)
+
+
+def _prune(keep):
+    directory = root()
+    current = read_manifest()
+    versions = sorted(
+        directory.glob('manifest.*.json'),
+        key=lambda path: path.stat().st_mtime_ns,
+        reverse=True,
+    )
+    kept, removed = [], []
+    for path in versions:
+        if len(kept) < max(keep, 1) or (current and path.name == f'manifest.{current["version"]}.json'):
+            kept.append(path)
+        else:
+            removed.append(path)
+
+    # Lo que publica manifest.json nunca se borra
+    referenced = {item['file'] for item in current['files'].values()} if current else set()
+    for path in kept:
+        referenced.update(item['file'] for item in json.loads(path.read_bytes())['files'].values())
+    for path in removed:
+        path.unlink(missing_ok=True)
+    for path in directory.iterdir():
+        match = FILE_PATTERN.match(path.name)
+        if match and match['name'] != 'manifest' and path.name not in referenced:
+            path.unlink(missing_ok=True)
+
+
+def _export_on_commit():
+    # La primera exportación de la transacción baja la marca; las demás
+    # registradas en la misma no tienen nada que hacer
+    connection = transaction.get_connection()
+    if getattr(connection, 'catalog_snapshot_pending', False):
+        connection.catalog_snapshot_pending = False
+        export()
+
+
+def schedule():
+    """
+    Exporta una vez confirmada la transacción, una sola vez por transacción
+    aunque cambien varios objetos. Un error al escribir no afecta al request
+    que hizo el cambio.
+    """
+    if not settings.CATALOG_SNAPSHOT_ON_SAVE:
+        return
+    # Cada cambio registra su callback: si se revierte el savepoint de uno, el
+    # resto igual exporta. Una marca que quede de una transacción revertida no
+    # molesta, la próxima que confirme la usa.
+    transaction.get_connection().catalog_snapshot_pending = True
+    transaction.on_commit(_export_on_commit, robust=True)
+
+
+# ========== LECTURA ==========
+
+def manifest_content():
+    """Bytes de manifest.json, o None si todavía no se exportó"""
+    try:
+        return (root() / MANIFEST).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest():
+    """Manifest de la versión actual, o None si todavía no se exportó"""
+    content = manifest_content()
+    return None if content is None else json.loads(content)
+
+
+def read_document(name):
+    """(contenido, hash) del documento en la versión actual, o None"""
+    manifest = read_manifest()
+    if manifest is None or name not in manifest['files']:
+        return None
+    item = manifest['files'][name]
+    try:
+        return (root() / item['file']).read_bytes(), item['hash']
+    except FileNotFoundError:
+        # Otro proceso cambió de versión y limpió entre las dos lecturas
+        return read_document(name) if read_manifest() != manifest else None
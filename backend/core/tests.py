@@ -1,3 +1,2001 @@
-from django.test import TestCase
+import base64
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+import time as clock
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import AsyncClient, AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import permissions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+from . import (
+    async_views,
+    autocomplete,
+    availability,
+    batch,
+    bitmaps,
+    booking,
+    calendar_matrix,
+    capacity,
+    catalog,
+    checks,
+    compression,
+    geo,
+    holds,
+    models,
+    offerings,
+    renderers,
+    search,
+    snapshots,
+)
+from .capacity import ChairOccupancy
+from .intervals import minutes_to_str
+from .models import (
+    Appointment,
+    AvailabilityBitmap,
+    Branch,
+    Professional,
+    ProfessionalOffering,
+    ProfessionalSchedule,
+    ProfessionalUnavailability,
+    Service,
+)
+from .serializers import (
+    BranchListSerializer,
+    ProfessionalDetailSerializer,
+    ProfessionalListSerializer,
+    ServiceListSerializer,
+)
+
+PROFESSIONALS = 1000
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Presupuesto de queries por endpoint con 1.000 profesionales cargados.
+    Cada endpoint tiene que hacer una cantidad fija de queries sin importar
+    cuántos objetos devuelve; si alguno vuelve a hacer N+1, el test falla.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.create(
+            name='Centro',
+            address='Calle 1',
+            phone='1',
+            total_chairs=10,
+        )
+        cls.other_branch = Branch.objects.create(name='Norte', address='Calle 2', phone='2')
+        cls.services = [
+            Service.objects.create(
+                name=f'Servicio {i}',
+                description='-',
+                price=1000 + i,
+                duration_minutes=30,
+            )
+            for i in range(5)
+        ]
+        cls.service = cls.services[0]
+
+        Professional.objects.bulk_create([
+            Professional(
+                first_name=f'Nombre{i:04d}',
+                last_name='Apellido',
+                specialties='Cortes',
+                average_rating=Decimal(i % 50) / 10,
+            )
+            for i in range(PROFESSIONALS)
+        ])
+        professionals = list(Professional.objects.order_by('id'))
+        cls.professional = professionals[0]
+
+        Professional.branches.through.objects.bulk_create([
+            Professional.branches.through(professional=p, branch=branch)
+            for p in professionals
+            for branch in (cls.branch, cls.other_branch)
+        ])
+        Professional.services.through.objects.bulk_create([
+            Professional.services.through(professional=p, service=service)
+            for p in professionals
+            for service in cls.services
+        ])
+        # bulk_create no dispara las señales que mantienen la tabla
+        offerings.rebuild()
+        ProfessionalSchedule.objects.bulk_create([
+            ProfessionalSchedule(
+                professional=p,
+                branch=branch,
+                weekday=weekday,
+                start_time=time(9),
+                end_time=time(19),
+            )
+            for p in professionals
+            for branch in (cls.branch, cls.other_branch)
+            for weekday in range(6)
+        ])
+
+        today = timezone.localdate()
+        ProfessionalUnavailability.objects.bulk_create([
+            ProfessionalUnavailability(
+                professional=p,
+                start_date=today + timedelta(days=1),
+                end_date=today + timedelta(days=1),
+                start_time=time(12),
+                end_time=time(14),
+            )
+            for p in professionals[::10]
+        ])
+
+        cls.client_user = User.objects.create_user(
+            email='cliente@example.com',
+            password='clave-segura-123',
+            first_name='Cliente',
+            last_name='Prueba',
+        )
+        cls.admin_user = User.objects.create_superuser(
+            email='admin@example.com',
+            password='clave-segura-123',
+        )
+        Appointment.objects.bulk_create([
+            Appointment(
+                client=cls.client_user,
+                professional=p,
+                branch=cls.branch,
+                service=cls.service,
+                date=today + timedelta(days=2),
+                start_time=time(10),
+                end_time=time(10, 30),
+                price=cls.service.price,
+            )
+            for p in professionals[:50]
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def assertQueryBudget(self, budget, url, user=None):
+        """GET a `url` con a lo sumo `budget` queries"""
+        self.api.force_authenticate(user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.api.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        executed = len(context.captured_queries)
+        self.assertLessEqual(
+            executed,
+            budget,
+            f'{url}: {executed} queries (presupuesto {budget})\n'
+            + '\n'.join(query['sql'] for query in context.captured_queries),
+        )
+        return response
+
+    def warm_up(self, url, user=None):
+        """Primera lectura: materializa mapas de bits y árboles de bloqueos"""
+        self.api.force_authenticate(user)
+        self.assertEqual(self.api.get(url).status_code, 200)
+
+    # ========== CATÁLOGO ==========
+
+    def test_home(self):
+        self.assertQueryBudget(3, '/api/home/')
+
+    def test_branch_list(self):
+        self.assertQueryBudget(3, '/api/branches/')
+
+    def test_branch_detail(self):
+        self.assertQueryBudget(2, f'/api/branches/{self.branch.id}/')
+
+    def test_service_list(self):
+        self.assertQueryBudget(3, '/api/services/')
+
+    def test_service_detail(self):
+        self.assertQueryBudget(2, f'/api/services/{self.service.id}/')
+
+    def test_services_summary(self):
+        self.assertQueryBudget(2, '/api/services/summary/')
+
+    def test_professional_list(self):
+        response = self.assertQueryBudget(3, '/api/professionals/')
+        self.assertEqual(response.data['count'], PROFESSIONALS)
+
+    def test_professional_list_filtered(self):
+        self.assertQueryBudget(
+            3,
+            f'/api/professionals/?branch={self.branch.id}&service={self.service.id}',
+        )
+
+    def test_professional_detail(self):
+        response = self.assertQueryBudget(5, f'/api/professionals/{self.professional.id}/')
+        self.assertEqual(len(response.data['branches_data']), 2)
+        self.assertEqual(len(response.data['services_data']), 5)
+        self.assertEqual(len(response.data['schedules_by_branch']), 2)
+
+    def test_professional_detail_serializer_many(self):
+        """Con la precarga de la vista, serializar muchos no agrega queries"""
+        queryset = ProfessionalDetailSerializer.optimize_queryset(
+            Professional.objects.filter(id__lte=self.professional.id + 99)
+        )
+        with self.assertNumQueries(4):
+            data = ProfessionalDetailSerializer(queryset, many=True).data
+        self.assertEqual(len(data), 100)
+
+    def test_professionals_summary(self):
+        self.assertQueryBudget(2, '/api/professionals/summary/')
+
+    def test_professionals_by_branch(self):
+        self.assertQueryBudget(3, f'/api/branches/{self.branch.id}/professionals/')
+
+    def test_professionals_by_service(self):
+        self.assertQueryBudget(3, f'/api/services/{self.service.id}/professionals/')
+
+    def test_not_modified_skips_serialization(self):
+        """Un 304 solo hace la query de validadores"""
+        for url in (
+            '/api/professionals/',
+            f'/api/professionals/{self.professional.id}/',
+            f'/api/branches/{self.branch.id}/professionals/',
+        ):
+            etag = self.api.get(url)['ETag']
+            with self.assertNumQueries(1):
+                response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+    def test_cursor_pagination_walks_every_professional(self):
+        seen = []
+        url = '/api/professionals/?cursor=&count=false'
+        while url:
+            data = self.api.get(url).json()
+            seen.extend((Decimal(p['average_rating']), p['id']) for p in data['results'])
+            url = data['next']
+        self.assertEqual(len(seen), PROFESSIONALS)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_cursor_deep_page_costs_like_first(self):
+        url = '/api/professionals/?cursor=&count=false'
+        self.assertQueryBudget(2, url)
+        for _ in range(40):
+            url = self.api.get(url).json()['next']
+        self.assertQueryBudget(2, url)
+
+    def test_page_without_count(self):
+        response = self.assertQueryBudget(2, '/api/professionals/?page=30&count=false')
+        self.assertNotIn('count', response.data)
+        self.assertIsNotNone(response.data['next'])
+
+    # ========== CAMPOS A PEDIDO ==========
+
+    def test_professional_detail_sparse_fields(self):
+        """Sin los campos anidados no se precarga ninguna relación"""
+        response = self.assertQueryBudget(
+            2, f'/api/professionals/{self.professional.id}/?fields=id,full_name'
+        )
+        self.assertEqual(
+            response.data,
+            {'id': self.professional.id, 'full_name': self.professional.get_full_name()},
+        )
+
+    def test_professional_list_include(self):
+        response = self.assertQueryBudget(
+            5, '/api/professionals/?fields=id&include=branches_data,services_data'
+        )
+        first = response.data['results'][0]
+        self.assertEqual(list(first), ['id', 'branches_data', 'services_data'])
+        self.assertEqual(len(first['branches_data']), 2)
+        self.assertEqual(len(first['services_data']), 5)
+        self.assertNotIn('branches_data', self.api.get('/api/professionals/').data['results'][0])
+
+    def test_sparse_fields_load_only_their_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            self.api.get('/api/services/?fields=name&count=false')
+        sql = context.captured_queries[-1]['sql']
+        self.assertIn('"core_service"."name"', sql)
+        self.assertNotIn('"core_service"."description"', sql)
+
+    def test_sparse_fields_with_cursor(self):
+        data = self.api.get('/api/professionals/?cursor=&fields=full_name').json()
+        self.assertEqual(list(data['results'][0]), ['full_name'])
+        self.assertQueryBudget(3, data['next'])
+
+    # ========== DISPONIBILIDAD ==========
+
+    def test_availability(self):
+        url = f'/api/availability/?branch={self.branch.id}&service={self.service.id}'
+        self.warm_up(url)
+        response = self.assertQueryBudget(6, url)
+        self.assertEqual(len(response.data['professionals']), PROFESSIONALS)
+
+    def test_week_availability(self):
+        url = f'/api/availability/week/?branch={self.branch.id}&service={self.service.id}'
+        self.warm_up(url)
+        response = self.assertQueryBudget(6, url)
+        self.assertEqual(len(response.data['professionals']), PROFESSIONALS)
+
+    def test_first_available(self):
+        url = f'/api/availability/first/?branch={self.branch.id}&service={self.service.id}&n=20'
+        self.warm_up(url)
+        self.assertQueryBudget(6, url)
+
+    def test_bundle_availability(self):
+        services = ','.join(str(s.id) for s in self.services[:2])
+        url = f'/api/availability/bundle/?branch={self.branch.id}&services={services}'
+        self.warm_up(url)
+        self.assertQueryBudget(8, url)
+
+    def test_branch_calendar(self):
+        url = f'/api/branches/{self.branch.id}/calendar/?days=7'
+        self.warm_up(url, self.admin_user)
+        self.assertQueryBudget(6, url, self.admin_user)
+
+    # ========== TURNOS ==========
+
+    def test_appointment_list(self):
+        response = self.assertQueryBudget(2, '/api/appointments/', self.client_user)
+        self.assertEqual(response.data['count'], 50)
+
+    def test_appointment_list_sparse_fields(self):
+        """Sin nombres de relaciones no hay joins"""
+        self.api.force_authenticate(self.client_user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.api.get('/api/appointments/?fields=id,date,branch_name')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'branch_name', 'date'])
+        sql = context.captured_queries[-1]['sql']
+        self.assertIn('"core_branch"', sql)
+        self.assertNotIn('"core_professional"', sql)
+
+
+@override_settings(CATALOG_SNAPSHOT_ON_SAVE=False)
+class AvailabilityTests(TestCase):
+    """Motor de disponibilidad y reservas: horarios, bloqueos, turnos y sillas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        # Próximo lunes (entre 1 y 7 días), dentro del horizonte materializado
+        cls.monday = today + timedelta(days=7 - today.weekday())
+        cls.now = timezone.make_aware(datetime.combine(today, time(8)))
+
+        cls.branch = Branch.objects.create(
+            name='Centro', address='Calle 1', phone='1',
+            opening_time=time(9), closing_time=time(19),
+        )
+        cls.service = Service.objects.create(
+            name='Corte', description='-', price=1000, duration_minutes=30,
+        )
+        cls.ana = Professional.objects.create(first_name='Ana', last_name='Pérez')
+        cls.beto = Professional.objects.create(first_name='Beto', last_name='Gómez')
+        for professional in (cls.ana, cls.beto):
+            professional.branches.add(cls.branch)
+            professional.services.add(cls.service)
+        for weekday in range(6):
+            ProfessionalSchedule.objects.create(
+                professional=cls.ana, branch=cls.branch, weekday=weekday,
+                start_time=time(10), end_time=time(18),
+            )
+        for weekday in range(7):
+            # El domingo la sucursal está cerrada aunque Beto tenga horario
+            ProfessionalSchedule.objects.create(
+                professional=cls.beto, branch=cls.branch, weekday=weekday,
+                start_time=time(8), end_time=time(13),
+            )
+        cls.client_user = User.objects.create_user(
+            email='cliente@example.com', password='clave-segura-123',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def day(self, offset):
+        return self.monday + timedelta(days=offset)
+
+    def block(self, professional, first, last, start=None, end=None, reason='other'):
+        return ProfessionalUnavailability.objects.create(
+            professional=professional,
+            start_date=self.day(first),
+            end_date=self.day(last),
+            start_time=start,
+            end_time=end,
+            reason=reason,
+        )
+
+    def book(self, professional, offset, start, end):
+        return Appointment.objects.create(
+            client=self.client_user, professional=professional, branch=self.branch,
+            service=self.service, date=self.day(offset), start_time=start, end_time=end,
+            price=self.service.price,
+        )
+
+    def slots(self, professional, offset, service=None):
+        result = availability.available_slots(
+            self.branch, service or self.service, self.day(offset), self.day(offset),
+            professionals=[professional], now=self.now,
+        )
+        days = result[0]['days']
+        return days[0]['slots'] if days else []
+
+    # ========== INTERVALOS LIBRES ==========
+
+    def test_schedule_minus_blocks(self):
+        self.block(self.ana, 0, 0, time(12), time(13), reason='personal')
+        # Parcial de varios días: del martes 15:00 al jueves 11:00
+        self.block(self.ana, 1, 3, time(15), time(11), reason='training')
+        self.block(self.ana, 4, 4, reason='vacation')
+
+        free = availability.free_intervals(
+            self.branch, [self.ana.id, self.beto.id], self.day(0), self.day(6),
+        )
+        self.assertEqual(free[self.ana.id], {
+            self.day(0): [(600, 720), (780, 1080)],
+            self.day(1): [(600, 900)],
+            self.day(3): [(660, 1080)],
+            self.day(5): [(600, 1080)],
+        })
+        # Recortado a la ventana de la sucursal y sin el domingo cerrado
+        self.assertEqual(free[self.beto.id], {
+            self.day(offset): [(540, 780)] for offset in range(6)
+        })
+
+    def test_block_covering_whole_shift(self):
+        self.block(self.beto, 0, 0, time(8), time(14))
+        free = availability.free_intervals(self.branch, [self.beto.id], self.day(0), self.day(1))
+        self.assertEqual(free, {self.beto.id: {self.day(1): [(540, 780)]}})
+
+    # ========== HORARIOS DE INICIO ==========
+
+    def test_slots_minus_appointments(self):
+        self.block(self.ana, 0, 0, time(12), time(13))
+        self.book(self.ana, 0, time(10), time(10, 30))
+        self.book(self.ana, 0, time(16, 10), time(16, 40))
+
+        self.assertEqual(self.slots(self.ana, 0), [
+            '10:30', '10:45', '11:00', '11:15', '11:30',
+            '13:00', '13:15', '13:30', '13:45', '14:00', '14:15', '14:30',
+            '14:45', '15:00', '15:15', '15:30',
+            '16:45', '17:00', '17:15', '17:30',
+        ])
+        # Los turnos cancelados no ocupan lugar
+        Appointment.objects.filter(professional=self.ana).update(status='cancelled')
+        self.assertEqual(self.slots(self.ana, 0)[:2], ['10:00', '10:15'])
+
+    def test_slots_aligned_to_grid(self):
+        self.block(self.ana, 5, 5, time(10), time(10, 20))
+        self.block(self.ana, 5, 5, time(17, 5), time(18), reason='personal')
+        slots = self.slots(self.ana, 5)
+        self.assertEqual(slots[0], '10:30')
+        self.assertEqual(slots[-1], '16:30')
+        self.assertTrue(all(int(slot[3:]) % 15 == 0 for slot in slots))
+
+        with self.settings(BOOKING_SLOT_MINUTES=20):
+            slots = self.slots(self.ana, 5)
+        self.assertEqual(slots[:3], ['10:20', '10:40', '11:00'])
+        self.assertEqual(slots[-1], '16:20')
+
+    def test_not_before_now(self):
+        now = timezone.make_aware(datetime.combine(self.day(0), time(11, 7)))
+        result = availability.available_slots(
+            self.branch, self.service, self.day(-1), self.day(0),
+            professionals=[self.ana], now=now,
+        )
+        self.assertEqual(len(result[0]['days']), 1)
+        self.assertEqual(result[0]['days'][0]['slots'][0], '11:15')
+
+    # ========== MAPAS DE BITS MATERIALIZADOS ==========
+
+    def materialize(self):
+        date_from, date_to = availability.horizon()
+        ids = [self.ana.id, self.beto.id]
+        availability.store_bitmaps(
+            self.branch, availability.compute_bitmaps(self.branch, ids, date_from, date_to),
+        )
+
+    def assertMaterialized(self):
+        """Lo guardado es igual a recalcular todo el horizonte (rebuild_availability --verify)"""
+        date_from, date_to = availability.horizon()
+        ids = [self.ana.id, self.beto.id]
+        stored = {
+            (professional_id, day): bitmaps.from_bytes(bits)
+            for professional_id, day, bits in AvailabilityBitmap.objects.filter(
+                branch=self.branch,
+            ).values_list('professional_id', 'date', 'bits')
+        }
+        computed = availability.compute_bitmaps(self.branch, ids, date_from, date_to)
+        self.assertEqual(stored, computed)
+        call_command('rebuild_availability', verify=True, stdout=StringIO())
+
+    def test_signals_keep_bitmaps_in_sync(self):
+        self.materialize()
+        self.assertMaterialized()
+
+        schedule = ProfessionalSchedule.objects.get(professional=self.ana, weekday=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule.end_time = time(15)
+            schedule.save()
+        self.assertMaterialized()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            block = self.block(self.ana, 1, 3, time(15), time(11))
+        self.assertMaterialized()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            block.end_date = self.day(8)
+            block.save()
+        self.assertMaterialized()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            block.delete()
+            ProfessionalSchedule.objects.filter(professional=self.beto, weekday=2).delete()
+        self.assertMaterialized()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.branch.closing_time = time(12)
+            self.branch.saturday_open = False
+            self.branch.save()
+        self.assertMaterialized()
+
+    def test_verify_detects_stale_bitmap(self):
+        self.materialize()
+        # Sin señales: un cambio masivo deja los mapas desactualizados
+        ProfessionalSchedule.objects.filter(professional=self.ana).update(end_time=time(11))
+        with self.assertRaises(CommandError):
+            call_command('rebuild_availability', verify=True, stdout=StringIO())
+
+        call_command('rebuild_availability', stdout=StringIO())
+        self.assertMaterialized()
+
+    # ========== BLOQUEOS ==========
+
+    def test_adjacent_full_day_blocks_merge(self):
+        first = self.block(self.ana, 0, 1, reason='vacation')
+        other = self.block(self.ana, 4, 4, reason='sick')
+        merged = self.block(self.ana, 2, 3, reason='vacation')
+
+        blocks = ProfessionalUnavailability.objects.filter(professional=self.ana)
+        self.assertEqual(blocks.count(), 2)
+        self.assertFalse(blocks.filter(pk=first.pk).exists())
+        merged.refresh_from_db()
+        self.assertEqual((merged.start_date, merged.end_date), (self.day(0), self.day(3)))
+        # Otro motivo no se une aunque toque el rango
+        other.refresh_from_db()
+        self.assertEqual((other.start_date, other.end_date), (self.day(4), self.day(4)))
+
+    def test_partial_blocks_merge_on_same_day(self):
+        first = ProfessionalUnavailability.objects.create(
+            professional=self.ana, start_date=self.day(0), end_date=self.day(0),
+            start_time=time(10), end_time=time(12), notes='Médico',
+        )
+        self.block(self.ana, 1, 1, time(12), time(14))
+        merged = ProfessionalUnavailability.objects.create(
+            professional=self.ana, start_date=self.day(0), end_date=self.day(0),
+            start_time=time(12), end_time=time(14), notes='Trámite',
+        )
+
+        self.assertFalse(ProfessionalUnavailability.objects.filter(pk=first.pk).exists())
+        merged.refresh_from_db()
+        self.assertEqual((merged.start_time, merged.end_time), (time(10), time(14)))
+        self.assertEqual(merged.notes, 'Trámite\nMédico')
+        self.assertEqual(ProfessionalUnavailability.objects.filter(professional=self.ana).count(), 2)
+
+        # Un parcial separado por un hueco queda aparte
+        self.block(self.ana, 0, 0, time(15), time(16))
+        self.assertEqual(ProfessionalUnavailability.objects.filter(professional=self.ana).count(), 3)
+
+    def test_tree_follows_changes(self):
+        trees = ProfessionalUnavailability.objects.interval_trees([self.ana.id])
+        self.assertEqual(len(trees[self.ana.id]), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            block = self.block(self.ana, 0, 0, reason='vacation')
+        tree = ProfessionalUnavailability.objects.interval_trees([self.ana.id])[self.ana.id]
+        self.assertEqual(tree.overlapping(self.day(0), self.day(0)), [block])
+
+        # Sin cambios se reutiliza sin consultar la base
+        with self.assertNumQueries(0):
+            again = ProfessionalUnavailability.objects.interval_trees([self.ana.id])[self.ana.id]
+        self.assertIs(again, tree)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.block(self.ana, 1, 1, reason='vacation')
+        tree = ProfessionalUnavailability.objects.interval_trees([self.ana.id])[self.ana.id]
+        self.assertEqual(len(tree), 1)
+        self.assertEqual(len(tree.overlapping(self.day(0), self.day(1))), 1)
+
+    def test_tree_cache_is_bounded(self):
+        with self.settings(AVAILABILITY_TREE_CACHE_SIZE=1):
+            ProfessionalUnavailability.objects.interval_trees([self.ana.id])
+            ProfessionalUnavailability.objects.interval_trees([self.beto.id])
+            self.assertEqual(list(models._unavailability_trees), [self.beto.id])
+
+            with self.assertNumQueries(0):
+                ProfessionalUnavailability.objects.interval_trees([self.beto.id])
+            with self.assertNumQueries(1):
+                ProfessionalUnavailability.objects.interval_trees([self.ana.id])
+            self.assertEqual(list(models._unavailability_trees), [self.ana.id])
+
+    # ========== PRIMEROS TURNOS LIBRES ==========
+
+    def first(self, count):
+        return [
+            (item['date'], item['time'], item['professional_id'])
+            for item in availability.first_available(
+                self.branch, self.service, count, professionals=[self.ana, self.beto], now=self.now,
+            )
+        ]
+
+    def test_first_available_skips_days_without_room(self):
+        today = timezone.localdate()
+        for professional in (self.ana, self.beto):
+            ProfessionalUnavailability.objects.create(
+                professional=professional, start_date=today, end_date=self.day(1), reason='vacation',
+            )
+        self.block(self.beto, 2, 2, time(9), time(9, 30))
+
+        wednesday = self.day(2).isoformat()
+        self.assertEqual(self.first(5), [
+            (wednesday, '09:30', self.beto.id),
+            (wednesday, '09:45', self.beto.id),
+            (wednesday, '10:00', self.ana.id),
+            (wednesday, '10:00', self.beto.id),
+            (wednesday, '10:15', self.ana.id),
+        ])
+
+    def test_first_available_matches_full_calendar(self):
+        self.block(self.ana, 0, 2, reason='sick')
+        self.book(self.beto, 0, time(9), time(11))
+        date_from, date_to = availability.horizon()
+        expected = sorted(
+            (day['date'], slot, professional['professional_id'])
+            for professional in availability.available_slots(
+                self.branch, self.service, date_from, date_to,
+                professionals=[self.ana, self.beto], now=self.now,
+            )
+            for day in professional['days']
+            for slot in day['slots']
+        )
+        self.assertEqual(self.first(60), expected[:60])
+
+    # ========== SILLAS ==========
+
+    def test_chair_occupancy(self):
+        occupancy = ChairOccupancy(2, [(600, 630), (615, 660), (700, 720)])
+        self.assertEqual(occupancy.peak(600, 615), 1)
+        self.assertEqual(occupancy.peak(600, 700), 2)
+        self.assertFalse(occupancy.can_fit(620, 640))
+        self.assertTrue(occupancy.can_fit(630, 720))
+        self.assertEqual(occupancy.full, [(615, 630)])
+
+    def test_full_chairs_hide_slots_and_reject_bookings(self):
+        Branch.objects.filter(pk=self.branch.pk).update(total_chairs=1)
+        self.branch.refresh_from_db()
+        self.book(self.ana, 0, time(10), time(10, 30))
+
+        slots = self.slots(self.beto, 0)
+        self.assertIn('09:30', slots)
+        self.assertNotIn('09:45', slots)
+        self.assertNotIn('10:15', slots)
+        self.assertIn('10:30', slots)
+        with self.assertRaisesMessage(booking.SlotUnavailable, 'sillas'):
+            booking.book_appointment(
+                self.client_user, self.branch, self.beto, self.service, self.day(0), time(10, 15),
+            )
+
+        # Con una silla más el mismo turno entra
+        Branch.objects.filter(pk=self.branch.pk).update(total_chairs=2)
+        self.branch.refresh_from_db()
+        self.assertIn('10:15', self.slots(self.beto, 0))
+        booking.book_appointment(
+            self.client_user, self.branch, self.beto, self.service, self.day(0), time(10, 15),
+        )
+
+    # ========== PAQUETES DE SERVICIOS ==========
+
+    def test_fewest_handoffs(self):
+        self.assertEqual(availability._fewest_handoffs([{1, 2}, {2}, {1, 2}]), [2, 2, 2])
+        self.assertEqual(availability._fewest_handoffs([{1}, {2}, {1, 2}]), [1, 2, 2])
+        self.assertEqual(availability._fewest_handoffs([{1, 2}, {1, 2}]), [1, 1])
+
+    def test_bundle_end_uses_real_duration(self):
+        # 32 minutos: no es múltiplo del bloque de 5
+        color = Service.objects.create(
+            name='Color', description='-', price=3000, duration_minutes=32,
+        )
+        self.ana.services.add(color)
+        result = availability.bundle_slots(
+            self.branch, [self.service, color], self.day(5), self.day(5),
+            same_professional=True, limit=100, now=self.now,
+        )
+        by_start = {item['start']: item for item in result}
+        # Solo Ana hace los dos servicios
+        self.assertEqual(result[0]['start'], '10:00')
+        self.assertEqual([step['professional_id'] for step in result[0]['steps']], [self.ana.id] * 2)
+
+        self.assertEqual(
+            [(step['start'], step['end']) for step in by_start['10:00']['steps']],
+            [('10:00', '10:30'), ('10:30', '11:02')],
+        )
+        self.assertEqual(by_start['10:00']['end'], '11:02')
+        for item in result:
+            self.assertEqual(item['end'], item['steps'][-1]['end'])
+        # Ana hasta las 18:00: el paquete ocupa 13 bloques (65 minutos)
+        self.assertEqual(result[-1]['start'], '16:45')
+        self.assertEqual(result[-1]['end'], '17:47')
+
+    def test_bundle_with_handoff(self):
+        color = Service.objects.create(
+            name='Color', description='-', price=3000, duration_minutes=32,
+        )
+        self.beto.services.add(color)
+        result = availability.bundle_slots(
+            self.branch, [self.service, color], self.day(5), self.day(5), limit=100, now=self.now,
+        )
+        # Beto puede hacer los dos: no hace falta cambiar de profesional
+        for item in result:
+            self.assertEqual(item['steps'][1]['professional_id'], self.beto.id)
+            self.assertEqual(item['steps'][0]['professional_id'], self.beto.id)
+        # Beto termina a las 13:00: el color empieza a más tardar 12:25
+        self.assertEqual(result[-1]['start'], '11:45')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.block(self.beto, 5, 5, time(9), time(10, 30))
+        result = availability.bundle_slots(
+            self.branch, [self.service, color], self.day(5), self.day(5), limit=100, now=self.now,
+        )
+        self.assertEqual(result[0]['start'], '10:00')
+        self.assertEqual(
+            [step['professional_id'] for step in result[0]['steps']], [self.ana.id, self.beto.id],
+        )
+
+    # ========== CALENDARIO VECTORIZADO ==========
+
+    def test_calendar_matrix_matches_scalar_slots(self):
+        carla = Professional.objects.create(first_name='Carla', last_name='Díaz')
+        carla.branches.add(self.branch)
+        carla.services.add(self.service)
+        ProfessionalSchedule.objects.create(
+            professional=carla, branch=self.branch, weekday=0,
+            start_time=time(9), end_time=time(19),
+        )
+        Branch.objects.filter(pk=self.branch.pk).update(total_chairs=2)
+        self.branch.refresh_from_db()
+
+        self.block(self.ana, 0, 0, time(12), time(13), reason='personal')
+        self.block(self.ana, 1, 3, time(15), time(11), reason='training')
+        self.block(self.beto, 4, 4, reason='vacation')
+        self.book(self.ana, 0, time(10), time(10, 30))
+        self.book(self.beto, 0, time(10, 15), time(10, 45))
+        self.book(self.beto, 2, time(11, 5), time(11, 35))
+
+        professionals = [self.ana, self.beto, carla]
+        dates, matrix = calendar_matrix.branch_calendar(
+            self.branch, [p.id for p in professionals], self.day(0), 7,
+        )
+        for state in (calendar_matrix.FREE, calendar_matrix.BLOCKED,
+                      calendar_matrix.BOOKED, calendar_matrix.CHAIRS_FULL):
+            self.assertTrue((matrix == state).any(), state)
+
+        step = availability.get_slot_minutes()
+        from_matrix = []
+        for p, professional in enumerate(professionals):
+            days = []
+            for d, day in enumerate(dates):
+                bits = calendar_matrix.free_bits(matrix[p, d])
+                starts = bitmaps.start_slots(bits, self.service.duration_minutes, step)
+                if starts:
+                    days.append({
+                        'date': day.isoformat(),
+                        'slots': [minutes_to_str(start) for start in starts],
+                    })
+            from_matrix.append({
+                'professional_id': professional.id,
+                'full_name': professional.get_full_name(),
+                'days': days,
+            })
+        self.assertEqual(from_matrix, availability.available_slots(
+            self.branch, self.service, self.day(0), self.day(6),
+            professionals=professionals, now=self.now,
+        ))
+
+    # ========== RESERVAS ==========
+
+    def reserve(self, professional, offset, start, client=None):
+        return booking.book_appointment(
+            client or self.client_user, self.branch, professional, self.service,
+            self.day(offset), start,
+        )
+
+    def test_booking_never_overlaps(self):
+        other = User.objects.create_user(email='otro@example.com', password='clave-segura-123')
+        self.reserve(self.ana, 0, time(11))
+
+        # Mismo inicio, empieza durante el turno y termina durante el turno
+        for start in (time(11), time(11, 15), time(10, 45)):
+            with self.assertRaisesMessage(booking.SlotUnavailable, 'ya tiene un turno'):
+                self.reserve(self.ana, 0, start, client=other)
+        # Contiguo sí, y otro profesional a la misma hora también
+        self.reserve(self.ana, 0, time(11, 30), client=other)
+        self.reserve(self.beto, 0, time(11), client=other)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.block(self.ana, 0, 0, time(12), time(13))
+        for start in (time(11, 45), time(12), time(12, 30)):
+            with self.assertRaisesMessage(booking.SlotUnavailable, 'no atiende'):
+                self.reserve(self.ana, 0, start)
+        self.reserve(self.ana, 0, time(13))
+
+        # Un turno cancelado libera el horario
+        Appointment.objects.filter(professional=self.ana, start_time=time(11)).update(status='cancelled')
+        self.reserve(self.ana, 0, time(11), client=other)
+
+        starts = sorted(
+            Appointment.objects.filter(
+                professional=self.ana, status__in=Appointment.ACTIVE_STATUSES,
+            ).values_list('start_time', flat=True)
+        )
+        self.assertEqual(starts, [time(11), time(11, 30), time(13)])
+
+    def test_booking_changes_only_the_detail_validator(self):
+        api = APIClient()
+        url = f'/api/professionals/{self.ana.id}/'
+        first = api.get(url)
+        listing = api.get('/api/professionals/')
+        versions = catalog.versions()
+        self.assertEqual(first.data['total_appointments'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.reserve(self.ana, 0, time(10))
+
+        response = api.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_appointments'], 1)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+        # El catálogo, sus cachés y los listados no se enteran de la reserva
+        self.assertNotIn(snapshots._export_on_commit, callbacks)
+        self.assertEqual(catalog.versions(), versions)
+        self.assertEqual(
+            api.get('/api/professionals/', HTTP_IF_NONE_MATCH=listing['ETag']).status_code, 304,
+        )
+
+    def test_slot_must_end_before_midnight(self):
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        response = api.post('/api/appointments/', {
+            'branch': self.branch.id,
+            'service': self.service.id,
+            'professional': self.beto.id,
+            'date': self.day(0).isoformat(),
+            'start_time': '23:30',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('medianoche', str(response.data['start_time']))
+
+        with self.assertRaisesMessage(booking.SlotUnavailable, 'medianoche'):
+            self.reserve(self.beto, 0, time(23, 30))
+
+    # ========== RETENCIONES ==========
+
+    def test_hold_blocks_professional_in_every_branch(self):
+        norte = Branch.objects.create(
+            name='Norte', address='Calle 2', phone='2', opening_time=time(9), closing_time=time(19),
+        )
+        self.ana.branches.add(norte)
+        ProfessionalSchedule.objects.create(
+            professional=self.ana, branch=norte, weekday=0, start_time=time(10), end_time=time(18),
+        )
+
+        hold = booking.hold_slot(self.client_user, self.branch, self.ana, self.service, self.day(0), time(10))
+        self.assertNotIn('10:00', self.slots(self.ana, 0))
+
+        slots = availability.available_slots(
+            norte, self.service, self.day(0), self.day(0), professionals=[self.ana], now=self.now,
+        )[0]['days'][0]['slots']
+        self.assertNotIn('10:00', slots)
+        self.assertNotIn('09:45', slots)
+        self.assertIn('10:30', slots)
+        _, matrix = calendar_matrix.branch_calendar(norte, [self.ana.id], self.day(0), 1)
+        self.assertEqual(matrix[0, 0, 10 * 60 // bitmaps.SLOT_MINUTES], calendar_matrix.HELD)
+
+        # La sucursal de la retención cuenta la silla; la otra no
+        self.assertEqual(capacity.booked_intervals(self.branch, self.day(0), self.day(0)),
+                         {self.day(0): [(600, 630)]})
+        self.assertEqual(capacity.booked_intervals(norte, self.day(0), self.day(0)), {})
+
+        other = User.objects.create_user(email='otro@example.com', password='clave-segura-123')
+        with self.assertRaises(booking.SlotUnavailable):
+            booking.hold_slot(other, norte, self.ana, self.service, self.day(0), time(10))
+
+        holds.release_hold(hold['token'])
+        self.assertIn('10:00', self.slots(self.ana, 0))
+        booking.hold_slot(other, norte, self.ana, self.service, self.day(0), time(10))
+        self.assertNotIn('10:00', self.slots(self.ana, 0))
+
+    # ========== GRILLA SEMANAL ==========
+
+    def test_week_bits_decode_to_slots(self):
+        self.block(self.ana, 0, 0, time(12), time(13))
+        self.book(self.beto, 1, time(10), time(10, 30))
+        api = APIClient()
+        url = (
+            f'/api/availability/week/?branch={self.branch.id}&service={self.service.id}'
+            f'&date_from={self.day(0).isoformat()}&days=7'
+        )
+        encoded = api.get(url).data
+        expected = api.get(url + '&encoding=json').data['professionals']
+        step = encoded['slot_minutes']
+        size = encoded['bytes_per_day']
+        self.assertEqual(size, 12)
+
+        decoded = {}
+        for professional in encoded['professionals']:
+            data = base64.b64decode(professional['bits'])
+            self.assertEqual(len(data), 7 * size)
+            days = []
+            for offset in range(7):
+                grid = int.from_bytes(data[offset * size:(offset + 1) * size], 'little')
+                slots = [minutes_to_str(i * step) for i in range(size * 8) if grid >> i & 1]
+                if slots:
+                    days.append({'date': self.day(offset).isoformat(), 'slots': slots})
+            decoded[professional['professional_id']] = days
+        self.assertEqual(decoded, {item['professional_id']: item['days'] for item in expected})
+        self.assertEqual(decoded[self.ana.id][0]['slots'][:2], ['10:00', '10:15'])
+
+    def test_slot_minutes_must_align_to_blocks(self):
+        self.assertEqual(bitmaps.step_mask(10) & 0b111, 0b101)
+        for step in (0, 7, 12):
+            with self.assertRaises(ValueError):
+                bitmaps.step_mask(step)
+            with self.assertRaises(ValueError):
+                bitmaps.to_grid(1, step)
+            with self.settings(BOOKING_SLOT_MINUTES=step):
+                self.assertEqual([error.id for error in checks.booking_slot_minutes(None)], ['core.E001'])
+        self.assertEqual(checks.booking_slot_minutes(None), [])
+
+
+@override_settings(CATALOG_SNAPSHOT_ON_SAVE=False)
+class CatalogCacheTests(TestCase):
+    """Caché del home y los resúmenes, invalidada por señales"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.create(name='Centro', address='Calle 1', phone='1')
+        cls.service = Service.objects.create(
+            name='Corte',
+            description='-',
+            price=1000,
+            duration_minutes=30,
+        )
+        cls.professional = Professional.objects.create(first_name='Ana', last_name='Pérez')
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def test_hit_runs_no_queries(self):
+        first = self.api.get('/api/home/')
+        with self.assertNumQueries(0):
+            second = self.api.get('/api/home/')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second['Content-Type'], 'application/json')
+
+    def test_save_invalidates_dependent_responses(self):
+        self.api.get('/api/home/')
+        self.api.get('/api/professionals/summary/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.name = 'Corte clásico'
+            self.service.save()
+
+        self.assertContains(self.api.get('/api/home/'), 'Corte clásico')
+        # El resumen de profesionales no depende de los servicios
+        with self.assertNumQueries(0):
+            self.api.get('/api/professionals/summary/')
+
+    def test_delete_invalidates(self):
+        self.api.get('/api/services/summary/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(name='Barba', description='-', price=500, duration_minutes=20).delete()
+            self.service.delete()
+        self.assertEqual(self.api.get('/api/services/summary/').json()['total_services'], 0)
+
+    def test_m2m_change_invalidates(self):
+        self.api.get('/api/professionals/summary/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.professional.services.add(self.service)
+        with self.assertNumQueries(2):
+            self.api.get('/api/professionals/summary/')
+
+    def test_single_flight_rebuild(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            clock.sleep(0.2)
+            return {'ok': True}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(catalog.cached_content('test', [catalog.SERVICE], build))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b'{"ok":true}'] * 8)
+
+    def test_deploy_check_requires_shared_cache(self):
+        self.assertEqual([warning.id for warning in checks.shared_cache(None)], ['core.W001'])
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with self.settings(CACHES=redis):
+            self.assertEqual(checks.shared_cache(None), [])
+
+
+@override_settings(CATALOG_SNAPSHOT_ON_SAVE=False)
+class ConditionalGetTests(TestCase):
+    """ETag / Last-Modified de las vistas del catálogo"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.create(name='Centro', address='Calle 1', phone='1')
+        cls.service = Service.objects.create(
+            name='Corte',
+            description='-',
+            price=1000,
+            duration_minutes=30,
+        )
+        cls.professional = Professional.objects.create(first_name='Ana', last_name='Pérez')
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def test_unchanged_returns_304(self):
+        for url in ('/api/services/', f'/api/services/{self.service.id}/', '/api/home/'):
+            response = self.api.get(url)
+            self.assertIn('ETag', response)
+            again = self.api.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again['ETag'], response['ETag'])
+            self.assertEqual(again.content, b'')
+
+    def test_if_modified_since(self):
+        url = f'/api/branches/{self.branch.id}/'
+        response = self.api.get(url)
+        again = self.api.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_delete_and_deactivate_move_last_modified(self):
+        beto = Professional.objects.create(first_name='Beto', last_name='Ruiz')
+        carla = Professional.objects.create(first_name='Carla', last_name='Díaz')
+
+        def deactivate():
+            carla.is_active = False
+            carla.save()
+
+        for change in (beto.delete, deactivate):
+            # Todo cambió hace una hora
+            hour_ago = timezone.now() - timedelta(hours=1)
+            Professional.objects.update(updated_at=hour_ago)
+            cache.set_many({
+                catalog.CHANGED_KEY.format(model=model): hour_ago.timestamp()
+                for model in catalog.MODELS
+            })
+            since = self.api.get('/api/professionals/')['Last-Modified']
+            response = self.api.get('/api/professionals/', HTTP_IF_MODIFIED_SINCE=since)
+            self.assertEqual(response.status_code, 304)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            response = self.api.get('/api/professionals/', HTTP_IF_MODIFIED_SINCE=since)
+            self.assertEqual(response.status_code, 200)
+
+    def test_save_changes_etag(self):
+        url = f'/api/services/{self.service.id}/'
+        etag = self.api.get(url)['ETag']
+        self.service.price = 1200
+        self.service.save()
+        response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_related_change_changes_detail_etag(self):
+        url = f'/api/professionals/{self.professional.id}/'
+        etag = self.api.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.professional.services.add(self.service)
+        response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['services_data']), 1)
+
+    def test_list_etag_depends_on_query(self):
+        first = self.api.get('/api/services/?ordering=price')['ETag']
+        second = self.api.get('/api/services/?ordering=-price')['ETag']
+        self.assertNotEqual(first, second)
+
+    def test_included_relations_change_etag(self):
+        self.professional.branches.add(self.branch)
+        self.professional.services.add(self.service)
+        plain = '/api/professionals/'
+        included = '/api/professionals/?include=branches_data,services_data'
+        urls = (plain, included, f'/api/professionals/{self.professional.id}/',
+                f'/api/async/professionals/?include=branches_data')
+        etags = {url: self.api.get(url)['ETag'] for url in urls}
+
+        # Guardar sin que corran las señales: cambia updated_at de la sucursal
+        self.branch.name = 'Centro Renovado'
+        self.branch.save()
+        self.assertEqual(self.api.get(plain, HTTP_IF_NONE_MATCH=etags[plain]).status_code, 304)
+        for url in urls[1:]:
+            response = self.api.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 200, url)
+            data = response.json()
+            professional = data['results'][0] if 'results' in data else data
+            self.assertEqual(professional['branches_data'][0]['name'], 'Centro Renovado')
+
+        # Un update() no toca updated_at: alcanza con la versión del catálogo
+        etag = self.api.get(included)['ETag']
+        Service.objects.filter(pk=self.service.pk).update(name='Corte clásico')
+        catalog.bump(catalog.SERVICE)
+        response = self.api.get(included, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['services_data'][0]['name'], 'Corte clásico')
+
+
+class FullTextSearchTests(TestCase):
+    """Búsqueda de texto completo (?search=) en servicios y profesionales"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.coloring = Service.objects.create(
+            name='Coloración',
+            description='Tintura completa con matices',
+            price=5000,
+            duration_minutes=90,
+        )
+        cls.cut = Service.objects.create(
+            name='Corte',
+            description='Incluye lavado y coloración de raíces',
+            price=2000,
+            duration_minutes=30,
+        )
+        cls.professional = Professional.objects.create(
+            first_name='Martín',
+            last_name='Gómez',
+            specialties='Barbería clásica',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def search(self, url, text):
+        return [item['id'] for item in self.api.get(url, {'search': text}).data['results']]
+
+    def test_accents_and_case_are_ignored(self):
+        for text in ('coloracion', 'COLORACIÓN', 'Coloración'):
+            self.assertIn(self.coloring.id, self.search('/api/services/', text))
+        self.assertEqual(self.search('/api/professionals/', 'martin gomez'), [self.professional.id])
+
+    def test_prefix_match(self):
+        self.assertEqual(self.search('/api/professionals/', 'barb'), [self.professional.id])
+
+    def test_title_ranks_above_body(self):
+        self.assertEqual(self.search('/api/services/', 'coloracion'), [self.coloring.id, self.cut.id])
+
+    def test_explicit_ordering_wins_over_rank(self):
+        response = self.api.get('/api/services/', {'search': 'coloracion', 'ordering': 'price'})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.cut.id, self.coloring.id])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.cut.name = 'Corte y peinado'
+        self.cut.save()
+        self.assertEqual(self.search('/api/services/', 'peinado'), [self.cut.id])
+
+        self.cut.delete()
+        self.assertEqual(self.search('/api/services/', 'peinado'), [])
+
+    def test_every_match_is_counted_and_paginated(self):
+        Service.objects.bulk_create(
+            Service(name=f'Tintura {i}', price=1000, duration_minutes=30) for i in range(25)
+        )
+        search.rebuild(Service)
+
+        ids = []
+        url, params = '/api/services/', {'search': 'tintura'}
+        while url:
+            data = self.api.get(url, params).data
+            ids += [item['id'] for item in data['results']]
+            url, params = data['next'], None
+        self.assertEqual(len(ids), 26)
+        self.assertEqual(len(set(ids)), 26)
+        # La coincidencia solo en la descripción queda última
+        self.assertEqual(ids[-1], self.coloring.id)
+
+
+@override_settings(CATALOG_SNAPSHOT_ON_SAVE=False)
+class AutocompleteTests(TestCase):
+    """Autocompletado desde el índice de prefijos en memoria"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.create(name='Centro', address='Calle 1', phone='1')
+        cls.service = Service.objects.create(
+            name='Coloración',
+            description='-',
+            price=5000,
+            duration_minutes=90,
+        )
+        cls.professional = Professional.objects.create(
+            first_name='Martín',
+            last_name='Gómez',
+            specialties='Cortes modernos, Barba, Coloración de fantasía',
+        )
+
+    def setUp(self):
+        cache.clear()
+        autocomplete.refresh()
+        self.api = APIClient()
+
+    def suggest(self, text, **params):
+        return self.api.get('/api/autocomplete/', {'q': text, **params}).json()['results']
+
+    def test_request_does_not_query_database(self):
+        with self.assertNumQueries(0):
+            results = self.suggest('colo')
+        self.assertEqual(
+            [(item['type'], item['label']) for item in results],
+            [('service', 'Coloración'), ('specialty', 'Coloración de fantasía')],
+        )
+
+    def test_matches_any_word_without_accents(self):
+        self.assertEqual(self.suggest('gomez'), [
+            {'type': 'professional', 'id': self.professional.id, 'label': 'Martín Gómez'},
+        ])
+        self.assertEqual(self.suggest('barb')[0]['label'], 'Barba')
+
+    def test_limit(self):
+        self.assertEqual(len(self.suggest('c', limit=1)), 1)
+
+    def test_catalog_change_loads_entries_from_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(name='Corte', description='-', price=1000, duration_minutes=30)
+        # Otro proceso ya regeneró las entradas de la nueva versión
+        cache.set(
+            autocomplete.ENTRIES_KEY.format(versions=catalog.versions()),
+            autocomplete.build_entries(),
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest('cort')[0]['label'], 'Corte')
+
+    def test_stale_index_is_served_while_rebuilding(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(name='Corte', description='-', price=1000, duration_minutes=30)
+        with mock.patch.object(autocomplete, '_refresh_in_background') as rebuild:
+            with self.assertNumQueries(0):
+                labels = [item['label'] for item in self.suggest('cort')]
+        self.assertEqual(labels, ['Cortes modernos'])
+        rebuild.assert_called_once_with(catalog.versions())
+
+    def test_cold_process_never_queries_and_is_warmed(self):
+        cache.clear()
+        state = {'version': None, 'index': autocomplete.PrefixIndex([])}
+        with mock.patch.dict(autocomplete._state, state):
+            with mock.patch.object(autocomplete, '_refresh_in_background') as rebuild:
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.suggest('gomez'), [])
+                rebuild.assert_called_once_with(catalog.versions())
+
+                # Al arrancar: el hilo arma el índice (acá, en el mismo hilo)
+                rebuild.reset_mock()
+                rebuild.side_effect = autocomplete.refresh
+                autocomplete.warm()
+                rebuild.assert_called_once_with(catalog.versions())
+            with self.assertNumQueries(0):
+                self.assertEqual(self.suggest('gomez')[0]['label'], 'Martín Gómez')
+
+
+class ValuesSerializerTests(TestCase):
+    """El modo rápido de los listados tiene que dar los mismos bytes que DRF"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Branch.objects.create(name='Centro', address='Calle 1', phone='1', image='branches/centro.jpg')
+        Branch.objects.create(name='Norte', address='Calle 2', phone='2')
+        Service.objects.create(name='Corte', description='-', price=1000, duration_minutes=90)
+        Service.objects.create(
+            name='Barba', description='-', price=Decimal('850.5'), duration_minutes=20,
+            image='services/barba con espacio.jpg',
+        )
+        Professional.objects.create(
+            first_name='Ana', last_name='Pérez', average_rating=Decimal('4.5'),
+            profile_picture='professionals/ana.png',
+        )
+        Professional.objects.create(first_name='Luis', last_name='', specialties='Color')
+
+    def render_both(self, serializer_class, fields=None, request=None):
+        queryset = serializer_class.Meta.model.objects.order_by('id')
+        context = {'request': request} if request else {}
+        expected = serializer_class(queryset, many=True, context=context).data
+        rows = serializer_class.values_queryset(queryset, fields)
+        fast = serializer_class.values_data(rows, fields, request=request)
+        return JSONRenderer().render(expected), JSONRenderer().render(fast)
+
+    def test_byte_identical_output(self):
+        request = Request(APIRequestFactory().get('/api/', HTTP_HOST='localhost'))
+        for serializer_class in (BranchListSerializer, ServiceListSerializer, ProfessionalListSerializer):
+            for current in (None, request):
+                with self.subTest(serializer=serializer_class.__name__, request=current is not None):
+                    expected, fast = self.render_both(serializer_class, request=current)
+                    self.assertEqual(fast, expected)
+
+    def test_sparse_fields(self):
+        request = Request(APIRequestFactory().get('/api/?fields=full_name,average_rating'))
+        expected, fast = self.render_both(
+            ProfessionalListSerializer, ['full_name', 'average_rating'], request
+        )
+        self.assertEqual(fast, expected)
+
+    def test_nested_fields_fall_back_to_drf(self):
+        queryset = Professional.objects.all()
+        self.assertIsNone(
+            ProfessionalListSerializer.values_queryset(queryset, include=['branches_data'])
+        )
+        response = APIClient().get('/api/professionals/?include=branches_data')
+        self.assertEqual(response.data['results'][0]['branches_data'], [])
+
+
+class RendererTests(TestCase):
+    """FastJSONRenderer da los mismos bytes que DRF; MessagePack se negocia por Accept"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.service = Service.objects.create(
+            name='Corte', description='-', price=Decimal('1000.50'), duration_minutes=30,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def test_json_matches_drf(self):
+        data = {
+            'price': Decimal('10.50'),
+            'utc': datetime(2025, 3, 1, 10, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'naive': datetime(2025, 3, 1, 10, 30),
+            'date': date(2025, 3, 1),
+            'time': time(9, 45),
+            'grid': np.array([[1, 0], [0, 1]], dtype=np.uint8),
+            'ids': {1, 2},
+            3: 'clave entera',
+            'text': 'Peluquería \u2028 línea',
+            'nested': [{'a': None, 'b': True, 'c': 1.5}],
+        }
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_drf(self):
+        data = {'a': [1, 2]}
+        self.assertEqual(
+            renderers.FastJSONRenderer().render(data, 'application/json; indent=2'),
+            JSONRenderer().render(data, 'application/json; indent=2'),
+        )
+
+    @skipUnless(renderers.msgpack, 'msgpack no está instalado')
+    def test_msgpack_negotiation(self):
+        for url in ('/api/services/', f'/api/services/{self.service.id}/', '/api/home/'):
+            with self.subTest(url=url):
+                as_json = self.api.get(url)
+                packed = self.api.get(url, HTTP_ACCEPT='application/msgpack')
+                self.assertEqual(packed['Content-Type'], 'application/msgpack')
+                self.assertEqual(renderers.msgpack.unpackb(packed.content), json.loads(as_json.content))
+                self.assertNotEqual(packed['ETag'], as_json['ETag'])
+                self.assertIn('Accept', packed['Vary'])
+
+
+@override_settings(CATALOG_SNAPSHOT_ON_SAVE=False)
+class CompressedCacheTests(TestCase):
+    """Respuestas del catálogo comprimidas una vez por ETag"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.service = Service.objects.create(
+            name='Corte', description='-', price=1000, duration_minutes=30,
+        )
+        for i in range(20):
+            Professional.objects.create(first_name=f'Profesional {i}', last_name='Apellido')
+        cls.admin_user = User.objects.create_superuser(
+            email='admin@example.com',
+            password='clave-segura-123',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def test_compressed_once_then_served_from_cache(self):
+        plain = self.api.get('/api/professionals/')
+        first = self.api.get('/api/professionals/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        with mock.patch.dict(compression.COMPRESSORS, {'gzip': mock.Mock(side_effect=AssertionError)}):
+            second = self.api.get('/api/professionals/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+        self.assertEqual(first['X-Compression-Cache'], 'MISS')
+        self.assertEqual(second['X-Compression-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(gzip.decompress(second.content), plain.content)
+        self.assertEqual(second['ETag'], 'W/' + plain['ETag'])
+        self.assertIn('Accept-Encoding', second['Vary'])
+
+    def test_weak_etag_still_validates(self):
+        etag = self.api.get('/api/professionals/', HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        response = self.api.get('/api/professionals/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_etag_compresses_again(self):
+        self.api.get('/api/home/', HTTP_ACCEPT_ENCODING='gzip')
+        with self.captureOnCommitCallbacks(execute=True):
+            Professional.objects.create(first_name='Nuevo', last_name='Apellido')
+        response = self.api.get('/api/home/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['X-Compression-Cache'], 'MISS')
+        self.assertIn(b'Nuevo', gzip.decompress(response.content))
+
+    def test_new_body_under_same_etag_compresses_again(self):
+        bodies = [b'{"version": 1}' * 50, b'{"version": 2}' * 50]
+        served = iter(bodies)
+
+        def view(request):
+            response = HttpResponse(next(served), content_type='application/json')
+            response['ETag'] = 'W/"mismo"'
+            return response
+
+        middleware = compression.PrecompressedCacheMiddleware(view)
+        for body in bodies:
+            request = APIRequestFactory().get('/api/home/', HTTP_ACCEPT_ENCODING='gzip')
+            response = middleware(request)
+            self.assertEqual(response['X-Compression-Cache'], 'MISS')
+            self.assertEqual(gzip.decompress(response.content), body)
+
+    def test_identity_and_excluded_encodings(self):
+        for header in ('', 'identity', 'gzip;q=0', 'deflate'):
+            with self.subTest(header=header):
+                response = self.api.get('/api/professionals/', HTTP_ACCEPT_ENCODING=header)
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_only_catalog_responses_with_etag(self):
+        self.api.force_authenticate(self.admin_user)
+        response = self.api.get('/api/stats/compression/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_stats(self):
+        self.api.get('/api/professionals/', HTTP_ACCEPT_ENCODING='gzip')
+        self.api.get('/api/professionals/', HTTP_ACCEPT_ENCODING='gzip')
+        self.api.get('/api/professionals/')
+
+        self.assertEqual(self.api.get('/api/stats/compression/').status_code, 401)
+        self.api.force_authenticate(self.admin_user)
+        data = self.api.get('/api/stats/compression/').data
+        self.assertEqual(data['hits'], 1)
+        self.assertEqual(data['misses'], 1)
+        self.assertEqual(data['uncompressed'], 1)
+        self.assertEqual(data['hit_rate'], 0.5)
+
+    @skipUnless(compression.brotli, 'brotli no está instalado')
+    def test_brotli_preferred(self):
+        response = self.api.get('/api/professionals/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        plain = self.api.get('/api/professionals/')
+        self.assertEqual(compression.brotli.decompress(response.content), plain.content)
+
+
+class BatchTests(TestCase):
+    """POST /api/batch/ ejecuta varias consultas GET con la misma autenticación"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.create(name='Centro', address='Calle 1', phone='1')
+        cls.service = Service.objects.create(
+            name='Corte', description='-', price=1000, duration_minutes=30,
+        )
+        cls.user = User.objects.create_user(
+            email='cliente@example.com',
+            password='clave-segura-123',
+            first_name='Cliente',
+            last_name='Prueba',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def post(self, *paths, **item):
+        requests = [{'id': str(i), 'path': path, **item} for i, path in enumerate(paths)]
+        return self.api.post('/api/batch/', {'requests': requests}, format='json')
+
+    def test_results_match_individual_requests(self):
+        paths = ['/branches/', '/api/services/?fields=name', '/home/']
+        response = self.post(*paths)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['id'] for result in results], ['0', '1', '2'])
+        for path, result in zip(paths, results):
+            with self.subTest(path=path):
+                single = self.api.get(batch.normalize_path(path), HTTP_ACCEPT='application/json')
+                self.assertEqual(result['status'], 200)
+                self.assertEqual(result['body'], single.json())
+                self.assertEqual(result['headers']['ETag'], single['ETag'])
+
+    def test_shares_authentication(self):
+        anonymous = self.post('/auth/me/').json()['results'][0]
+        self.assertEqual(anonymous['status'], 401)
+
+        self.api.force_authenticate(self.user)
+        result = self.post('/auth/me/', '/appointments/').json()['results']
+        self.assertEqual(result[0]['status'], 200)
+        self.assertEqual(result[0]['body']['email'], self.user.email)
+        self.assertEqual(result[1]['status'], 200)
+
+    def test_async_views(self):
+        results = self.post('/async/branches/', '/branches/').json()['results']
+        self.assertEqual([result['status'] for result in results], [200, 200])
+        self.assertEqual(results[0]['body'], results[1]['body'])
+
+    def test_not_modified(self):
+        etag = self.api.get('/api/branches/', HTTP_ACCEPT='application/json')['ETag']
+        result = self.post('/branches/', if_none_match=etag).json()['results'][0]
+        self.assertEqual(result['status'], 304)
+        self.assertIsNone(result['body'])
+
+    def test_invalid_requests(self):
+        results = self.post('/inexistente/', '/batch/').json()['results']
+        self.assertEqual([result['status'] for result in results], [404, 400])
+
+        self.assertEqual(self.post(*['/branches/'] * 11).status_code, 400)
+        self.assertEqual(self.post('/branches/', method='POST').status_code, 400)
+
+
+class ProfessionalOfferingTests(TestCase):
+    """La tabla de profesionales por sucursal y servicio sigue a las relaciones M2M"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.centro = Branch.objects.create(name='Centro', address='Calle 1', phone='1')
+        cls.norte = Branch.objects.create(name='Norte', address='Calle 2', phone='2')
+        cls.corte = Service.objects.create(name='Corte', description='-', price=1000, duration_minutes=30)
+        cls.color = Service.objects.create(name='Color', description='-', price=2000, duration_minutes=60)
+        cls.ana = Professional.objects.create(first_name='Ana', last_name='Pérez')
+        cls.luis = Professional.objects.create(first_name='Luis', last_name='Gómez')
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.ana.branches.add(self.centro, self.norte)
+        self.ana.services.add(self.corte, self.color)
+        self.luis.branches.add(self.centro)
+        self.luis.services.add(self.corte)
+
+    def ids(self, url):
+        return sorted(p['id'] for p in self.api.get(url).data['results'])
+
+    def expected(self, **filters):
+        """Mismo resultado con los joins M2M de siempre"""
+        return sorted(
+            Professional.objects.filter(is_active=True, **filters).distinct().values_list('id', flat=True)
+        )
+
+    def assertMatchesRelations(self):
+        for branch in Branch.objects.all():
+            for service in Service.objects.all():
+                self.assertEqual(
+                    self.ids(f'/api/professionals/?branch={branch.id}&service={service.id}'),
+                    self.expected(branches=branch, services=service),
+                )
+            self.assertEqual(
+                self.ids(f'/api/branches/{branch.id}/professionals/'),
+                self.expected(branches=branch),
+            )
+        for service in Service.objects.all():
+            self.assertEqual(
+                self.ids(f'/api/services/{service.id}/professionals/'),
+                self.expected(services=service),
+            )
+
+    def test_filters_match_relations(self):
+        self.assertEqual(
+            self.ids(f'/api/professionals/?branch={self.norte.id}&service={self.color.id}'),
+            [self.ana.id],
+        )
+        self.assertMatchesRelations()
+
+    def test_follows_m2m_changes_from_both_sides(self):
+        self.ana.services.remove(self.color)
+        self.norte.professionals.add(self.luis)
+        self.corte.professionals.clear()
+        self.assertMatchesRelations()
+        self.luis.branches.clear()
+        self.assertMatchesRelations()
+
+    def test_inactive_and_deleted(self):
+        self.luis.is_active = False
+        self.luis.save()
+        self.assertFalse(ProfessionalOffering.objects.filter(professional=self.luis).exists())
+        self.assertMatchesRelations()
+
+        self.luis.is_active = True
+        self.luis.save()
+        norte_id = self.norte.id
+        self.norte.delete()
+        self.assertFalse(ProfessionalOffering.objects.filter(branch_key=norte_id).exists())
+        self.assertMatchesRelations()
+
+    def test_single_lookup_without_distinct(self):
+        with CaptureQueriesContext(connection) as context:
+            self.api.get(f'/api/professionals/?branch={self.centro.id}&service={self.corte.id}')
+        sql = context.captured_queries[-1]['sql']
+        self.assertIn('core_professionaloffering', sql)
+        self.assertNotIn('DISTINCT', sql)
+        self.assertNotIn('core_professional_branches', sql)
+
+
+class NearbyBranchesTests(TestCase):
+    """Búsqueda de sucursales cercanas por geohash"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Obelisco, Palermo (~4,5 km), La Plata (~53 km) y una sin ubicación
+        cls.centro = Branch.objects.create(
+            name='Centro', address='Calle 1', phone='1',
+            latitude=Decimal('-34.603722'), longitude=Decimal('-58.381592'),
+        )
+        cls.palermo = Branch.objects.create(
+            name='Palermo', address='Calle 2', phone='2',
+            latitude=Decimal('-34.588000'), longitude=Decimal('-58.430000'),
+            sunday_open=True, opening_time=time(10), closing_time=time(22),
+        )
+        cls.la_plata = Branch.objects.create(
+            name='La Plata', address='Calle 3', phone='3',
+            latitude=Decimal('-34.921000'), longitude=Decimal('-57.954500'),
+        )
+        Branch.objects.create(name='Sin mapa', address='Calle 4', phone='4')
+
+    def setUp(self):
+        self.api = APIClient()
+
+    def names(self, response):
+        return [branch['name'] for branch in response.data['results']]
+
+    def test_encode(self):
+        self.assertEqual(geo.encode(42.605, -5.603, 5), 'ezs42')
+        self.assertEqual(self.centro.geohash, geo.encode(self.centro.latitude, self.centro.longitude))
+        self.assertEqual(Branch.objects.get(name='Sin mapa').geohash, '')
+
+        self.centro.latitude, self.centro.longitude = Decimal('42.605'), Decimal('-5.603')
+        self.centro.save(update_fields=['latitude', 'longitude'])
+        self.assertTrue(Branch.objects.get(pk=self.centro.pk).geohash.startswith('ezs42'))
+
+    def test_sorted_by_distance_within_radius(self):
+        response = self.api.get('/api/branches/nearby/?lat=-34.6037&lng=-58.3816&radius=10')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.names(response), ['Centro', 'Palermo'])
+        distances = [branch['distance_km'] for branch in response.data['results']]
+        self.assertLess(distances[0], 0.01)
+        self.assertAlmostEqual(distances[1], 4.7, delta=0.3)
+
+        response = self.api.get('/api/branches/nearby/?lat=-34.6037&lng=-58.3816&radius=60&limit=1')
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(self.names(response), ['Centro'])
+
+    def test_matches_brute_force(self):
+        points = [(-34.7, -58.2), (-34.5, -58.6), (-34.9, -58.0), (-35.5, -58.5)]
+        for latitude, longitude in points:
+            for radius in (1, 5, 20, 50, 100):
+                expected = sorted(
+                    name
+                    for name, lat, lng in Branch.objects.exclude(latitude=None).values_list(
+                        'name', 'latitude', 'longitude'
+                    )
+                    if geo.distance_km(latitude, longitude, lat, lng) <= radius
+                )
+                found = geo.nearby(Branch.objects.all(), latitude, longitude, radius)
+                self.assertEqual(sorted(branch.name for _, branch in found), expected)
+
+    def test_antimeridian(self):
+        Branch.objects.create(
+            name='Fiyi', address='-', phone='5',
+            latitude=Decimal('-17.000000'), longitude=Decimal('179.990000'),
+        )
+        response = self.api.get('/api/branches/nearby/?lat=-17&lng=-179.99&radius=10')
+        self.assertEqual(self.names(response), ['Fiyi'])
+
+    def test_open_now(self):
+        url = '/api/branches/nearby/?lat=-34.6037&lng=-58.3816&radius=10&open_now=true'
+        sunday = timezone.make_aware(datetime(2026, 10, 18, 12, 0))
+        monday_night = timezone.make_aware(datetime(2026, 10, 19, 20, 0))
+        with mock.patch('core.views.timezone.localtime', return_value=sunday):
+            self.assertEqual(self.names(self.api.get(url)), ['Palermo'])
+        with mock.patch('core.views.timezone.localtime', return_value=monday_night):
+            self.assertEqual(self.names(self.api.get(url)), ['Palermo'])
+        self.assertTrue(Branch.objects.get(pk=self.palermo.pk).is_open_at(monday_night))
+        self.assertFalse(Branch.objects.get(pk=self.centro.pk).is_open_at(monday_night))
+
+    def test_invalid_params(self):
+        self.assertEqual(self.api.get('/api/branches/nearby/?lat=-34.6').status_code, 400)
+        self.assertEqual(self.api.get('/api/branches/nearby/?lat=95&lng=0').status_code, 400)
+        response = self.api.get('/api/branches/nearby/?lat=0&lng=0&radius=5000')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('radius', response.data)
+
+
+class AsyncCatalogTests(TestCase):
+    """Las vistas async de /api/async/ responden igual que las de DRF"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.centro = Branch.objects.create(name='Centro', address='Calle 1', phone='1')
+        cls.corte = Service.objects.create(
+            name='Corte de pelo', description='Clásico', price=1000, duration_minutes=30,
+        )
+        Service.objects.create(name='Color', description='-', price=2000, duration_minutes=60)
+        for i in range(5):
+            professional = Professional.objects.create(
+                first_name=f'Profesional{i}', last_name='Prueba', average_rating=i,
+            )
+            professional.branches.add(cls.centro)
+            professional.services.add(cls.corte)
+        cls.professional = professional
+        cls.user = User.objects.create_user(
+            email='cliente@example.com',
+            password='clave-segura-123',
+            first_name='Cliente',
+            last_name='Prueba',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def body(self, response):
+        data = response.json()
+        if isinstance(data, dict):
+            for key in ('next', 'previous'):
+                if data.get(key):
+                    data[key] = data[key].replace('/api/async/', '/api/')
+        return data
+
+    async def test_same_responses(self):
+        paths = [
+            'home/',
+            'branches/',
+            f'branches/{self.centro.id}/',
+            f'branches/{self.centro.id}/professionals/?page_size=2',
+            'services/',
+            'services/?search=corte',
+            f'services/{self.corte.id}/',
+            'services/summary/',
+            f'services/{self.corte.id}/professionals/',
+            'professionals/?page_size=2&page=2',
+            'professionals/?cursor=&page_size=2&count=false',
+            'professionals/?fields=id,full_name&include=branches_data',
+            f'professionals/{self.professional.id}/',
+            'professionals/summary/',
+            f'availability/?branch={self.centro.id}&service={self.corte.id}',
+            'professionals/0/',
+            'services/?page=50',
+            'availability/',
+        ]
+        client = AsyncClient(headers={'accept': 'application/json'})
+        for path in paths:
+            with self.subTest(path=path):
+                expected = await client.get('/api/' + path)
+                response = await client.get('/api/async/' + path)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(self.body(response), self.body(expected))
+
+    async def test_not_modified(self):
+        client = AsyncClient(headers={'accept': 'application/json'})
+        for path in ('/api/async/branches/', '/api/async/home/', f'/api/async/professionals/{self.professional.id}/'):
+            with self.subTest(path=path):
+                etag = (await client.get(path))['ETag']
+                response = await client.get(path, headers={'if-none-match': etag})
+                self.assertEqual(response.status_code, 304)
+
+    async def test_authentication(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await AsyncClient().get('/api/async/branches/', headers={'authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+
+        response = await AsyncClient().get('/api/async/branches/', headers={'authorization': 'Bearer invalido'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+
+        await self.user.adelete()
+        response = await AsyncClient().get('/api/async/branches/', headers={'authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_permissions(self):
+        class AdminView(async_views.AsyncAPIView):
+            permission_classes = [permissions.IsAdminUser]
+
+            async def get(self, request):
+                return Response({'user': request.user.email})
+
+        view = AdminView.as_view()
+        factory = AsyncRequestFactory()
+        self.assertEqual((await view(factory.get('/'))).status_code, 401)
+
+        token = str(AccessToken.for_user(self.user))
+        request = factory.get('/', headers={'authorization': f'Bearer {token}'})
+        self.assertEqual((await view(request)).status_code, 403)
+
+        self.user.is_staff = True
+        await self.user.asave()
+        response = await view(factory.get('/', headers={'authorization': f'Bearer {token}'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {'user': self.user.email})
+
+        response = await view(factory.post('/', headers={'authorization': f'Bearer {token}'}))
+        self.assertEqual(response.status_code, 405)
+
+    async def test_formats(self):
+        response = await AsyncClient().get('/api/async/branches/', headers={'accept': 'text/csv'})
+        self.assertEqual(response.status_code, 406)
+
+        response = await AsyncClient().get(
+            '/api/async/home/', headers={'accept': 'application/json', 'accept-encoding': 'gzip'}
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('branches', json.loads(gzip.decompress(response.content)))
+
+
+class CatalogSnapshotTests(TestCase):
+    """Copias estáticas del catálogo con hash y manifest"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.create(name='Centro', address='Calle 1', phone='1')
+        cls.service = Service.objects.create(
+            name='Corte', description='-', price=1000, duration_minutes=30,
+        )
+        Professional.objects.create(first_name='Ana', last_name='Pérez')
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings = override_settings(CATALOG_SNAPSHOT_ROOT=directory, CATALOG_SNAPSHOT_ON_SAVE=True)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.root = snapshots.root()
+
+    def files(self):
+        return sorted(path.name for path in self.root.iterdir())
+
+    def test_export_writes_hashed_files_and_manifest(self):
+        manifest, switched = snapshots.export()
+        self.assertTrue(switched)
+        self.assertEqual(
+            set(manifest['files']),
+            {'home', 'services_summary', 'professionals_summary', 'branches', 'services', 'professionals'},
+        )
+        for name, item in manifest['files'].items():
+            content = (self.root / item['file']).read_bytes()
+            self.assertEqual(item['file'], f'{name}.{item["hash"]}.json')
+            self.assertEqual(snapshots.content_hash(content), item['hash'])
+            self.assertEqual(len(content), item['bytes'])
+        self.assertEqual(snapshots.read_manifest(), manifest)
+        self.assertIn(f'manifest.{manifest["version"]}.json', self.files())
+
+        # El home exportado es el mismo que sirve la API
+        home = self.api.get('/api/home/', HTTP_ACCEPT='application/json')
+        self.assertEqual(snapshots.read_document('home')[0], home.content)
+        branches = json.loads(snapshots.read_document('branches')[0])
+        self.assertEqual(branches['count'], 1)
+        self.assertEqual(branches['results'][0]['name'], 'Centro')
+
+    def test_unchanged_catalog_keeps_version(self):
+        first, _ = snapshots.export()
+        files = self.files()
+        second, switched = snapshots.export()
+        self.assertFalse(switched)
+        self.assertEqual(second['version'], first['version'])
+        self.assertEqual(self.files(), files)
+
+    def test_commit_exports_new_version_and_prunes(self):
+        first, _ = snapshots.export()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.price = 1500
+            self.service.save()
+        current = snapshots.read_manifest()
+        self.assertNotEqual(current['version'], first['version'])
+        self.assertNotEqual(current['files']['services']['hash'], first['files']['services']['hash'])
+        # Lo que no cambió se reutiliza
+        self.assertEqual(current['files']['branches'], first['files']['branches'])
+        # La versión anterior se conserva (CATALOG_SNAPSHOT_KEEP)
+        self.assertIn(first['files']['services']['file'], self.files())
+
+        snapshots.prune(1)
+        self.assertNotIn(first['files']['services']['file'], self.files())
+        self.assertNotIn(f'manifest.{first["version"]}.json', self.files())
+        self.assertIn(current['files']['services']['file'], self.files())
+        self.assertIn(current['files']['branches']['file'], self.files())
+
+    def test_one_export_per_transaction(self):
+        with mock.patch.object(snapshots, 'export') as export:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.service.price = 1500
+                self.service.save()
+                self.branch.phone = '2'
+                self.branch.save()
+            self.assertEqual(export.call_count, 1)
+
+            # Si se revierte el savepoint del primer cambio, el segundo exporta
+            export.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(ZeroDivisionError), transaction.atomic():
+                    self.service.save()
+                    1 / 0
+                self.branch.save()
+            self.assertEqual(export.call_count, 1)
+
+            export.reset_mock()
+            with override_settings(CATALOG_SNAPSHOT_ON_SAVE=False):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.service.save()
+            export.assert_not_called()
+
+    def test_export_and_prune_wait_for_each_other(self):
+        cache.add(snapshots.LOCK_KEY, 'otro proceso')
+        with mock.patch.object(snapshots, 'LOCK_SECONDS', 0):
+            with self.assertRaises(snapshots.ExportInProgress):
+                snapshots.export()
+            with self.assertRaises(snapshots.ExportInProgress):
+                snapshots.prune(1)
+            with self.assertRaisesMessage(CommandError, 'otra exportación'):
+                call_command('export_catalog', stdout=StringIO())
+        self.assertFalse(self.root.exists() and self.files())
+
+        cache.delete(snapshots.LOCK_KEY)
+        snapshots.export()
+        self.assertIsNone(cache.get(snapshots.LOCK_KEY))
+
+    def test_api_serves_files_without_queries(self):
+        response = self.api.get('/api/catalog/snapshot/')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.json())
+
+        manifest, _ = snapshots.export()
+        with self.assertNumQueries(0):
+            response = self.api.get('/api/catalog/snapshot/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['version'], manifest['version'])
+
+        with self.assertNumQueries(0):
+            response = self.api.get('/api/catalog/snapshot/branches/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, snapshots.read_document('branches')[0])
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        response = self.api.get('/api/catalog/snapshot/branches/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.api.get('/api/catalog/snapshot/bookings/')
+        self.assertEqual(response.status_code, 404)
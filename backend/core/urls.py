@@ -3,6 +3,7 @@ from .views import (
     # Sucursales
     BranchListView,
     BranchDetailView,
+    NearbyBranchesView,
     
     # Servicios
     ServiceListView,
@@ -14,10 +15,49 @@ from .views import (
     ProfessionalsByBranchView,
     ProfessionalsByServiceView,
     
+    # Autocompletado
+    AutocompleteView,
+    
+    # Disponibilidad
+    AvailabilityView,
+    WeekAvailabilityView,
+    FirstAvailableView,
+    BundleAvailabilityView,
+    BranchCalendarView,
+    
+    # Turnos
+    AppointmentListCreateView,
+    SlotHoldView,
+    SlotHoldDetailView,
+    
     # Resúmenes
     services_summary,
     professionals_summary,
     home_data,
+    
+    # Copias estáticas del catálogo
+    catalog_snapshot_manifest,
+    catalog_snapshot,
+    
+    # Batch
+    BatchView,
+    
+    # Estadísticas
+    compression_stats,
+)
+from .async_views import (
+    AsyncHomeView,
+    AsyncBranchListView,
+    AsyncBranchDetailView,
+    AsyncServiceListView,
+    AsyncServiceDetailView,
+    AsyncServicesSummaryView,
+    AsyncProfessionalListView,
+    AsyncProfessionalDetailView,
+    AsyncProfessionalsSummaryView,
+    AsyncProfessionalsByBranchView,
+    AsyncProfessionalsByServiceView,
+    AsyncAvailabilityView,
 )
 
 app_name = 'core'
@@ -28,8 +68,10 @@ urlpatterns = [
     
     # Sucursales
     path('branches/', BranchListView.as_view(), name='branch_list'),
+    path('branches/nearby/', NearbyBranchesView.as_view(), name='branch_nearby'),
     path('branches/<int:pk>/', BranchDetailView.as_view(), name='branch_detail'),
     path('branches/<int:branch_id>/professionals/', ProfessionalsByBranchView.as_view(), name='professionals_by_branch'),
+    path('branches/<int:branch_id>/calendar/', BranchCalendarView.as_view(), name='branch_calendar'),
     
     # Servicios
     path('services/', ServiceListView.as_view(), name='service_list'),
@@ -41,4 +83,42 @@ urlpatterns = [
     path('professionals/', ProfessionalListView.as_view(), name='professional_list'),
     path('professionals/<int:pk>/', ProfessionalDetailView.as_view(), name='professional_detail'),
     path('professionals/summary/', professionals_summary, name='professionals_summary'),
+    
+    # Autocompletado
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
+    
+    # Disponibilidad
+    path('availability/', AvailabilityView.as_view(), name='availability'),
+    path('availability/week/', WeekAvailabilityView.as_view(), name='week_availability'),
+    path('availability/first/', FirstAvailableView.as_view(), name='first_available'),
+    path('availability/bundle/', BundleAvailabilityView.as_view(), name='bundle_availability'),
+    
+    # Turnos
+    path('appointments/', AppointmentListCreateView.as_view(), name='appointment_list'),
+    path('holds/', SlotHoldView.as_view(), name='slot_hold'),
+    path('holds/<str:token>/', SlotHoldDetailView.as_view(), name='slot_hold_detail'),
+    
+    # Copias estáticas del catálogo
+    path('catalog/snapshot/', catalog_snapshot_manifest, name='catalog_snapshot_manifest'),
+    path('catalog/snapshot/<slug:name>/', catalog_snapshot, name='catalog_snapshot'),
+    
+    # Batch
+    path('batch/', BatchView.as_view(), name='batch'),
+    
+    # Estadísticas
+    path('stats/compression/', compression_stats, name='compression_stats'),
+    
+    # Lectura async del catálogo (ASGI)
+    path('async/home/', AsyncHomeView.as_view(), name='async_home_data'),
+    path('async/branches/', AsyncBranchListView.as_view(), name='async_branch_list'),
+    path('async/branches/<int:pk>/', AsyncBranchDetailView.as_view(), name='async_branch_detail'),
+    path('async/branches/<int:branch_id>/professionals/', AsyncProfessionalsByBranchView.as_view(), name='async_professionals_by_branch'),
+    path('async/services/', AsyncServiceListView.as_view(), name='async_service_list'),
+    path('async/services/<int:pk>/', AsyncServiceDetailView.as_view(), name='async_service_detail'),
+    path('async/services/summary/', AsyncServicesSummaryView.as_view(), name='async_services_summary'),
+    path('async/services/<int:service_id>/professionals/', AsyncProfessionalsByServiceView.as_view(), name='async_professionals_by_service'),
+    path('async/professionals/', AsyncProfessionalListView.as_view(), name='async_professional_list'),
+    path('async/professionals/<int:pk>/', AsyncProfessionalDetailView.as_view(), name='async_professional_detail'),
+    path('async/professionals/summary/', AsyncProfessionalsSummaryView.as_view(), name='async_professionals_summary'),
+    path('async/availability/', AsyncAvailabilityView.as_view(), name='async_availability'),
 ]
\ No newline at end of file
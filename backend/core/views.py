@@ -1,23 +1,57 @@
-from rest_framework import generics, permissions, filters
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework import generics, permissions, filters, status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Branch, Service, Professional, ProfessionalUnavailability
+from . import autocomplete, batch, catalog, compression, geo, offerings, snapshots
+from .bitmaps import SLOT_MINUTES, encode_grids, grid_bytes
+from .conditional import ConditionalGetMixin, make_etag, set_validators
+from .fastpath import ValuesListMixin
+from .fieldsets import SparseFieldsetMixin
+from .pagination import KeysetPagination
+from .search import FullTextSearchFilter
+from .calendar_matrix import STATE_LABELS, branch_calendar, encode_rows
+from .availability import (
+    available_slots,
+    bundle_slots,
+    first_available,
+    get_slot_minutes,
+    professionals_for,
+    start_grids,
+)
+from .booking import SlotUnavailable, book_appointment, hold_slot
+from .holds import get_hold, release_hold, serialize_hold
+from .models import Branch, Service, Professional, ProfessionalSchedule, ProfessionalUnavailability, Appointment
 from .serializers import (
     BranchSerializer,
     BranchListSerializer,
+    NearbyBranchSerializer,
+    NearbyBranchesQuerySerializer,
     ServiceSerializer,
     ServiceListSerializer,
     ProfessionalSerializer,
     ProfessionalListSerializer,
     ProfessionalDetailSerializer,
     ProfessionalUnavailabilitySerializer,
+    AvailabilityQuerySerializer,
+    FirstAvailableQuerySerializer,
+    BundleQuerySerializer,
+    BranchCalendarQuerySerializer,
+    WeekAvailabilityQuerySerializer,
+    AutocompleteQuerySerializer,
+    AppointmentSerializer,
+    AppointmentCreateSerializer,
+    SlotRequestSerializer,
+    BatchSerializer,
 )
 
 
 # ========== SUCURSALES ==========
 
-class BranchListView(generics.ListAPIView):
+class BranchListView(ValuesListMixin, SparseFieldsetMixin, ConditionalGetMixin, generics.ListAPIView):
     """
     Lista todas las sucursales activas
     GET /api/branches/
@@ -25,9 +59,10 @@ class BranchListView(generics.ListAPIView):
     queryset = Branch.objects.filter(is_active=True)
     serializer_class = BranchListSerializer
     permission_classes = [permissions.AllowAny]
+    catalog_models = [catalog.BRANCH]
 
 
-class BranchDetailView(generics.RetrieveAPIView):
+class BranchDetailView(SparseFieldsetMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """
     Detalle de una sucursal específica
     GET /api/branches/{id}/
@@ -35,19 +70,58 @@ class BranchDetailView(generics.RetrieveAPIView):
     queryset = Branch.objects.filter(is_active=True)
     serializer_class = BranchSerializer
     permission_classes = [permissions.AllowAny]
+    catalog_models = [catalog.BRANCH]
+
+
+class NearbyBranchesView(APIView):
+    """
+    Sucursales activas dentro de un radio, de la más cercana a la más lejana
+    GET /api/branches/nearby/?lat=-34.6&lng=-58.4&radius=10&open_now=true&limit=20
+    El radio es en km; open_now deja solo las abiertas en este momento.
+    """
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request):
+        serializer = NearbyBranchesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        
+        queryset = Branch.objects.filter(is_active=True)
+        if params['open_now']:
+            queryset = queryset.filter(Branch.open_at_filter(timezone.localtime()))
+        
+        found = geo.nearby(queryset, params['lat'], params['lng'], params['radius'])
+        branches = []
+        for distance, branch in found[:params['limit']]:
+            branch.distance_km = round(distance, 3)
+            branches.append(branch)
+        
+        return Response({
+            'lat': params['lat'],
+            'lng': params['lng'],
+            'radius_km': params['radius'],
+            'count': len(found),
+            'results': NearbyBranchSerializer(
+                branches, many=True, context={'request': request}
+            ).data,
+        })
 
 
 # ========== SERVICIOS ==========
 
-class ServiceListView(generics.ListAPIView):
+class ServiceListView(ValuesListMixin, SparseFieldsetMixin, ConditionalGetMixin, generics.ListAPIView):
     """
     Lista todos los servicios activos
     GET /api/services/
     Filtros disponibles: ?search={texto}
+    Paginación: ?page=N o ?cursor= (scroll infinito); ?count=false omite el total
     """
     serializer_class = ServiceListSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    catalog_models = [catalog.SERVICE]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('name', 'id')
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     search_fields = ['name', 'description']
     ordering_fields = ['price', 'name', 'duration_minutes']
     ordering = ['name']
@@ -57,7 +131,7 @@ class ServiceListView(generics.ListAPIView):
         return queryset
 
 
-class ServiceDetailView(generics.RetrieveAPIView):
+class ServiceDetailView(SparseFieldsetMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """
     Detalle de un servicio específico
     GET /api/services/{id}/
@@ -65,83 +139,465 @@ class ServiceDetailView(generics.RetrieveAPIView):
     queryset = Service.objects.filter(is_active=True)
     serializer_class = ServiceSerializer
     permission_classes = [permissions.AllowAny]
+    catalog_models = [catalog.SERVICE]
 
 
 # ========== PROFESIONALES ==========
 
-class ProfessionalListView(generics.ListAPIView):
+# Sucursales y servicios anidados en las respuestas de profesionales
+PROFESSIONAL_RELATED_CATALOG = {
+    'branches_data': (catalog.BRANCH, 'branches'),
+    'services_data': (catalog.SERVICE, 'services'),
+}
+
+
+class ProfessionalListView(ValuesListMixin, SparseFieldsetMixin, ConditionalGetMixin, generics.ListAPIView):
     """
     Lista todos los profesionales activos
     GET /api/professionals/
     Filtros: ?branch={id}, ?service={id}
+    Paginación: ?page=N o ?cursor= (scroll infinito); ?count=false omite el total
     """
     serializer_class = ProfessionalListSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    catalog_models = [catalog.PROFESSIONAL]
+    related_catalog = PROFESSIONAL_RELATED_CATALOG
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-average_rating', '-id')
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     search_fields = ['first_name', 'last_name', 'specialties']
     ordering_fields = ['average_rating', 'experience_years']
     ordering = ['-average_rating']
     
     def get_queryset(self):
-        queryset = Professional.objects.filter(is_active=True)
-        
-        # Filtrar por sucursal
-        branch_id = self.request.query_params.get('branch', None)
-        if branch_id:
-            queryset = queryset.filter(branches__id=branch_id)
-        
-        # Filtrar por servicio
-        service_id = self.request.query_params.get('service', None)
-        if service_id:
-            queryset = queryset.filter(services__id=service_id)
-        
-        return queryset.distinct()
+        # Filtros por sucursal y/o servicio: una búsqueda en la tabla
+        # desnormalizada (core.offerings), sin unir las dos tablas M2M
+        return offerings.filter_professionals(
+            Professional.objects.filter(is_active=True),
+            branch_id=self.request.query_params.get('branch'),
+            service_id=self.request.query_params.get('service'),
+        )
 
 
-class ProfessionalDetailView(generics.RetrieveAPIView):
+class ProfessionalDetailView(SparseFieldsetMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """
     Detalle de un profesional específico
     GET /api/professionals/{id}/
     """
+    # Las relaciones se precargan solo si se piden (ver SparseFieldsetMixin)
     queryset = Professional.objects.filter(is_active=True)
     serializer_class = ProfessionalDetailSerializer
     permission_classes = [permissions.AllowAny]
+    catalog_models = [catalog.PROFESSIONAL]
+    related_catalog = PROFESSIONAL_RELATED_CATALOG
+    
+    def get_conditional_querysets(self):
+        """
+        El detalle también muestra los horarios y total_appointments, que las
+        reservas incrementan sin tocar updated_at (sucursales y servicios por
+        related_catalog)
+        """
+        return super().get_conditional_querysets() + [
+            ProfessionalSchedule.objects.filter(professional=self.kwargs['pk']),
+            Appointment.objects.filter(professional=self.kwargs['pk']),
+        ]
 
 
-class ProfessionalsByBranchView(generics.ListAPIView):
+class ProfessionalsByBranchView(ValuesListMixin, SparseFieldsetMixin, ConditionalGetMixin, generics.ListAPIView):
     """
     Lista profesionales de una sucursal específica
     GET /api/branches/{branch_id}/professionals/
     """
     serializer_class = ProfessionalListSerializer
     permission_classes = [permissions.AllowAny]
+    catalog_models = [catalog.PROFESSIONAL]
+    related_catalog = PROFESSIONAL_RELATED_CATALOG
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-average_rating', '-id')
     
     def get_queryset(self):
-        branch_id = self.kwargs.get('branch_id')
-        return Professional.objects.filter(
-            is_active=True,
-            branches__id=branch_id
-        ).distinct()
+        return offerings.filter_professionals(
+            Professional.objects.filter(is_active=True),
+            branch_id=self.kwargs.get('branch_id'),
+        )
 
 
-class ProfessionalsByServiceView(generics.ListAPIView):
+class ProfessionalsByServiceView(ValuesListMixin, SparseFieldsetMixin, ConditionalGetMixin, generics.ListAPIView):
     """
     Lista profesionales que ofrecen un servicio específico
     GET /api/services/{service_id}/professionals/
     """
     serializer_class = ProfessionalListSerializer
     permission_classes = [permissions.AllowAny]
+    catalog_models = [catalog.PROFESSIONAL]
+    related_catalog = PROFESSIONAL_RELATED_CATALOG
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-average_rating', '-id')
+    
+    def get_queryset(self):
+        return offerings.filter_professionals(
+            Professional.objects.filter(is_active=True),
+            service_id=self.kwargs.get('service_id'),
+        )
+
+
+# ========== AUTOCOMPLETADO ==========
+
+class AutocompleteView(APIView):
+    """
+    Sugerencias para el buscador: sucursales, servicios, profesionales y especialidades
+    GET /api/autocomplete/?q={texto}&limit=10
+    Se responde desde un índice en memoria, sin consultar la base.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    
+    def get(self, request):
+        serializer = AutocompleteQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        return Response({
+            'query': data['q'],
+            'results': autocomplete.suggest(data['q'], data['limit']),
+        })
+
+
+# ========== DISPONIBILIDAD ==========
+
+class AvailabilityView(APIView):
+    """
+    Horarios de inicio reservables por profesional
+    GET /api/availability/?branch={id}&service={id}
+    Parámetros opcionales: ?date_from=AAAA-MM-DD, ?date_to=AAAA-MM-DD, ?professional={id}
+    """
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request):
+        serializer = AvailabilityQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        branch = data['branch']
+        service = data['service']
+        professionals = professionals_for(branch, service)
+        if data.get('professional'):
+            professionals = professionals.filter(id=data['professional'].id)
+        
+        return Response({
+            'branch': branch.id,
+            'service': service.id,
+            'duration_minutes': service.duration_minutes,
+            'slot_minutes': get_slot_minutes(),
+            'date_from': data['date_from'],
+            'date_to': data['date_to'],
+            'professionals': available_slots(
+                branch,
+                service,
+                data['date_from'],
+                data['date_to'],
+                professionals=professionals,
+            ),
+        })
+
+
+class WeekAvailabilityView(APIView):
+    """
+    Disponibilidad de una semana para todos los profesionales de la sucursal
+    GET /api/availability/week/?branch={id}&service={id}
+    Parámetros opcionales: ?date_from=AAAA-MM-DD, ?days=7, ?encoding=bits|json
+    
+    Con encoding=bits (por defecto) cada profesional trae un string base64 con
+    una grilla por día de `bytes_per_day` bytes: el bit i (little-endian) vale
+    1 si hay un inicio a los i * slot_minutes minutos. Con encoding=json trae
+    las listas de horarios como /api/availability/.
+    El header X-Slot-Minutes repite el tamaño de la grilla.
+    """
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request):
+        serializer = WeekAvailabilityQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        branch = data['branch']
+        service = data['service']
+        step = get_slot_minutes()
+        payload = {
+            'branch': branch.id,
+            'service': service.id,
+            'duration_minutes': service.duration_minutes,
+            'slot_minutes': step,
+            'date_from': data['date_from'],
+            'days': data['days'],
+            'encoding': data['encoding'],
+        }
+        
+        if data['encoding'] == 'json':
+            payload['professionals'] = available_slots(
+                branch, service, data['date_from'], data['date_to']
+            )
+        else:
+            payload['bytes_per_day'] = grid_bytes(step)
+            payload['professionals'] = [
+                {
+                    'professional_id': professional.id,
+                    'full_name': professional.get_full_name(),
+                    'bits': encode_grids(grids, step),
+                }
+                for professional, grids in start_grids(
+                    branch, service, data['date_from'], data['date_to']
+                )
+            ]
+        
+        return Response(payload, headers={'X-Slot-Minutes': str(step)})
+
+
+class FirstAvailableView(APIView):
+    """
+    Primeros turnos libres con cualquier profesional
+    GET /api/availability/first/?branch={id}&service={id}&n={cantidad}
+    """
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request):
+        serializer = FirstAvailableQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        return Response({
+            'branch': data['branch'].id,
+            'service': data['service'].id,
+            'duration_minutes': data['service'].duration_minutes,
+            'slots': first_available(data['branch'], data['service'], data['n']),
+        })
+
+
+class BundleAvailabilityView(APIView):
+    """
+    Horarios para hacer varios servicios seguidos (ej: Corte + Barba)
+    GET /api/availability/bundle/?branch={id}&services={id},{id}
+    Parámetros opcionales: ?date_from, ?date_to, ?same_professional=true, ?limit
+    """
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request):
+        serializer = BundleQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        return Response({
+            'branch': data['branch'].id,
+            'services': [service.id for service in data['services']],
+            'duration_minutes': sum(service.duration_minutes for service in data['services']),
+            'itineraries': bundle_slots(
+                data['branch'],
+                data['services'],
+                data['date_from'],
+                data['date_to'],
+                same_professional=data['same_professional'],
+                limit=data['limit'],
+            ),
+        })
+
+
+class BranchCalendarView(APIView):
+    """
+    Calendario de recepción: estado de cada profesional en cada bloque de 5 minutos
+    GET /api/branches/{branch_id}/calendar/?date_from=AAAA-MM-DD&days=14
+    Cada día se devuelve como una cadena con un dígito de estado por bloque.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request, branch_id):
+        branch = generics.get_object_or_404(Branch, pk=branch_id, is_active=True)
+        serializer = BranchCalendarQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        date_from = serializer.validated_data.get('date_from') or timezone.localdate()
+        
+        professionals = list(
+            branch.professionals.filter(is_active=True).only('first_name', 'last_name')
+        )
+        dates, matrix = branch_calendar(
+            branch,
+            [p.id for p in professionals],
+            date_from,
+            serializer.validated_data['days'],
+        )
+        rows = encode_rows(matrix)
+        
+        return Response({
+            'branch': branch.id,
+            'slot_minutes': SLOT_MINUTES,
+            'dates': dates,
+            'states': STATE_LABELS,
+            'professionals': [
+                {
+                    'professional_id': professional.id,
+                    'full_name': professional.get_full_name(),
+                    'days': rows[i],
+                }
+                for i, professional in enumerate(professionals)
+            ],
+        })
+
+
+# ========== TURNOS ==========
+
+class AppointmentListCreateView(SparseFieldsetMixin, generics.ListCreateAPIView):
+    """
+    Turnos del usuario actual y reserva de turnos
+    GET  /api/appointments/
+    POST /api/appointments/
+    """
+    serializer_class = AppointmentSerializer
+    permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        service_id = self.kwargs.get('service_id')
-        return Professional.objects.filter(
-            is_active=True,
-            services__id=service_id
-        ).distinct()
+        return Appointment.objects.filter(
+            client=self.request.user
+        ).select_related('professional', 'branch', 'service')
+    
+    def create(self, request, *args, **kwargs):
+        serializer = AppointmentCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        try:
+            appointment = book_appointment(
+                client=request.user,
+                branch=data['branch'],
+                professional=data['professional'],
+                service=data['service'],
+                day=data['date'],
+                start_time=data['start_time'],
+                notes=data['notes'],
+                hold=data['hold'] or None,
+            )
+        except SlotUnavailable as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_409_CONFLICT)
+        
+        return Response(
+            AppointmentSerializer(appointment).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class SlotHoldView(APIView):
+    """
+    Retiene un horario unos minutos antes de confirmarlo
+    POST /api/holds/
+    
+    Mientras dura la retención el horario no aparece en la disponibilidad y
+    solo el cliente que lo retuvo puede reservarlo (enviando `hold` al
+    crear el turno). Cada cliente tiene una retención a la vez.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        serializer = SlotRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        try:
+            hold = hold_slot(
+                client=request.user,
+                branch=data['branch'],
+                professional=data['professional'],
+                service=data['service'],
+                day=data['date'],
+                start_time=data['start_time'],
+            )
+        except SlotUnavailable as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_409_CONFLICT)
+        
+        return Response(serialize_hold(hold), status=status.HTTP_201_CREATED)
+
+
+class SlotHoldDetailView(APIView):
+    """
+    Consulta o libera una retención propia
+    GET    /api/holds/<token>/
+    DELETE /api/holds/<token>/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, token):
+        hold = get_hold(token, request.user)
+        if hold is None:
+            return Response({
+                'error': 'Retención no encontrada o vencida'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response(serialize_hold(hold))
+    
+    def delete(self, request, token):
+        if not release_hold(token, request.user):
+            return Response({
+                'error': 'Retención no encontrada o vencida'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 # ========== VISTAS DE INFORMACIÓN GENERAL ==========
 
+def _services_summary():
+    services = Service.objects.filter(is_active=True)
+    return {
+        'total_services': services.count(),
+        'services': ServiceSerializer(services[:10], many=True).data,
+    }
+
+
+def _professionals_summary():
+    professionals = Professional.objects.filter(is_active=True)
+    return {
+        'total_professionals': professionals.count(),
+        'professionals': ProfessionalListSerializer.values_data(
+            ProfessionalListSerializer.values_queryset(professionals)[:10]
+        ),
+    }
+
+
+def _home_data():
+    # Sucursales activas
+    branches = Branch.objects.filter(is_active=True)
+    
+    # Servicios activos
+    services = Service.objects.filter(is_active=True)[:10]
+    
+    # Profesionales activos
+    professionals = Professional.objects.filter(is_active=True)
+    
+    return {
+        'branches': BranchListSerializer.values_data(BranchListSerializer.values_queryset(branches)),
+        'services': ServiceSerializer(services, many=True).data,
+        'professionals': ProfessionalListSerializer.values_data(
+            ProfessionalListSerializer.values_queryset(professionals)[:10]
+        ),
+    }
+
+
+def _cached_json(request, name, models, build):
+    """
+    Respuesta pre-renderizada desde la caché del catálogo, en el formato que
+    pidió el cliente (JSON o MessagePack).
+    El ETag sale de las versiones del catálogo, así que un 304 no toca la base.
+    """
+    renderer = request.accepted_renderer
+    etag = make_etag(name, renderer.format, catalog.versions(models))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            catalog.cached_content(name, models, build, renderer),
+            content_type=renderer.media_type,
+        )
+    return set_validators(response, etag)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def services_summary(request):
@@ -149,12 +605,7 @@ def services_summary(request):
     Resumen de servicios para el home
     GET /api/services/summary/
     """
-    services = Service.objects.filter(is_active=True)
-    
-    return Response({
-        'total_services': services.count(),
-        'services': ServiceSerializer(services[:10], many=True).data,
-    })
+    return _cached_json(request, 'services_summary', [catalog.SERVICE], _services_summary)
 
 
 @api_view(['GET'])
@@ -164,12 +615,7 @@ def professionals_summary(request):
     Resumen de profesionales para el home
     GET /api/professionals/summary/
     """
-    professionals = Professional.objects.filter(is_active=True)
-    
-    return Response({
-        'total_professionals': professionals.count(),
-        'professionals': ProfessionalListSerializer(professionals[:10], many=True).data,
-    })
+    return _cached_json(request, 'professionals_summary', [catalog.PROFESSIONAL], _professionals_summary)
 
 
 @api_view(['GET'])
@@ -179,17 +625,88 @@ def home_data(request):
     Datos completos para la página de inicio
     GET /api/home/
     """
-    # Sucursales activas
-    branches = Branch.objects.filter(is_active=True)
-    
-    # Servicios activos
-    services = Service.objects.filter(is_active=True)[:10]
-    
-    # Profesionales activos
-    professionals = Professional.objects.filter(is_active=True)[:10]
+    return _cached_json(request, 'home', catalog.MODELS, _home_data)
+
+
+# ========== COPIAS ESTÁTICAS DEL CATÁLOGO ==========
+
+def _snapshot_response(request, content, etag):
+    etag = make_etag(etag)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    # La URL es fija y el contenido cambia con cada versión: revalidar siempre
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def catalog_snapshot_manifest(request):
+    """
+    Versión actual de las copias estáticas del catálogo, sin consultar la base
+    GET /api/catalog/snapshot/
+    Trae la versión y, por documento, el archivo con hash (servido en
+    CATALOG_SNAPSHOT_URL, cacheable para siempre), su hash y su tamaño.
+    """
+    content = snapshots.manifest_content()
+    if content is None:
+        return Response({
+            'error': 'Todavía no se exportó el catálogo'
+        }, status=status.HTTP_404_NOT_FOUND)
+    return _snapshot_response(request, content, snapshots.content_hash(content))
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def catalog_snapshot(request, name):
+    """
+    Documento de la versión actual de las copias estáticas, sin consultar la base
+    GET /api/catalog/snapshot/{nombre}/ (home, branches, services, professionals...)
+    """
+    document = snapshots.read_document(name)
+    if document is None:
+        return Response({
+            'error': 'Documento no encontrado'
+        }, status=status.HTTP_404_NOT_FOUND)
+    content, digest = document
+    return _snapshot_response(request, content, digest)
+
+
+# ========== BATCH ==========
+
+class BatchView(APIView):
+    """
+    Varias consultas GET en un solo viaje
+    POST /api/batch/
+    {"requests": [{"id": "branches", "path": "/branches/"}, {"path": "/auth/me/"}]}
+    Cada resultado trae id, path, status, headers (ETag...) y body. Cada
+    consulta aplica los permisos de su vista con el usuario del batch.
+    """
+    permission_classes = [permissions.AllowAny]
     
-    return Response({
-        'branches': BranchListSerializer(branches, many=True).data,
-        'services': ServiceSerializer(services, many=True).data,
-        'professionals': ProfessionalListSerializer(professionals, many=True).data,
-    })
\ No newline at end of file
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        return Response({
+            'results': [
+                batch.run(request, item, BatchView)
+                for item in serializer.validated_data['requests']
+            ],
+        })
+
+
+# ========== ESTADÍSTICAS ==========
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def compression_stats(request):
+    """
+    Aciertos de la caché de respuestas comprimidas
+    GET /api/stats/compression/
+    """
+    return Response(compression.stats())
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "peluqueria_backend.settings")
 
 application = get_asgi_application()
+
+# Índice de autocompletado listo antes de los primeros pedidos (no se arma en
+# el request, ver core.autocomplete)
+from core import autocomplete  # noqa: E402
+
+autocomplete.warm()
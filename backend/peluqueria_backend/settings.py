@@ -6,6 +6,7 @@ Generated by 'django-admin startproject' using Django 5.2.9.
 
 from pathlib import Path
 from datetime import timedelta
+from importlib.util import find_spec
 import environ
 
 # ========== Django-environ setup ==========
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.compression.PrecompressedCacheMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -90,6 +92,29 @@ DATABASES = {
     }
 }
 
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # Las transacciones toman el lock de escritura al empezar, así las reservas
+    # concurrentes esperan su turno en vez de fallar con "database is locked"
+    DATABASES["default"]["OPTIONS"] = {
+        "transaction_mode": "IMMEDIATE",
+        "timeout": 20,
+    }
+
+
+# ========== Cache ==========
+# La caché guarda estado que todos los procesos tienen que ver igual: las
+# retenciones de turnos, las versiones del catálogo (y su lock de
+# regeneración), las versiones de los árboles de bloqueos y del índice de
+# autocompletado, y las respuestas comprimidas. Con una caché por proceso
+# (locmem), un cambio en un worker no invalida lo de los demás. Por eso fuera
+# de DEBUG CACHE_URL es obligatoria (ej: rediscache://127.0.0.1:6379/1);
+# CACHE_URL=locmemcache:// explícito solo sirve con un único proceso.
+CACHES = {
+    "default": (
+        env.cache("CACHE_URL", default="locmemcache://") if DEBUG else env.cache("CACHE_URL")
+    ),
+}
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -132,9 +157,11 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
+    # JSON con orjson; MessagePack (Accept: application/msgpack) si msgpack
+    # está instalado
     "DEFAULT_RENDERER_CLASSES": (
-        "rest_framework.renderers.JSONRenderer",
-    ),
+        "core.renderers.FastJSONRenderer",
+    ) + (("core.renderers.MessagePackRenderer",) if find_spec("msgpack") else ()),
     "DEFAULT_PARSER_CLASSES": (
         "rest_framework.parsers.JSONParser",
         "rest_framework.parsers.MultiPartParser",
@@ -187,6 +214,47 @@ EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD", default="")
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default="noreply@10peluqueria.com")
 
 
+# ========== TURNOS ==========
+# Granularidad (minutos) de los horarios de inicio ofrecidos
+BOOKING_SLOT_MINUTES = env.int("BOOKING_SLOT_MINUTES", default=15)
+# Rango máximo (días) de una consulta de disponibilidad
+AVAILABILITY_MAX_DAYS = env.int("AVAILABILITY_MAX_DAYS", default=31)
+# Días hacia adelante con disponibilidad materializada (AvailabilityBitmap)
+AVAILABILITY_HORIZON_DAYS = env.int("AVAILABILITY_HORIZON_DAYS", default=60)
+# Segundos que un cliente puede retener un horario antes de confirmarlo
+BOOKING_HOLD_SECONDS = env.int("BOOKING_HOLD_SECONDS", default=300)
+# Profesionales cuyos bloqueos se guardan en memoria como árbol de intervalos
+# (por proceso; se descartan los menos usados)
+AVAILABILITY_TREE_CACHE_SIZE = env.int("AVAILABILITY_TREE_CACHE_SIZE", default=1000)
+
+
+# ========== CATÁLOGO ==========
+# Segundos que se guardan el home y los resúmenes (las señales los invalidan antes)
+CATALOG_CACHE_SECONDS = env.int("CATALOG_CACHE_SECONDS", default=24 * 60 * 60)
+# Rutas cuyas respuestas con ETag se guardan comprimidas (gzip/brotli)
+COMPRESSED_CACHE_PATHS = env.list(
+    "COMPRESSED_CACHE_PATHS",
+    default=[
+        "/api/home/", "/api/branches/", "/api/services/", "/api/professionals/",
+        "/api/async/",
+    ],
+)
+# Tamaño mínimo (bytes) para comprimir una respuesta
+COMPRESSED_CACHE_MIN_BYTES = env.int("COMPRESSED_CACHE_MIN_BYTES", default=200)
+# Máximo de consultas en un POST /api/batch/
+BATCH_MAX_REQUESTS = env.int("BATCH_MAX_REQUESTS", default=10)
+# Copias estáticas del catálogo (core.snapshots): directorio, URL pública,
+# versiones que se conservan y exportación automática al guardar. Esta última
+# exporta todo el catálogo dentro del request que guarda, así que viene
+# apagada: sin ella hay que correr `manage.py export_catalog` (ej: desde cron)
+CATALOG_SNAPSHOT_ROOT = env("CATALOG_SNAPSHOT_ROOT", default=str(MEDIA_ROOT / "catalog"))
+CATALOG_SNAPSHOT_URL = env("CATALOG_SNAPSHOT_URL", default=MEDIA_URL + "catalog/")
+CATALOG_SNAPSHOT_KEEP = env.int("CATALOG_SNAPSHOT_KEEP", default=3)
+CATALOG_SNAPSHOT_ON_SAVE = env.bool("CATALOG_SNAPSHOT_ON_SAVE", default=False)
+# Radio máximo (km) de GET /api/branches/nearby/
+NEARBY_MAX_RADIUS_KM = env.int("NEARBY_MAX_RADIUS_KM", default=100)
+
+
 # ========== SECURITY (prod) ==========
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -15,6 +15,8 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
@@ -26,3 +28,7 @@ urlpatterns = [
 
     path("api/", include("core.urls"))
 ]
+
+# En desarrollo Django sirve MEDIA_ROOT (imágenes y copias estáticas del
+# catálogo); en producción lo sirve el servidor web
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "peluqueria_backend.settings")
 
 application = get_wsgi_application()
+
+# Índice de autocompletado listo antes de los primeros pedidos (no se arma en
+# el request, ver core.autocomplete)
+from core import autocomplete  # noqa: E402
+
+autocomplete.warm()
@@ -0,0 +1,31 @@
+import axiosInstance from "./axios";
+import { API_ENDPOINTS } from "../utils/constants";
+
+const appointmentService = {
+    // Turnos del usuario logueado
+    getAll: async (params = {}) => {
+        const response = await axiosInstance.get(API_ENDPOINTS.APPOINTMENTS, { params });
+        return response.data;
+    },
+
+    // Retener un horario unos minutos antes de confirmar
+    // data: { branch, professional, service, date, start_time }
+    hold: async (data) => {
+        const response = await axiosInstance.post(API_ENDPOINTS.HOLDS, data);
+        return response.data;
+    },
+
+    // Liberar la retención (ej: el cliente cambió de horario)
+    releaseHold: async (token) => {
+        await axiosInstance.delete(API_ENDPOINTS.HOLD_DETAIL(token));
+    },
+
+    // Reservar un turno
+    // data: { branch, professional, service, date, start_time, notes, hold }
+    create: async (data) => {
+        const response = await axiosInstance.post(API_ENDPOINTS.APPOINTMENTS, data);
+        return response.data;
+    },
+};
+
+export default appointmentService;
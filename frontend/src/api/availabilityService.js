@@ -0,0 +1,58 @@
+import axiosInstance from "./axios";
+import { API_ENDPOINTS } from "../utils/constants";
+
+const availabilityService = {
+    // Horarios disponibles por profesional
+    // params: { branch, service, date_from, date_to, professional }
+    getSlots: async (params) => {
+        const response = await axiosInstance.get(API_ENDPOINTS.AVAILABILITY, { params });
+        return response.data;
+    },
+
+    // Semana completa de todos los profesionales de la sucursal, compacta
+    // Cada profesional trae `bits`: usar decodeWeekBits para obtener los horarios
+    getWeek: async (branch, service, params = {}) => {
+        const response = await axiosInstance.get(API_ENDPOINTS.AVAILABILITY_WEEK, {
+            params: { branch, service, ...params },
+        });
+        return response.data;
+    },
+
+    // Primeros turnos libres con cualquier profesional
+    getFirstAvailable: async (branch, service, n = 5) => {
+        const response = await axiosInstance.get(API_ENDPOINTS.AVAILABILITY_FIRST, {
+            params: { branch, service, n },
+        });
+        return response.data;
+    },
+
+    // Varios servicios seguidos (ej: Corte + Barba)
+    getBundle: async (branch, serviceIds, params = {}) => {
+        const response = await axiosInstance.get(API_ENDPOINTS.AVAILABILITY_BUNDLE, {
+            params: { branch, services: serviceIds.join(','), ...params },
+        });
+        return response.data;
+    },
+};
+
+// Convierte el string base64 de /availability/week/ en una lista de horarios
+// ['HH:MM', ...] por día. El bit i de cada día es el inicio a i * slotMinutes.
+export const decodeWeekBits = (bits, bytesPerDay, slotMinutes) => {
+    const bytes = Uint8Array.from(atob(bits), (char) => char.charCodeAt(0));
+    const days = [];
+    for (let offset = 0; offset < bytes.length; offset += bytesPerDay) {
+        const slots = [];
+        for (let i = 0; i < bytesPerDay * 8; i++) {
+            if (bytes[offset + (i >> 3)] & (1 << (i & 7))) {
+                const minutes = i * slotMinutes;
+                const hh = String(Math.floor(minutes / 60)).padStart(2, '0');
+                const mm = String(minutes % 60).padStart(2, '0');
+                slots.push(`${hh}:${mm}`);
+            }
+        }
+        days.push(slots);
+    }
+    return days;
+};
+
+export default availabilityService;
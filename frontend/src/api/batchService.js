@@ -0,0 +1,37 @@
+import axiosInstance from "./axios";
+import { API_ENDPOINTS, AUTH_ENDPOINTS, STORAGE_KEYS } from "../utils/constants";
+
+const batchService = {
+    // Ejecuta varias consultas GET en un solo viaje.
+    // requests: [{ id, path }] con rutas relativas a la API (ej: '/branches/')
+    // Devuelve { [id]: { status, headers, body } }
+    run: async (requests) => {
+        const response = await axiosInstance.post(API_ENDPOINTS.BATCH, { requests });
+        return Object.fromEntries(
+            response.data.results.map(({ id, ...result }) => [id, result])
+        );
+    },
+
+    // Datos de la primera pantalla: sucursales, servicios, profesionales y usuario
+    getInitialData: async () => {
+        const requests = [
+            { id: 'branches', path: API_ENDPOINTS.BRANCHES },
+            { id: 'services', path: API_ENDPOINTS.SERVICES },
+            { id: 'professionals', path: API_ENDPOINTS.PROFESSIONALS },
+        ];
+        if (localStorage.getItem(STORAGE_KEYS.ACCESS_TOKEN)) {
+            requests.push({ id: 'user', path: AUTH_ENDPOINTS.ME });
+        }
+
+        const results = await batchService.run(requests);
+        const bodyOf = (id) => (results[id]?.status === 200 ? results[id].body : null);
+        return {
+            branches: bodyOf('branches'),
+            services: bodyOf('services'),
+            professionals: bodyOf('professionals'),
+            user: bodyOf('user'),
+        };
+    },
+};
+
+export default batchService;
@@ -8,6 +8,13 @@ const branchService = {
         return response.data;
     },
 
+    // Sucursales cercanas, de la más cercana a la más lejana
+    // params: { lat, lng, radius (km), open_now, limit }
+    getNearby: async(params) => {
+        const response = await axiosInstance.get(API_ENDPOINTS.BRANCHES_NEARBY, { params });
+        return response.data;
+    },
+
     // Obtener detalle de una sucursal
     getById: async(id) => {
         const response = await axiosInstance.get(API_ENDPOINTS.BRANCH_DETAIL(id));
@@ -18,6 +25,12 @@ const branchService = {
     getProfessionals: async(branchId) => {
         const response = await axiosInstance.get(API_ENDPOINTS.BRANCHES_PROFESSIONALS(branchId));
         return response.data;
+    },
+
+    // Calendario de recepción (solo staff)
+    getCalendar: async(branchId, params = {}) => {
+        const response = await axiosInstance.get(API_ENDPOINTS.BRANCH_CALENDAR(branchId), { params });
+        return response.data;
     }
 };
 
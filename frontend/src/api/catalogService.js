@@ -0,0 +1,40 @@
+import axios from 'axios';
+import axiosInstance from "./axios";
+import { API_ENDPOINTS, CATALOG_SNAPSHOT_URL } from "../utils/constants";
+
+// Cliente sin token ni baseURL para los archivos estáticos
+const staticClient = axios.create({ baseURL: CATALOG_SNAPSHOT_URL });
+
+// Documentos ya descargados por archivo (con hash: no cambian nunca)
+const documents = new Map();
+
+const catalogService = {
+    // Versión actual: { version, generated_at, files: { nombre: { file, hash, bytes } } }
+    // Siempre se revalida: es lo único que cambia entre versiones
+    getManifest: async () => {
+        const response = await staticClient.get('manifest.json', {
+            headers: { 'Cache-Control': 'no-cache' },
+        });
+        return response.data;
+    },
+
+    // Documento de la versión actual (home, branches, services, professionals,
+    // services_summary, professionals_summary). Si los archivos estáticos no
+    // están disponibles se piden a la API, que tampoco consulta la base.
+    get: async (name) => {
+        try {
+            const manifest = await catalogService.getManifest();
+            const { file } = manifest.files[name];
+            if (!documents.has(file)) {
+                const response = await staticClient.get(file);
+                documents.set(file, response.data);
+            }
+            return documents.get(file);
+        } catch {
+            const response = await axiosInstance.get(API_ENDPOINTS.CATALOG_SNAPSHOT_DOCUMENT(name));
+            return response.data;
+        }
+    },
+};
+
+export default catalogService;
@@ -0,0 +1,14 @@
+import axiosInstance from "./axios";
+import { API_ENDPOINTS } from "../utils/constants";
+
+const searchService = {
+    // Sugerencias del buscador (sucursales, servicios, profesionales, especialidades)
+    autocomplete: async (q, limit = 10) => {
+        const response = await axiosInstance.get(API_ENDPOINTS.AUTOCOMPLETE, {
+            params: { q, limit },
+        });
+        return response.data.results;
+    },
+};
+
+export default searchService;
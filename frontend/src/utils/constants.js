@@ -2,6 +2,12 @@
 export const API_BASE_URL =
   import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
 
+// Copias estáticas del catálogo (manifest.json y archivos con hash),
+// servidas por el servidor web desde MEDIA_ROOT/catalog/
+export const CATALOG_SNAPSHOT_URL =
+  import.meta.env.VITE_CATALOG_SNAPSHOT_URL ||
+  `${API_BASE_URL.replace(/\/api\/?$/, '')}/media/catalog/`;
+
 // Endpoints de autenticación
 export const AUTH_ENDPOINTS = {
   REGISTER: '/auth/register/',
@@ -22,9 +28,11 @@ export const API_ENDPOINTS = {
 
   // Sucursales
   BRANCHES: '/branches/',
+  BRANCHES_NEARBY: '/branches/nearby/',
   BRANCH_DETAIL: (id) => `/branches/${id}/`,
   BRANCHES_PROFESSIONALS: (id) =>
     `/branches/${id}/professionals/`,
+  BRANCH_CALENDAR: (id) => `/branches/${id}/calendar/`,
 
   // Servicios
   SERVICES: '/services/',
@@ -38,6 +46,27 @@ export const API_ENDPOINTS = {
   PROFESSIONALS_DETAIL: (id) =>
     `/professionals/${id}/`,
   PROFESSIONALS_SUMMARY: '/professionals/summary/',
+
+  // Autocompletado
+  AUTOCOMPLETE: '/autocomplete/',
+
+  // Disponibilidad
+  AVAILABILITY: '/availability/',
+  AVAILABILITY_WEEK: '/availability/week/',
+  AVAILABILITY_FIRST: '/availability/first/',
+  AVAILABILITY_BUNDLE: '/availability/bundle/',
+
+  // Turnos
+  APPOINTMENTS: '/appointments/',
+  HOLDS: '/holds/',
+  HOLD_DETAIL: (token) => `/holds/${token}/`,
+
+  // Copias estáticas del catálogo (sin consultar la base)
+  CATALOG_SNAPSHOT: '/catalog/snapshot/',
+  CATALOG_SNAPSHOT_DOCUMENT: (name) => `/catalog/snapshot/${name}/`,
+
+  // Varias consultas GET en un solo viaje
+  BATCH: '/batch/',
 };
 
 // Keys para localStorage